@@ -3,10 +3,24 @@ import datetime
 
 def request_body_matcher(pattern):
     def _callback(request):
-        return pattern in request.text
+        return pattern in read_body(request)
 
     return _callback
 
 
+def read_body(request):
+    """
+    Return the body of a mocked request as text, reading it first if it is streamed.
+    """
+    body = request.body
+    if hasattr(body, "read"):
+        body = body.read()
+    elif body is not None and not isinstance(body, (str, bytes)):
+        body = b"".join(body)
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    return body or ""
+
+
 def get_test_time():
     return datetime.datetime.fromisoformat("2024-04-04T04:44:44")
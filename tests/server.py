@@ -0,0 +1,259 @@
+"""
+A small threaded HTTP server that stands in for the Transloadit API in tests
+that cannot use requests_mock (e.g. the asyncio client).
+"""
+import re
+import threading
+from base64 import b64decode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StandInRequest:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+
+class StandInServer:
+    """
+    Route table based HTTP server. Handlers receive a <StandInRequest> and return a
+    tuple of (status, headers, body). Routes registered later take precedence.
+    """
+
+    def __init__(self):
+        self.routes = []
+        self.requests = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def route(self, method, pattern, handler):
+        self.routes.append((method, re.compile(pattern), handler))
+
+    def json(self, method, pattern, body, status=200):
+        self.route(
+            method,
+            pattern,
+            lambda request: (status, {"Content-Type": "application/json"}, body),
+        )
+
+    def __enter__(self):
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _dispatch(self, request):
+        with self._lock:
+            self.requests.append(request)
+        for method, pattern, handler in reversed(self.routes):
+            if method == request.method and pattern.fullmatch(request.path):
+                return handler(request)
+        return 404, {}, b""
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _read_body(self):
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    body = b""
+                    while True:
+                        size = int(self.rfile.readline().split(b";")[0], 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            return body
+                        body += self.rfile.read(size)
+                        self.rfile.readline()
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def _handle(self):
+                parts = urlsplit(self.path)
+                request = StandInRequest(
+                    self.command,
+                    parts.path,
+                    parse_qs(parts.query),
+                    self.headers,
+                    self._read_body(),
+                )
+                status, headers, body = server._dispatch(request)
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if not isinstance(body, bytes):
+                    self._stream(body)
+                    return
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def _stream(self, blocks):
+                # iterable bodies are sent chunked, one block at a time; an exception raised
+                # by the iterable drops the connection.
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for block in blocks:
+                        if isinstance(block, str):
+                            block = block.encode("utf-8")
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(block), block))
+                        self.wfile.flush()
+                except Exception:
+                    self.close_connection = True
+                    return
+                self.wfile.write(b"0\r\n\r\n")
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _handle
+
+        return Handler
+
+
+class TusStandIn:
+    """
+    In-memory TUS server mounted on a <StandInServer> under '/resumable/files/'.
+    """
+
+    def __init__(self, server, extensions=("creation",)):
+        self.server = server
+        self.extensions = extensions
+        self.uploads = {}
+        self._lock = threading.Lock()
+        server.route("OPTIONS", "/resumable/files/", self._options)
+        server.route("POST", "/resumable/files/", self._create)
+        server.route("HEAD", r"/resumable/files/(\w+)", self._head)
+        server.route("PATCH", r"/resumable/files/(\w+)", self._patch)
+
+    @property
+    def url(self):
+        return f"{self.server.url}/resumable/files/"
+
+    def _options(self, request):
+        return 204, {"Tus-Extension": ",".join(self.extensions)}, b""
+
+    def _create(self, request):
+        concat = request.headers.get("Upload-Concat", "")
+        upload = {
+            "metadata": self._decode_metadata(request.headers.get("Upload-Metadata")),
+            "partial": concat == "partial",
+            "data": b"",
+        }
+        if concat.startswith("final;"):
+            parts = [self.uploads[url.rsplit("/", 1)[-1]] for url in concat[6:].split()]
+            upload["data"] = b"".join(part["data"] for part in parts)
+            upload["length"] = len(upload["data"])
+        elif request.headers.get("Upload-Defer-Length") == "1":
+            upload["length"] = None
+        else:
+            upload["length"] = int(request.headers["Upload-Length"])
+        with self._lock:
+            upload_id = f"u{len(self.uploads)}"
+            self.uploads[upload_id] = upload
+        return 201, {"Location": f"/resumable/files/{upload_id}"}, b""
+
+    def completed(self):
+        """
+        Return the finished, non-partial uploads.
+        """
+        return [
+            upload
+            for upload in self.uploads.values()
+            if not upload["partial"] and len(upload["data"]) == upload["length"]
+        ]
+
+    @staticmethod
+    def _decode_metadata(header):
+        metadata = {}
+        for pair in filter(None, (header or "").split(",")):
+            key, _, value = pair.partition(" ")
+            metadata[key] = b64decode(value).decode("utf-8")
+        return metadata
+
+    def _get(self, request):
+        return self.uploads.get(request.path.rsplit("/", 1)[-1])
+
+    def _head(self, request):
+        upload = self._get(request)
+        if upload is None:
+            return 404, {}, b""
+        headers = {"Upload-Offset": str(len(upload["data"]))}
+        if upload["length"] is not None:
+            headers["Upload-Length"] = str(upload["length"])
+        return 200, headers, b""
+
+    def _patch(self, request):
+        upload = self._get(request)
+        if upload is None:
+            return 404, {}, b""
+        if int(request.headers["Upload-Offset"]) != len(upload["data"]):
+            return 409, {}, b""
+        if "Upload-Length" in request.headers:
+            upload["length"] = int(request.headers["Upload-Length"])
+        upload["data"] += request.body
+        return 204, {"Upload-Offset": str(len(upload["data"]))}, b""
+
+
+class FileStandIn:
+    """
+    Static file server mounted on a <StandInServer> under '/files/', honouring 'Range:
+    bytes=<start>-' requests. Files in 'drop_after' are cut off after that many bytes once,
+    by dropping the connection.
+    """
+
+    def __init__(self, server, files):
+        self.server = server
+        self.files = files
+        self.drop_after = {}
+        self.ranges = []
+        server.route("GET", r"/files/(.+)", self._get)
+
+    def url(self, name):
+        return f"{self.server.url}/files/{name}"
+
+    def _get(self, request):
+        name = request.path[len("/files/"):]
+        data = self.files.get(name)
+        if data is None:
+            return 404, {}, b""
+        start = 0
+        range_header = request.headers.get("Range")
+        self.ranges.append((name, range_header))
+        if range_header:
+            start = int(range_header[len("bytes="):].split("-")[0])
+            if start >= len(data):
+                return 416, {"Content-Range": f"bytes */{len(data)}"}, b""
+        status = 206 if range_header else 200
+        headers = {}
+        if range_header:
+            headers["Content-Range"] = f"bytes {start}-{len(data) - 1}/{len(data)}"
+        drop_after = self.drop_after.pop(name, None)
+        if drop_after is None:
+            return status, headers, data[start:]
+        return status, headers, self._drop(data[start:drop_after])
+
+    @staticmethod
+    def _drop(data):
+        yield data
+        raise ConnectionError("dropped")
@@ -1,9 +1,33 @@
+import io
+import json
+import threading
+import time
 import unittest
+from concurrent.futures import CancelledError
+from unittest import mock
 
 import requests_mock
+from tusclient.exceptions import TusUploadFailed
 
 from . import request_body_matcher
+from .server import StandInServer, TusStandIn
+from transloadit.assembly import UploadError
+from transloadit.deadline import DeadlineExceeded
 from transloadit.client import Transloadit
+from transloadit.resume import SQLiteResumeStore, fingerprint
+from transloadit import assembly as assembly_module, sources, uploader
+from transloadit.async_request import BufferedResponse
+from transloadit.response import Response
+
+
+def _response(data):
+    return Response(BufferedResponse(200, {}, json.dumps(data).encode()))
+
+
+def _named_stream(name, data):
+    stream = io.BytesIO(data)
+    stream.name = name
+    return stream
 
 
 class AssemblyTest(unittest.TestCase):
@@ -63,3 +87,606 @@ class AssemblyTest(unittest.TestCase):
         assembly = self.assembly.create()
         self.assertEqual(assembly.data["ok"], "ASSEMBLY_COMPLETED")
         self.assertEqual(assembly.data["assembly_id"], "abcdef45673")
+
+
+class StandInTestCase(unittest.TestCase):
+    extensions = ("creation",)
+
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.tus = TusStandIn(self.server, extensions=self.extensions)
+        self.transloadit = Transloadit("key", "secret", service=self.server.url)
+        self.server.json(
+            "POST",
+            "/assemblies",
+            json.dumps(
+                {
+                    "ok": "ASSEMBLY_UPLOADING",
+                    "assembly_ssl_url": f"{self.server.url}/assemblies/abc",
+                    "tus_url": self.tus.url,
+                }
+            ),
+        )
+
+    def tearDown(self):
+        self.transloadit.close()
+        self.server.__exit__(None, None, None)
+
+
+class ParallelUploadTest(StandInTestCase):
+    def test_parallel_upload(self):
+        assembly = self.transloadit.new_assembly()
+        contents = {f"frame_{i}": bytes([i]) * (1000 + i) for i in range(6)}
+        for key, data in contents.items():
+            assembly.add_file(_named_stream(f"{key}.png", data), key)
+
+        assembly.create(max_parallel_uploads=3)
+
+        uploads = {
+            upload["metadata"]["fieldname"]: upload for upload in self.tus.uploads.values()
+        }
+        self.assertEqual(set(uploads), set(contents))
+        for key, data in contents.items():
+            self.assertEqual(uploads[key]["data"], data)
+            self.assertEqual(uploads[key]["metadata"]["filename"], f"{key}.png")
+
+    def test_upload_regular_file(self):
+        assembly = self.transloadit.new_assembly()
+        with open("LICENSE", "rb") as fs:
+            assembly.add_file(fs)
+            assembly.create()
+            fs.seek(0)
+            self.assertEqual(self.tus.completed()[0]["data"], fs.read())
+
+    def test_parallel_upload_errors_are_aggregated(self):
+        self.server.route("PATCH", "/resumable/files/u0", lambda request: (500, {}, ""))
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("a.png", b"a" * 100), "a")
+        assembly.add_file(_named_stream("b.png", b"b" * 100), "b")
+
+        with self.assertRaises(UploadError) as context:
+            assembly.create(retries=0, max_parallel_uploads=2)
+        self.assertEqual(len(context.exception.errors), 1)
+
+
+class ConcatenationUploadTest(ParallelUploadTest):
+    extensions = ("creation", "concatenation")
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(uploader, "CHUNK_SIZE", 1000)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.data = bytes(range(256)) * 20
+
+    def test_upload_in_parts(self):
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("master.mov", self.data), "video")
+
+        assembly.create(parallel_parts=4)
+
+        partials = [upload for upload in self.tus.uploads.values() if upload["partial"]]
+        self.assertEqual(len(partials), 4)
+        (final,) = self.tus.completed()
+        self.assertEqual(final["data"], self.data)
+        self.assertEqual(final["metadata"]["fieldname"], "video")
+        self.assertEqual(final["metadata"]["filename"], "master.mov")
+
+    def test_parts_are_never_smaller_than_a_chunk(self):
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("small.mov", self.data[:1500]), "video")
+
+        assembly.create(parallel_parts=4)
+
+        partials = [upload for upload in self.tus.uploads.values() if upload["partial"]]
+        self.assertEqual(len(partials), 2)
+        self.assertEqual(self.tus.completed()[0]["data"], self.data[:1500])
+
+    def test_falls_back_without_concatenation(self):
+        self.tus.extensions = ("creation",)
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("master.mov", self.data), "video")
+
+        assembly.create(parallel_parts=4)
+
+        self.assertEqual(len(self.tus.uploads), 1)
+        self.assertEqual(self.tus.completed()[0]["data"], self.data)
+
+
+class StreamUploadTest(StandInTestCase):
+    extensions = ("creation", "creation-defer-length")
+
+    def test_upload_stream(self):
+        blocks = [b"frame-%d;" % i for i in range(100)]
+        assembly = self.transloadit.new_assembly()
+        assembly.add_stream(iter(blocks), "frames.raw", "frames")
+
+        assembly.create()
+
+        (upload,) = self.tus.completed()
+        self.assertEqual(upload["data"], b"".join(blocks))
+        self.assertEqual(upload["metadata"]["fieldname"], "frames")
+        self.assertEqual(upload["metadata"]["filename"], "frames.raw")
+        (create,) = [
+            request
+            for request in self.server.requests
+            if request.method == "POST" and request.path.startswith("/resumable")
+        ]
+        self.assertEqual(create.headers["Upload-Defer-Length"], "1")
+
+    def test_stream_is_spooled_without_deferred_length(self):
+        self.tus.extensions = ("creation",)
+        data = bytes(range(256)) * 10
+        assembly = self.transloadit.new_assembly()
+        assembly.add_stream(io.BufferedReader(io.BytesIO(data)), "data.bin")
+
+        assembly.create()
+
+        (upload,) = self.tus.completed()
+        self.assertEqual(upload["data"], data)
+        self.assertEqual(upload["length"], len(data))
+
+
+class ResumeUploadTest(StandInTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store = SQLiteResumeStore(":memory:")
+        self.addCleanup(self.store.close)
+        self.data = bytes(range(256)) * 10
+        self.options = {"min_chunk_size": 1000, "max_chunk_size": 1000, "resume_store": self.store}
+
+    def _fail_after_first_chunk(self):
+        responses = iter([self.tus._patch])
+        self.server.route(
+            "PATCH",
+            r"/resumable/files/(\w+)",
+            lambda request: next(responses, lambda request: (500, {}, ""))(request),
+        )
+
+    def _assembly_status(self, status):
+        self.server.json(
+            "GET",
+            "/assemblies/abc",
+            json.dumps({"ok": status, "assembly_ssl_url": f"{self.server.url}/assemblies/abc"}),
+        )
+
+    def _create(self, **options):
+        assembly = self.transloadit.new_assembly({"steps": {"resize": {"robot": "/image/resize"}}})
+        assembly.add_file(_named_stream("image.png", self.data), "image")
+        return assembly.create(retries=0, **self.options, **options)
+
+    def _assembly_requests(self):
+        return [
+            request
+            for request in self.server.requests
+            if request.method == "POST" and request.path == "/assemblies"
+        ]
+
+    def test_resume_after_crash(self):
+        self._fail_after_first_chunk()
+        with self.assertRaises(TusUploadFailed):
+            self._create()
+
+        self.server.route("PATCH", r"/resumable/files/(\w+)", self.tus._patch)
+        self._assembly_status("ASSEMBLY_UPLOADING")
+        self._create()
+
+        self.assertEqual(len(self._assembly_requests()), 1)
+        (upload,) = self.tus.completed()
+        self.assertEqual(upload["data"], self.data)
+        patches = [request for request in self.server.requests if request.method == "PATCH"]
+        self.assertEqual(sum(len(request.body) for request in patches[2:]), len(self.data) - 1000)
+        upload_key = f"{self.server.url}/assemblies/abc image {fingerprint(io.BytesIO(self.data))}"
+        self.assertIsNone(self.store.get_item(upload_key))
+
+    def test_text_files(self):
+        self.server.json(
+            "POST",
+            "/assemblies",
+            json.dumps(
+                {
+                    "ok": "ASSEMBLY_UPLOADING",
+                    "assembly_ssl_url": f"{self.server.url}/assemblies/abc",
+                    "tus_url": self.tus.url,
+                }
+            ),
+        )
+        assembly = self.transloadit.new_assembly()
+        with open("LICENSE") as fs:
+            assembly.add_file(fs)
+            assembly.create(**self.options)
+
+        with open("LICENSE", "rb") as fs:
+            self.assertEqual(self.tus.completed()[0]["data"], fs.read())
+
+    def test_assemblies_no_longer_uploading_are_not_resumed(self):
+        self._fail_after_first_chunk()
+        with self.assertRaises(TusUploadFailed):
+            self._create()
+
+        self.server.route("PATCH", r"/resumable/files/(\w+)", self.tus._patch)
+        self._assembly_status("ASSEMBLY_CANCELED")
+        self._create()
+
+        self.assertEqual(len(self._assembly_requests()), 2)
+        self.assertEqual(len(self.tus.uploads), 2)
+        self.assertEqual(self.tus.completed()[0]["data"], self.data)
+
+
+class RateLimitTest(StandInTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch("transloadit.assembly.sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.accepted = {
+            "ok": "ASSEMBLY_UPLOADING",
+            "assembly_ssl_url": f"{self.server.url}/assemblies/abc",
+            "tus_url": self.tus.url,
+        }
+
+    def _rate_limited(self, count, retry_in=None):
+        limited = {"error": "RATE_LIMIT_REACHED", "info": {}}
+        if retry_in is not None:
+            limited["info"]["retryIn"] = retry_in
+        responses = iter([limited] * count + [self.accepted])
+        self.server.route(
+            "POST", "/assemblies", lambda request: (200, {}, json.dumps(next(responses)))
+        )
+
+    def test_files_are_uploaded_once(self):
+        self._rate_limited(2, retry_in=3)
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("a.png", b"a" * 100), "a")
+
+        response = assembly.create()
+
+        self.assertEqual(response.data["ok"], "ASSEMBLY_UPLOADING")
+        self.assertEqual(len(self.tus.uploads), 1)
+        self.assertEqual(self.tus.completed()[0]["data"], b"a" * 100)
+        self.assertEqual(self.sleep.call_args_list, [mock.call(3), mock.call(3)])
+
+    def test_backs_off_without_retry_period(self):
+        self._rate_limited(3)
+        response = self.transloadit.new_assembly().create(rate_limit_retries=3)
+
+        self.assertEqual(response.data["ok"], "ASSEMBLY_UPLOADING")
+        self.assertEqual(self.sleep.call_args_list, [mock.call(1), mock.call(2), mock.call(4)])
+
+    def test_gives_up_without_uploading(self):
+        self._rate_limited(3, retry_in=1)
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("a.png", b"a" * 100), "a")
+
+        response = assembly.create(rate_limit_retries=1)
+
+        self.assertEqual(response.data["error"], "RATE_LIMIT_REACHED")
+        self.assertEqual(self.tus.uploads, {})
+
+    def test_non_resumable_files_are_sent_again_in_full(self):
+        self._rate_limited(1, retry_in=1)
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("a.png", b"a" * 100), "a")
+
+        assembly.create(resumable=False)
+
+        bodies = [request.body for request in self.server.requests if request.method == "POST"]
+        self.assertEqual(len(bodies), 2)
+        self.assertIn(b"a" * 100, bodies[1])
+
+    def test_non_resumable_file_sources(self):
+        self._rate_limited(1, retry_in=1)
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(sources.FileSource(_named_stream("a.png", b"a" * 100)), "a")
+
+        assembly.create(resumable=False)
+
+        bodies = [request.body for request in self.server.requests if request.method == "POST"]
+        self.assertEqual(len(bodies), 2)
+        for body in bodies:
+            self.assertIn(b'filename="a.png"\r\n\r\n' + b"a" * 100, body)
+
+    def test_poll_interval(self):
+        self._rate_limited(0)
+        statuses = iter(
+            [{"ok": "ASSEMBLY_EXECUTING"}, {"ok": "ASSEMBLY_EXECUTING", "info": {"retryIn": 7}}]
+        )
+        self.server.route(
+            "GET",
+            "/assemblies/abc",
+            lambda request: (200, {}, json.dumps(next(statuses, {"ok": "ASSEMBLY_COMPLETED"}))),
+        )
+
+        response = self.transloadit.new_assembly().create(wait=True, poll_interval=0.5)
+
+        self.assertEqual(response.data["ok"], "ASSEMBLY_COMPLETED")
+        self.assertEqual(
+            self.sleep.call_args_list, [mock.call(0.5), mock.call(0.5), mock.call(7)]
+        )
+
+
+class SubmitTest(StandInTestCase):
+    def setUp(self):
+        super().setUp()
+        self.transloadit.poller.interval = 0.01
+        self.statuses = [{"ok": "ASSEMBLY_EXECUTING"}]
+        self.server.route(
+            "GET",
+            "/assemblies/abc",
+            lambda request: (200, {}, json.dumps(self._next_status())),
+        )
+
+    def _next_status(self):
+        return self.statuses.pop(0) if self.statuses else {"ok": "ASSEMBLY_COMPLETED"}
+
+    def test_submit(self):
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("a.png", b"a" * 1000), "a")
+        assembly.add_file(_named_stream("b.png", b"b" * 500), "b")
+        progress = []
+
+        future = assembly.submit(on_progress=progress.append, max_parallel_uploads=2)
+
+        self.assertEqual(future.assembly_url, f"{self.server.url}/assemblies/abc")
+        self.assertEqual(future.total_bytes, 1500)
+        response = future.result(timeout=5)
+        self.assertEqual(response.data["ok"], "ASSEMBLY_COMPLETED")
+        self.assertEqual(future.uploaded_bytes, 1500)
+        self.assertEqual(future.progress, 1.0)
+        self.assertEqual(sum(progress), 1500)
+        self.assertEqual(len(self.tus.completed()), 2)
+
+    def test_done_callback(self):
+        done = threading.Event()
+        future = self.transloadit.new_assembly().submit()
+        future.add_done_callback(lambda future: done.set())
+        self.assertTrue(done.wait(5))
+        self.assertEqual(future.result().data["ok"], "ASSEMBLY_COMPLETED")
+
+    def test_uploaded_callback(self):
+        uploaded = []
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("a.png", b"a" * 100), "a")
+
+        future = assembly.submit()
+        future.add_uploaded_callback(lambda future: uploaded.append(future.uploaded_bytes))
+        future.result(timeout=5)
+
+        self.assertTrue(future.uploaded)
+        self.assertEqual(uploaded, [100])
+        future.add_uploaded_callback(uploaded.append)
+        self.assertEqual(uploaded, [100, future])
+
+    def test_upload_errors(self):
+        self.server.route("PATCH", r"/resumable/files/(\w+)", lambda request: (500, {}, ""))
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("a.png", b"a" * 100), "a")
+
+        future = assembly.submit(retries=0)
+
+        with self.assertRaises(TusUploadFailed):
+            future.result(timeout=5)
+
+    def test_cancel(self):
+        self.server.json("DELETE", "/assemblies/abc", '{"ok": "ASSEMBLY_CANCELED"}')
+        patching = threading.Event()
+        release = threading.Event()
+
+        def _patch(request):
+            patching.set()
+            release.wait(5)
+            return self.tus._patch(request)
+
+        self.server.route("PATCH", r"/resumable/files/(\w+)", _patch)
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("a.png", b"a" * 3000), "a")
+
+        future = assembly.submit(min_chunk_size=1000, max_chunk_size=1000)
+        self.assertTrue(patching.wait(5))
+        self.assertTrue(future.cancel())
+        release.set()
+
+        self.assertTrue(future.cancelled())
+        self.assertFalse(future.cancel())
+        self.assertIn("DELETE", [request.method for request in self.server.requests])
+
+    def test_client_closed_while_pending(self):
+        self.statuses = [{"ok": "ASSEMBLY_EXECUTING"}] * 1000
+        uploaded = threading.Event()
+        future = self.transloadit.new_assembly().submit()
+        future.add_uploaded_callback(lambda future: uploaded.set())
+        self.assertTrue(uploaded.wait(5))
+
+        self.transloadit.close()
+
+        with self.assertRaises(CancelledError):
+            future.result(timeout=5)
+        self.assertNotIn("DELETE", [request.method for request in self.server.requests])
+
+    def test_client_closed_while_uploading(self):
+        patching, release = threading.Event(), threading.Event()
+
+        def patch(request):
+            patching.set()
+            release.wait(5)
+            return self.tus._patch(request)
+
+        self.server.route("PATCH", r"/resumable/files/(\w+)", patch)
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("a.png", b"a" * 100), "a")
+        future = assembly.submit()
+        self.assertTrue(patching.wait(5))
+
+        self.transloadit.close()
+        release.set()
+
+        with self.assertRaisesRegex(RuntimeError, "client is closed"):
+            future.result(timeout=5)
+        # no poller was started again for the assembly.
+        self.assertIsNone(self.transloadit._poller)
+
+    def test_rate_limited_submission(self):
+        self.server.json("POST", "/assemblies", '{"error": "RATE_LIMIT_REACHED"}')
+        future = self.transloadit.new_assembly().submit(rate_limit_retries=0)
+        self.assertEqual(future.result(timeout=0).data["error"], "RATE_LIMIT_REACHED")
+
+    def test_non_resumable(self):
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("a.png", b"a" * 100), "a")
+
+        future = assembly.submit(resumable=False)
+
+        self.assertEqual(future.progress, 1.0)
+        self.assertEqual(future.result(timeout=5).data["ok"], "ASSEMBLY_COMPLETED")
+        self.assertEqual(self.tus.uploads, {})
+
+
+class StreamUpdatesTest(StandInTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server.json(
+            "POST",
+            "/assemblies",
+            json.dumps(
+                {
+                    "ok": "ASSEMBLY_UPLOADING",
+                    "assembly_ssl_url": f"{self.server.url}/assemblies/abc",
+                    "update_stream_url": f"{self.server.url}/assemblies/abc/events",
+                    "tus_url": self.tus.url,
+                }
+            ),
+        )
+        self.server.json("GET", "/assemblies/abc", '{"ok": "ASSEMBLY_COMPLETED"}')
+        patcher = mock.patch("transloadit.assembly.sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _events(self, *blocks):
+        self.server.route(
+            "GET",
+            "/assemblies/abc/events",
+            lambda request: (200, {"Content-Type": "text/event-stream"}, iter(blocks)),
+        )
+
+    def _status_requests(self):
+        return [request for request in self.server.requests if request.path == "/assemblies/abc"]
+
+    def test_wait_for_final_event(self):
+        self._events(
+            "event: assembly_upload_finished\ndata: {}\n\n",
+            ": heartbeat\n\n",
+            "event: assembly_finished\ndata: {}\n\n",
+        )
+        response = self.transloadit.new_assembly().create(wait=True, stream_updates=True)
+
+        self.assertEqual(response.data["ok"], "ASSEMBLY_COMPLETED")
+        self.assertEqual(len(self._status_requests()), 1)
+        self.sleep.assert_not_called()
+
+    def test_falls_back_to_polling(self):
+        self._events("event: assembly_upload_finished\ndata: {}\n\n")
+        response = self.transloadit.new_assembly().create(wait=True, stream_updates=True)
+
+        self.assertEqual(response.data["ok"], "ASSEMBLY_COMPLETED")
+        self.sleep.assert_called_once_with(1)
+
+    def test_deadline_with_heartbeats_only(self):
+        self.server.json("GET", "/assemblies/abc", '{"ok": "ASSEMBLY_EXECUTING"}')
+        self.server.json("DELETE", "/assemblies/abc", '{"ok": "ASSEMBLY_CANCELED"}')
+        stop = threading.Event()
+        self.addCleanup(stop.set)
+
+        def heartbeats():
+            while not stop.wait(0.05):
+                yield ": heartbeat\n\n"
+
+        self.server.route(
+            "GET",
+            "/assemblies/abc/events",
+            lambda request: (200, {"Content-Type": "text/event-stream"}, heartbeats()),
+        )
+        started = time.monotonic()
+
+        with self.assertRaises(DeadlineExceeded) as raised:
+            self.transloadit.new_assembly().create(
+                wait=True, stream_updates=True, timeout=0.5, cancel_on_timeout=True
+            )
+
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(raised.exception.response.data["ok"], "ASSEMBLY_CANCELED")
+
+    def test_poller_follows_update_stream(self):
+        self._events("event: assembly_finished\ndata: {}\n\n")
+        self.transloadit.poller.stream_updates = True
+        self.transloadit.poller.interval = 60
+
+        future = self.transloadit.new_assembly().submit()
+
+        self.assertEqual(future.result(timeout=5).data["ok"], "ASSEMBLY_COMPLETED")
+        self.assertEqual(len(self._status_requests()), 1)
+
+    def test_poller_falls_back_to_polling(self):
+        self._events()
+        self.transloadit.poller.stream_updates = True
+        self.transloadit.poller.interval = 0.01
+        self.transloadit.poller.max_interval = 60
+
+        future = self.transloadit.new_assembly().submit()
+
+        self.assertEqual(future.result(timeout=5).data["ok"], "ASSEMBLY_COMPLETED")
+
+
+class IterResultsTest(StandInTestCase):
+    def setUp(self):
+        super().setUp()
+        self.statuses = [
+            {"ok": "ASSEMBLY_UPLOADING"},
+            {"ok": "ASSEMBLY_EXECUTING", "results": {"thumb": [{"id": "t1", "name": "a.jpg"}]}},
+            {
+                "ok": "ASSEMBLY_EXECUTING",
+                "info": {"retryIn": 3},
+                "results": {"thumb": [{"id": "t1"}, {"id": "t2"}]},
+            },
+            {
+                "ok": "ASSEMBLY_COMPLETED",
+                "results": {"thumb": [{"id": "t1"}, {"id": "t2"}], "hls": [{"id": "h1"}]},
+            },
+        ]
+        self.server.route(
+            "GET",
+            "/assemblies/abc",
+            lambda request: (200, {}, json.dumps(self.statuses.pop(0))),
+        )
+        patcher = mock.patch("transloadit.assembly.sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_iter_results(self):
+        results = self.transloadit.iter_results(f"{self.server.url}/assemblies/abc")
+
+        self.assertEqual(next(results), ("thumb", {"id": "t1", "name": "a.jpg"}))
+        self.assertEqual(len(self.statuses), 2)
+        remaining = [(step, result["id"]) for step, result in results]
+        self.assertEqual(remaining, [("thumb", "t2"), ("hls", "h1")])
+        self.assertEqual(self.sleep.call_args_list, [mock.call(1), mock.call(1), mock.call(3)])
+
+    def test_final_response_is_returned(self):
+        self.statuses = self.statuses[-1:]
+        results = self.transloadit.iter_results(f"{self.server.url}/assemblies/abc")
+        self.assertEqual(len(list(results)), 3)
+
+        results = assembly_module.iter_results(
+            self.transloadit, "unused", response=_response({"ok": "ASSEMBLY_CANCELED"})
+        )
+        with self.assertRaises(StopIteration) as context:
+            next(results)
+        self.assertEqual(context.exception.value.data["ok"], "ASSEMBLY_CANCELED")
+
+    def test_submitted_assembly(self):
+        self.statuses.pop(0)
+        # keep the background poller out of the way of the statuses served in order.
+        self.transloadit.poller.interval = 60
+        future = self.transloadit.new_assembly().submit()
+        steps = [step for step, result in future.iter_results(poll_interval=0.5)]
+        self.assertEqual(steps, ["thumb", "thumb", "hls"])
+        self.assertEqual(self.sleep.call_args_list[0], mock.call(0.5))
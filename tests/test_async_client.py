@@ -0,0 +1,216 @@
+import json
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs
+
+from .server import StandInServer, TusStandIn
+from transloadit import sources
+from transloadit.async_client import AsyncTransloadit
+
+
+class AsyncClientTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.tus = TusStandIn(self.server)
+        self.transloadit = AsyncTransloadit("key", "secret", service=self.server.url)
+
+    async def asyncTearDown(self):
+        await self.transloadit.close()
+        self.server.__exit__(None, None, None)
+
+    async def test_get_assembly(self):
+        self.server.json(
+            "GET", "/assemblies/abc", '{"ok": "ASSEMBLY_COMPLETED", "assembly_id": "abc"}'
+        )
+
+        response = await self.transloadit.get_assembly(assembly_id="abc")
+        self.assertEqual(response.data["ok"], "ASSEMBLY_COMPLETED")
+        self.assertEqual(response.status_code, 200)
+
+        request = self.server.requests[0]
+        self.assertEqual(request.headers["Transloadit-Client"], "python-sdk:1.0.4")
+        params = json.loads(request.query["params"][0])
+        self.assertEqual(params["auth"]["key"], "key")
+        self.assertEqual(
+            request.query["signature"][0],
+            self.transloadit.request._sign_data(request.query["params"][0]),
+        )
+
+    async def test_cancel_assembly(self):
+        self.server.json("DELETE", "/assemblies/abc", '{"ok": "ASSEMBLY_CANCELED"}')
+
+        response = await self.transloadit.cancel_assembly("abc")
+        self.assertEqual(response.data["ok"], "ASSEMBLY_CANCELED")
+
+    async def test_create_resumable_and_wait(self):
+        assembly_url = f"{self.server.url}/assemblies/abc"
+        self.server.json(
+            "POST",
+            "/assemblies",
+            json.dumps(
+                {
+                    "ok": "ASSEMBLY_UPLOADING",
+                    "assembly_ssl_url": assembly_url,
+                    "tus_url": self.tus.url,
+                }
+            ),
+        )
+        statuses = iter(
+            [
+                {"ok": "ASSEMBLY_EXECUTING", "assembly_ssl_url": assembly_url},
+                {"ok": "ASSEMBLY_COMPLETED", "assembly_ssl_url": assembly_url},
+            ]
+        )
+        self.server.route(
+            "GET", "/assemblies/abc", lambda request: (200, {}, json.dumps(next(statuses)))
+        )
+
+        assembly = self.transloadit.new_assembly()
+        with open("LICENSE", "rb") as fs:
+            assembly.add_file(fs)
+            with mock.patch("transloadit.async_assembly.asyncio.sleep") as sleep:
+                response = await assembly.create(wait=True)
+
+        self.assertEqual(response.data["ok"], "ASSEMBLY_COMPLETED")
+        self.assertEqual(sleep.call_count, 2)
+        body = parse_qs(self.server.requests[0].body.decode())
+        self.assertEqual(body["tus_num_expected_upload_files"], ["1"])
+        with open("LICENSE", "rb") as fs:
+            self.assertEqual(self.tus.uploads["u0"]["data"], fs.read())
+
+    async def test_create_non_resumable(self):
+        self.server.route(
+            "POST",
+            "/assemblies",
+            lambda request: (
+                200,
+                {},
+                '{"ok": "ASSEMBLY_COMPLETED"}' if b"Permission is hereby granted" in request.body else "{}",
+            ),
+        )
+
+        assembly = self.transloadit.new_assembly()
+        with open("LICENSE", "rb") as fs:
+            assembly.add_file(fs)
+            response = await assembly.create(resumable=False)
+        self.assertEqual(response.data["ok"], "ASSEMBLY_COMPLETED")
+
+    async def test_create_with_file_sources(self):
+        self.server.json(
+            "POST",
+            "/assemblies",
+            json.dumps(
+                {
+                    "ok": "ASSEMBLY_UPLOADING",
+                    "assembly_ssl_url": f"{self.server.url}/assemblies/abc",
+                    "tus_url": self.tus.url,
+                }
+            ),
+        )
+
+        with open("LICENSE", "rb") as fs:
+            data = fs.read()
+            for resumable in (True, False):
+                fs.seek(0)
+                assembly = self.transloadit.new_assembly()
+                assembly.add_file(sources.open_source(fs))
+                await assembly.create(resumable=resumable)
+
+        self.assertEqual(self.tus.completed()[0]["data"], data)
+        self.assertIn(b'filename="LICENSE"\r\n', self.server.requests[-1].body)
+        self.assertIn(data, self.server.requests[-1].body)
+
+    async def test_tus_requests_skip_rate_limiter_and_retries(self):
+        self.server.json(
+            "POST",
+            "/assemblies",
+            json.dumps(
+                {
+                    "ok": "ASSEMBLY_UPLOADING",
+                    "assembly_ssl_url": f"{self.server.url}/assemblies/abc",
+                    "tus_url": self.tus.url,
+                }
+            ),
+        )
+        self.transloadit.rate_limiter = mock.Mock(**{"reserve.return_value": 0})
+
+        assembly = self.transloadit.new_assembly()
+        with open("LICENSE", "rb") as fs:
+            assembly.add_file(fs)
+            await assembly.create()
+
+        self.assertEqual(len(self.tus.completed()), 1)
+        urls = [call.args[1] for call in self.transloadit.rate_limiter.reserve.call_args_list]
+        self.assertEqual(urls, [f"{self.server.url}/assemblies"])
+        self.assertEqual(self.transloadit.retry_policy.counters["attempts"], 1)
+
+    async def test_rate_limited_assembly_is_submitted_again(self):
+        responses = iter(
+            [
+                {"error": "RATE_LIMIT_REACHED", "info": {"retryIn": 5}},
+                {
+                    "ok": "ASSEMBLY_UPLOADING",
+                    "assembly_ssl_url": f"{self.server.url}/assemblies/abc",
+                    "tus_url": self.tus.url,
+                },
+            ]
+        )
+        self.server.route(
+            "POST", "/assemblies", lambda request: (200, {}, json.dumps(next(responses)))
+        )
+
+        assembly = self.transloadit.new_assembly()
+        with open("LICENSE", "rb") as fs:
+            assembly.add_file(fs)
+            with mock.patch("transloadit.async_assembly.asyncio.sleep") as sleep:
+                response = await assembly.create()
+
+            fs.seek(0)
+            self.assertEqual(self.tus.completed()[0]["data"], fs.read())
+        self.assertEqual(response.data["ok"], "ASSEMBLY_UPLOADING")
+        sleep.assert_called_once_with(5)
+        self.assertEqual(len(self.tus.uploads), 1)
+
+    async def test_iter_results(self):
+        statuses = iter(
+            [
+                {"ok": "ASSEMBLY_EXECUTING", "results": {"thumb": [{"id": "t1"}]}},
+                {
+                    "ok": "ASSEMBLY_COMPLETED",
+                    "results": {"thumb": [{"id": "t1"}], "hls": [{"id": "h1"}]},
+                },
+            ]
+        )
+        self.server.route(
+            "GET", "/assemblies/abc", lambda request: (200, {}, json.dumps(next(statuses)))
+        )
+
+        with mock.patch("transloadit.async_client.asyncio.sleep"):
+            results = [
+                (step, result["id"])
+                async for step, result in self.transloadit.iter_results(
+                    f"{self.server.url}/assemblies/abc"
+                )
+            ]
+        self.assertEqual(results, [("thumb", "t1"), ("hls", "h1")])
+
+    async def test_threaded_methods_are_unsupported(self):
+        with self.assertRaisesRegex(TypeError, "create"):
+            self.transloadit.new_assembly().submit()
+        with self.assertRaises(TypeError):
+            self.transloadit.poller
+        with self.assertRaises(TypeError):
+            self.transloadit.process_many(["LICENSE"])
+        with self.assertRaises(TypeError):
+            self.transloadit.submit_input("LICENSE")
+        with self.assertRaises(TypeError):
+            self.transloadit.download_results({}, "results")
+        self.assertEqual(self.server.requests, [])
+
+    async def test_streams_are_unsupported(self):
+        assembly = self.transloadit.new_assembly()
+        with self.assertRaisesRegex(TypeError, "add_file"):
+            assembly.add_stream(iter([b"a"]), "a.txt")
+        with self.assertRaises(TypeError):
+            assembly.add_file(sources.StreamSource(iter([b"a"]), "a.txt"))
+        self.assertEqual(assembly.files, {})
@@ -0,0 +1,181 @@
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+import urllib.parse
+
+from .server import StandInServer, TusStandIn
+from transloadit import batch, cli
+from transloadit.client import Transloadit
+
+
+class BatchRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.directory.name, "checkpoint.sqlite")
+        self.server = StandInServer().__enter__()
+        self.tus = TusStandIn(self.server)
+        self.transloadit = Transloadit("key", "secret", service=self.server.url)
+        self.transloadit.poller.interval = 0.01
+        self.assemblies = {}
+        self.failing = set()
+        self.lock = threading.Lock()
+        self.server.route("POST", "/assemblies", self._create)
+        self.server.route("GET", r"/assemblies/(\w+)", self._status)
+
+    def tearDown(self):
+        self.transloadit.close()
+        self.server.__exit__(None, None, None)
+        self.directory.cleanup()
+
+    def _create(self, request):
+        params = json.loads(urllib.parse.parse_qs(request.body.decode())["params"][0])
+        with self.lock:
+            assembly_id = f"a{len(self.assemblies)}"
+            self.assemblies[assembly_id] = params
+        return 200, {}, json.dumps(
+            {
+                "ok": "ASSEMBLY_UPLOADING",
+                "assembly_ssl_url": f"{self.server.url}/assemblies/{assembly_id}",
+                "tus_url": self.tus.url,
+            }
+        )
+
+    def _status(self, request):
+        assembly_id = request.path.rsplit("/", 1)[-1]
+        fields = self.assemblies.get(assembly_id, {}).get("fields")
+        if fields and fields.get("name") in self.failing:
+            return 200, {}, json.dumps({"error": "FILE_FILTER_DECLINED_FILE"})
+        return 200, {}, json.dumps({"ok": "ASSEMBLY_COMPLETED", "fields": fields})
+
+    def _write_files(self, count):
+        paths = []
+        for i in range(count):
+            paths.append(os.path.join(self.directory.name, f"{i}.txt"))
+            with open(paths[-1], "wb") as fs:
+                fs.write(b"data %d" % i)
+        return paths
+
+    def _states(self):
+        with contextlib.closing(sqlite3.connect(self.checkpoint)) as connection:
+            return dict(connection.execute("SELECT key, state FROM batch_items"))
+
+    def test_run(self):
+        paths = self._write_files(5)
+
+        with batch.BatchRunner(
+            self.transloadit, self.checkpoint, template_id="tpl", max_in_flight=2
+        ) as runner:
+            self.assertEqual(runner.add(batch.items_from_glob(self.pattern)), 5)
+            summary = runner.run()
+
+        self.assertEqual(self._states(), {path: batch.DONE for path in paths})
+        self.assertEqual(summary.counts, {batch.DONE: 5})
+        self.assertEqual(summary.processed, 5)
+        self.assertEqual(len(summary.latencies), 5)
+        self.assertIsNotNone(summary.percentile(95))
+        self.assertIn("5 done", str(summary))
+        self.assertEqual({params["template_id"] for params in self.assemblies.values()}, {"tpl"})
+        self.assertEqual(len(self.tus.completed()), 5)
+
+    @property
+    def pattern(self):
+        return os.path.join(self.directory.name, "*.txt")
+
+    def test_resume(self):
+        paths = self._write_files(3)
+        with batch.BatchRunner(self.transloadit, self.checkpoint) as runner:
+            runner.add(batch.items_from_glob(self.pattern))
+        self.assemblies["old"] = {}
+        with contextlib.closing(sqlite3.connect(self.checkpoint)) as connection, connection:
+            connection.execute(
+                "UPDATE batch_items SET state = ? WHERE key = ?", (batch.DONE, paths[0])
+            )
+            connection.execute(
+                "UPDATE batch_items SET state = ?, assembly_url = ? WHERE key = ?",
+                (batch.PROCESSING, f"{self.server.url}/assemblies/old", paths[1]),
+            )
+
+        with batch.BatchRunner(self.transloadit, self.checkpoint) as runner:
+            self.assertEqual(runner.add(batch.items_from_glob(self.pattern)), 0)
+            summary = runner.run()
+
+        self.assertEqual(summary.processed, 2)
+        self.assertEqual(self._states(), {path: batch.DONE for path in paths})
+        # only the pending item gets a new assembly, the processing one is polled again.
+        self.assertEqual(len(self.assemblies), 2)
+        self.assertEqual(
+            [upload["data"] for upload in self.tus.completed()], [b"data 2"]
+        )
+
+    def test_failures(self):
+        manifest = os.path.join(self.directory.name, "manifest.jsonl")
+        paths = self._write_files(2)
+        with open(manifest, "w") as fs:
+            fs.write(json.dumps({"path": paths[0], "fields": {"name": "ok"}, "id": 1}) + "\n\n")
+            fs.write(json.dumps({"path": paths[1], "fields": {"name": "bad"}}) + "\n")
+            fs.write(json.dumps({"path": "missing.txt", "id": "missing"}) + "\n")
+        self.failing.add("bad")
+
+        with batch.BatchRunner(self.transloadit, self.checkpoint) as runner:
+            runner.add(batch.items_from_manifest(manifest))
+            summary = runner.run()
+            self.assertEqual(summary.failed, 2)
+            self.assertEqual(
+                self._states(),
+                {"1": batch.DONE, paths[1]: batch.FAILED, "missing": batch.FAILED},
+            )
+
+            self.failing.clear()
+            self.assertEqual(runner.run().processed, 0)
+            summary = runner.run(retry_failed=True)
+
+        self.assertEqual(summary.processed, 1)
+        self.assertEqual(summary.counts, {batch.DONE: 2, batch.FAILED: 1})
+        self.assertEqual(
+            sorted(params["fields"]["name"] for params in self.assemblies.values()),
+            ["bad", "bad", "ok"],
+        )
+
+    def test_invalid_manifest(self):
+        manifest = os.path.join(self.directory.name, "manifest.jsonl")
+        with open(manifest, "w") as fs:
+            fs.write('{"fields": {}}\n')
+        with self.assertRaisesRegex(ValueError, "line 1"):
+            list(batch.items_from_manifest(manifest))
+
+    def test_cli(self):
+        self._write_files(2)
+        output = io.StringIO()
+        argv = [
+            "batch",
+            "--glob",
+            self.pattern,
+            "--template",
+            "tpl",
+            "--checkpoint",
+            self.checkpoint,
+            "--key",
+            "key",
+            "--secret",
+            "secret",
+            "--service",
+            self.server.url,
+        ]
+
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(cli.main(argv), 0)
+            self.assertEqual(cli.main(argv), 0)
+
+        self.assertIn("added 2 new items", output.getvalue())
+        self.assertIn("added 0 new items", output.getvalue())
+        self.assertIn("2 done, 0 failed", output.getvalue())
+        self.assertEqual(len(self.assemblies), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,20 @@
+import io
 import unittest
 from unittest import mock
 import json
 import os
 import platform
 import subprocess
+import tempfile
+import threading
 import time
 import urllib.parse
 
 import requests_mock
+from tusclient.exceptions import TusUploadFailed
 
 from . import request_body_matcher
+from .server import StandInServer, TusStandIn
 from transloadit.client import Transloadit
 
 
@@ -72,6 +77,23 @@ class ClientTest(unittest.TestCase):
         self.assertEqual(response.data["ok"], "ASSEMBLY_COMPLETED")
         self.assertEqual(response.data["assembly_id"], "abcdef12345")
 
+    def test_context_manager_closes_session(self):
+        with Transloadit("key", "secret", pool_maxsize=20) as client:
+            session = client.request.session
+            self.assertEqual(client.request.pool_maxsize, 20)
+        self.assertIsNone(client.request._session)
+        self.assertIsNot(client.request.session, session)
+
+    def test_poller_options(self):
+        with Transloadit(
+            "key", "secret", poller_options={"interval": 5, "stream_updates": True}
+        ) as client:
+            self.assertEqual(client.poller.interval, 5)
+            self.assertTrue(client.poller.stream_updates)
+            self.assertEqual(self.transloadit.poller.interval, 1)
+            self.assertIsNot(client._poller_lock, self.transloadit._poller_lock)
+        self.transloadit.close()
+
     @requests_mock.Mocker()
     def test_list_assemblies(self, mock):
         url = f"{self.transloadit.service}/assemblies"
@@ -274,3 +296,118 @@ class ClientTest(unittest.TestCase):
         # For parity test, set the exact expiry time to match Node.js
         params['expire_at_ms'] = expiry
         self.assert_parity_with_node(url, params)
+
+
+class ProcessManyTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.tus = TusStandIn(self.server)
+        self.transloadit = Transloadit(
+            "key", "secret", service=self.server.url, poller_options={"interval": 0.01}
+        )
+        self.assemblies = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server.route("POST", "/assemblies", self._create)
+        self.server.route("GET", r"/assemblies/(\w+)", self._status)
+
+    def tearDown(self):
+        self.transloadit.close()
+        self.server.__exit__(None, None, None)
+
+    def _create(self, request):
+        params = json.loads(urllib.parse.parse_qs(request.body.decode())["params"][0])
+        with self.lock:
+            assembly_id = f"a{len(self.assemblies)}"
+            self.assemblies[assembly_id] = params
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return 200, {}, json.dumps(
+            {
+                "ok": "ASSEMBLY_UPLOADING",
+                "assembly_ssl_url": f"{self.server.url}/assemblies/{assembly_id}",
+                "tus_url": self.tus.url,
+            }
+        )
+
+    def _status(self, request):
+        assembly_id = request.path.rsplit("/", 1)[-1]
+        with self.lock:
+            self.in_flight -= 1
+        return 200, {}, json.dumps(
+            {"ok": "ASSEMBLY_COMPLETED", "fields": self.assemblies[assembly_id]["fields"]}
+        )
+
+    def _inputs(self, count):
+        for i in range(count):
+            stream = io.BytesIO(b"x" * (i + 1))
+            stream.name = f"{i}.bin"
+            self.pulled = i + 1
+            yield stream
+
+    def test_process_many(self):
+        results = self.transloadit.process_many(
+            self._inputs(20),
+            template_id="tpl",
+            fields_fn=lambda stream: {"name": stream.name},
+            max_in_flight=3,
+        )
+
+        processed = {}
+        for stream, response in results:
+            self.assertLessEqual(self.pulled - len(processed), 3)
+            processed[stream.name] = response.data["fields"]["name"]
+        self.assertEqual(len(processed), 20)
+        self.assertTrue(all(name == value for name, value in processed.items()))
+        self.assertLessEqual(self.max_in_flight, 3)
+        self.assertEqual({params["template_id"] for params in self.assemblies.values()}, {"tpl"})
+        self.assertEqual(len(self.tus.completed()), 20)
+
+    def test_paths_are_opened_and_closed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for i in range(3):
+                paths.append(os.path.join(directory, f"{i}.txt"))
+                with open(paths[-1], "wb") as fs:
+                    fs.write(b"data %d" % i)
+
+            results = list(self.transloadit.process_many(paths, params={"fields": {}}))
+
+        self.assertEqual(sorted(path for path, _ in results), paths)
+        self.assertEqual(
+            sorted(upload["data"] for upload in self.tus.completed()),
+            [b"data 0", b"data 1", b"data 2"],
+        )
+
+    def test_return_exceptions(self):
+        self.server.route("PATCH", r"/resumable/files/u1", lambda request: (500, {}, ""))
+        inputs = list(self._inputs(3))
+        results = dict(
+            self.transloadit.process_many(
+                inputs, params={"fields": {}}, return_exceptions=True, retries=0
+            )
+        )
+
+        self.assertIsInstance(results[inputs[1]], TusUploadFailed)
+        self.assertEqual(results[inputs[0]].data["ok"], "ASSEMBLY_COMPLETED")
+
+    def test_errors_are_raised(self):
+        self.server.route("PATCH", r"/resumable/files/(\w+)", lambda request: (500, {}, ""))
+        with self.assertRaises(TusUploadFailed):
+            list(self.transloadit.process_many(self._inputs(3), params={"fields": {}}, retries=0))
+
+    def test_submit_input(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "a.txt")
+            with open(path, "wb") as fs:
+                fs.write(b"data")
+            future = self.transloadit.submit_input(
+                path, "tpl", fields={"name": "a"}, params={"steps": {}}
+            )
+            response = future.result(timeout=5)
+
+        self.assertEqual(response.data["fields"], {"name": "a"})
+        self.assertEqual(self.assemblies["a0"]["template_id"], "tpl")
+        self.assertEqual(self.assemblies["a0"]["steps"], {})
+        self.assertEqual(self.tus.completed()[0]["data"], b"data")
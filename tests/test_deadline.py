@@ -0,0 +1,232 @@
+import json
+import unittest
+from unittest import mock
+
+import requests
+import requests_mock
+
+from .server import StandInServer
+from .test_assembly import StandInTestCase, _named_stream
+from transloadit import deadline, ratelimit, uploader
+from transloadit.async_client import AsyncTransloadit
+from transloadit.client import Transloadit
+
+
+class DeadlineTest(unittest.TestCase):
+    @mock.patch("transloadit.deadline.monotonic")
+    def test_budget(self, monotonic):
+        monotonic.return_value = 100
+        budget = deadline.Deadline(30)
+        monotonic.return_value = 105
+
+        self.assertEqual(budget.remaining(), 25)
+        self.assertEqual(budget.timeout(10, 60), (10, 25))
+        self.assertEqual(budget.timeout(10), (10, 25))
+        budget.check(20)
+        with self.assertRaises(deadline.DeadlineExceeded):
+            budget.check(25)
+
+        monotonic.return_value = 130
+        self.assertTrue(budget.expired())
+        with self.assertRaises(deadline.DeadlineExceeded):
+            budget.timeout(10, 60)
+
+    def test_from_timeout(self):
+        budget = deadline.Deadline(5)
+        self.assertIs(deadline.from_timeout(budget), budget)
+        self.assertIsNone(deadline.from_timeout(None))
+        self.assertIsInstance(deadline.from_timeout(5), deadline.Deadline)
+
+
+@mock.patch("transloadit.request.sleep")
+class RequestDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.transloadit = Transloadit("key", "secret")
+        self.url = "https://api2.transloadit.com/assemblies/abc"
+
+    def test_timeouts(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.get(self.url, json={"ok": "ASSEMBLY_EXECUTING"})
+            self.transloadit.get_assembly(assembly_id="abc")
+            self.assertEqual(m.last_request.timeout, (10, 60))
+
+            self.transloadit.get_assembly(assembly_id="abc", timeout=5)
+            connect, read = m.last_request.timeout
+            self.assertTrue(4 < connect == read <= 5)
+
+    def test_no_retry_past_deadline(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.get(self.url, status_code=503, headers={"Retry-After": "30"}, json={})
+            response = self.transloadit.get_assembly(assembly_id="abc", timeout=5)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(m.call_count, 1)
+        sleep.assert_not_called()
+
+    def test_timeout_after_deadline(self, sleep):
+        budget = deadline.Deadline(5)
+
+        def expire(request, context):
+            budget.expires = 0
+            raise requests.exceptions.ReadTimeout()
+
+        with requests_mock.Mocker() as m:
+            m.get(self.url, text=expire)
+            with self.assertRaises(deadline.DeadlineExceeded):
+                self.transloadit.get_assembly(assembly_id="abc", timeout=budget)
+        self.assertEqual(m.call_count, 1)
+
+    def test_rate_limited_past_deadline(self, sleep):
+        self.transloadit.rate_limiter = ratelimit.RateLimiter(status_rate=0.1, burst=1)
+        with requests_mock.Mocker() as m, mock.patch("transloadit.ratelimit.sleep") as wait:
+            m.get(self.url, json={"ok": "ASSEMBLY_EXECUTING"})
+            self.transloadit.get_assembly(assembly_id="abc", timeout=5)
+            for _ in range(2):
+                # the next token is 10 seconds away, and is not taken.
+                with self.assertRaises(deadline.DeadlineExceeded):
+                    self.transloadit.get_assembly(assembly_id="abc", timeout=5)
+            self.transloadit.get_assembly(assembly_id="abc", timeout=15)
+
+        self.assertEqual(m.call_count, 2)
+        wait.assert_called_once()
+        self.assertTrue(9 < wait.call_args.args[0] <= 10)
+
+
+class AssemblyDeadlineTest(StandInTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server.json("GET", "/assemblies/abc", json.dumps({"ok": "ASSEMBLY_EXECUTING"}))
+        self.server.json("DELETE", "/assemblies/abc", json.dumps({"ok": "ASSEMBLY_CANCELED"}))
+
+    def _methods(self):
+        return [request.method for request in self.server.requests]
+
+    def test_wait_is_bounded(self):
+        statuses = iter([{"ok": "ASSEMBLY_UPLOADING"}])
+        self.server.route(
+            "GET",
+            "/assemblies/abc",
+            lambda request: (200, {}, json.dumps(next(statuses, {"ok": "ASSEMBLY_EXECUTING"}))),
+        )
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("a.png", b"a" * 100), "a")
+
+        with self.assertRaises(deadline.DeadlineExceeded) as raised:
+            assembly.create(wait=True, poll_interval=0.05, timeout=0.5)
+
+        # the error carries the last polled status, not the one of the creation.
+        self.assertEqual(raised.exception.response.data["ok"], "ASSEMBLY_EXECUTING")
+        self.assertEqual(len(self.tus.completed()), 1)
+        self.assertIn("GET", self._methods())
+        self.assertNotIn("DELETE", self._methods())
+
+    def test_cancel_on_timeout(self):
+        assembly = self.transloadit.new_assembly()
+        assembly.add_file(_named_stream("a.png", b"a" * 100), "a")
+
+        with mock.patch("transloadit.assembly.sleep") as sleep:
+            with self.assertRaises(deadline.DeadlineExceeded) as raised:
+                # the next poll would end after the deadline, so the call stops right away.
+                assembly.create(wait=True, poll_interval=10, timeout=5, cancel_on_timeout=True)
+
+        sleep.assert_not_called()
+        self.assertEqual(raised.exception.response.data["ok"], "ASSEMBLY_CANCELED")
+        self.assertEqual(self._methods()[-1], "DELETE")
+
+    def test_upload_stops_between_chunks(self):
+        budget = deadline.Deadline(60)
+
+        def expire(size):
+            budget.expires = 0
+
+        tus_uploader = uploader.Uploader(
+            self.transloadit.request.session,
+            self.tus.url,
+            _named_stream("a.png", b"a" * 1000),
+            chunk_size=100,
+            on_progress=expire,
+            deadline=budget,
+        )
+        with self.assertRaises(deadline.DeadlineExceeded):
+            tus_uploader.upload()
+
+        self.assertEqual(tus_uploader.offset, 100)
+
+
+class AsyncDeadlineTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.transloadit = AsyncTransloadit("key", "secret", service=self.server.url)
+        self.server.json(
+            "POST",
+            "/assemblies",
+            json.dumps(
+                {
+                    "ok": "ASSEMBLY_EXECUTING",
+                    "assembly_ssl_url": f"{self.server.url}/assemblies/abc",
+                }
+            ),
+        )
+        self.server.json("GET", "/assemblies/abc", json.dumps({"ok": "ASSEMBLY_EXECUTING"}))
+        self.server.json("DELETE", "/assemblies/abc", json.dumps({"ok": "ASSEMBLY_CANCELED"}))
+
+    async def asyncTearDown(self):
+        await self.transloadit.close()
+        self.server.__exit__(None, None, None)
+
+    async def test_cancel_on_timeout(self):
+        assembly = self.transloadit.new_assembly()
+
+        with self.assertRaises(deadline.DeadlineExceeded) as raised:
+            await assembly.create(
+                wait=True, poll_interval=0.05, timeout=0.3, cancel_on_timeout=True
+            )
+
+        self.assertEqual(raised.exception.response.data["ok"], "ASSEMBLY_CANCELED")
+        self.assertEqual(self.server.requests[-1].method, "DELETE")
+
+    async def test_last_polled_status(self):
+        self.server.json(
+            "POST",
+            "/assemblies",
+            json.dumps(
+                {
+                    "ok": "ASSEMBLY_UPLOADING",
+                    "assembly_ssl_url": f"{self.server.url}/assemblies/abc",
+                }
+            ),
+        )
+
+        with self.assertRaises(deadline.DeadlineExceeded) as raised:
+            await self.transloadit.new_assembly().create(
+                wait=True, poll_interval=0.05, timeout=0.3
+            )
+
+        self.assertEqual(raised.exception.response.data["ok"], "ASSEMBLY_EXECUTING")
+
+    async def test_rate_limited_past_deadline(self):
+        self.transloadit.rate_limiter = ratelimit.RateLimiter(status_rate=0.1, burst=1)
+        await self.transloadit.get_assembly(assembly_id="abc", timeout=5)
+
+        with self.assertRaises(deadline.DeadlineExceeded):
+            await self.transloadit.get_assembly(assembly_id="abc", timeout=5)
+        self.assertEqual(len(self.server.requests), 1)
+
+    async def test_upload_timeouts(self):
+        session = self.transloadit.request.session
+        with mock.patch.object(session, "request", wraps=session.request) as request:
+            for budget in (None, deadline.Deadline(30)):
+                await self.transloadit.request.post(
+                    "/assemblies", files={"a": _named_stream("a.png", b"a" * 100)}, deadline=budget
+                )
+
+        # only the waits for the server are bounded, not how long the files take to send.
+        unbounded, bounded = (call.kwargs["timeout"] for call in request.call_args_list)
+        self.assertIsNone(unbounded.total)
+        self.assertEqual((unbounded.connect, unbounded.sock_read), (10, 60))
+        self.assertTrue(29 < bounded.total <= 30)
+        self.assertTrue(29 < bounded.sock_read <= 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
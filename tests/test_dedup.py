@@ -0,0 +1,147 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from .test_assembly import StandInTestCase, _named_stream
+from transloadit import dedup
+
+
+class MemoryDedupCacheTest(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = dedup.MemoryDedupCache(max_entries=2)
+        cache.set("a", {"ok": "a"})
+        cache.set("b", {"ok": "b"})
+        self.assertEqual(cache.get("a"), {"ok": "a"})
+        cache.set("c", {"ok": "c"})
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), {"ok": "a"})
+        self.assertEqual(cache.get("c"), {"ok": "c"})
+
+    @mock.patch("transloadit.dedup.time.time")
+    def test_ttl(self, time):
+        cache = dedup.MemoryDedupCache(ttl=10)
+        time.return_value = 100
+        cache.set("a", {"ok": "a"})
+        time.return_value = 109
+        self.assertEqual(cache.get("a"), {"ok": "a"})
+        time.return_value = 110
+        self.assertIsNone(cache.get("a"))
+
+
+class SQLiteDedupCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "dedup.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @mock.patch("transloadit.dedup.time.time")
+    def test_eviction(self, time):
+        time.return_value = 100
+        cache = dedup.SQLiteDedupCache(self.path, max_entries=2, ttl=50)
+        cache.set("a", {"ok": "a"})
+        time.return_value = 101
+        cache.set("b", {"ok": "b"})
+        time.return_value = 102
+        self.assertEqual(cache.get("a"), {"ok": "a"})
+        time.return_value = 103
+        cache.set("c", {"ok": "c"})
+        cache.close()
+
+        cache = dedup.SQLiteDedupCache(self.path, max_entries=2, ttl=50)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), {"ok": "c"})
+        time.return_value = 150
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), {"ok": "c"})
+        cache.close()
+
+
+class DedupAssemblyTest(StandInTestCase):
+    extensions = ("creation", "creation-defer-length")
+
+    def setUp(self):
+        super().setUp()
+        self.server.json(
+            "GET",
+            "/assemblies/abc",
+            json.dumps({"ok": "ASSEMBLY_COMPLETED", "results": {"thumb": [{"id": "t"}]}}),
+        )
+        self.cache = dedup.MemoryDedupCache()
+
+    def _create(self, data, fields=None, stream=False):
+        assembly = self.transloadit.new_assembly({"fields": fields or {}})
+        assembly.add_step("thumb", "/image/resize", {"width": 10})
+        if stream:
+            assembly.add_stream(iter([data]), "a.png", "a")
+        else:
+            assembly.add_file(_named_stream("a.png", data), "a")
+        return assembly.create(wait=True, poll_interval=0.01, dedup_cache=self.cache)
+
+    def _assemblies_created(self):
+        return len(
+            [
+                request
+                for request in self.server.requests
+                if request.method == "POST" and request.path == "/assemblies"
+            ]
+        )
+
+    def test_identical_submission_is_cached(self):
+        first = self._create(b"a" * 1000)
+        requests = len(self.server.requests)
+
+        second = self._create(b"a" * 1000)
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second.data["results"]["thumb"], [{"id": "t"}])
+        self.assertEqual(len(self.server.requests), requests)
+
+    def test_different_content_or_fields(self):
+        self._create(b"a" * 1000)
+        self._create(b"b" * 1000)
+        self._create(b"a" * 1000, fields={"user": 1})
+
+        self.assertEqual(self._assemblies_created(), 3)
+
+    def test_stream_is_hashed_while_uploaded(self):
+        self._create(b"a" * 1000, stream=True)
+        self._create(b"a" * 1000)
+
+        self.assertEqual(self._assemblies_created(), 1)
+
+    def test_failed_assembly_is_not_cached(self):
+        self.server.json(
+            "GET", "/assemblies/abc", json.dumps({"error": "FILE_FILTER_DECLINED_FILE"})
+        )
+        self._create(b"a" * 1000)
+        self._create(b"a" * 1000)
+
+        self.assertEqual(self._assemblies_created(), 2)
+
+    def test_content_hash_keeps_position(self):
+        stream = io.BytesIO(b"abcdef")
+        stream.seek(3)
+        self.assertEqual(dedup.content_hash(stream), dedup.content_hash(io.BytesIO(b"abcdef")))
+        self.assertEqual(stream.tell(), 3)
+
+    def test_content_hash_of_text_streams(self):
+        with open("LICENSE", "rb") as fs:
+            expected = dedup.content_hash(fs)
+        with open("LICENSE") as fs:
+            fs.readline()
+            self.assertEqual(dedup.content_hash(fs), expected)
+            # the stream carries on from the second line.
+            self.assertEqual(fs.readline(), "\n")
+        self.assertEqual(
+            dedup.content_hash(io.StringIO("abc")), dedup.content_hash(io.BytesIO(b"abc"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
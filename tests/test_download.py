@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+
+from .server import FileStandIn, StandInServer
+from transloadit import download
+from transloadit.async_request import BufferedResponse
+from transloadit.client import Transloadit
+from transloadit.response import Response
+
+
+def _response(data):
+    return Response(BufferedResponse(200, {}, json.dumps(data).encode()))
+
+
+def _result(files, name, **extra):
+    result = {
+        "id": name.split(".")[0],
+        "name": name,
+        "ssl_url": files.url(name),
+        "size": len(files.files[name]),
+        "md5hash": hashlib.md5(files.files[name]).hexdigest(),
+    }
+    result.update(extra)
+    return result
+
+
+class DownloadResultsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = StandInServer().__enter__()
+        self.files = FileStandIn(
+            self.server,
+            {
+                "a.jpg": os.urandom(3000),
+                "b.jpg": os.urandom(100),
+                "c.mp4": os.urandom(5000),
+            },
+        )
+        self.transloadit = Transloadit("key", "secret", service=self.server.url)
+        self.response = _response(
+            {
+                "ok": "ASSEMBLY_COMPLETED",
+                "results": {
+                    "thumbs": [
+                        _result(self.files, "a.jpg"),
+                        _result(self.files, "b.jpg"),
+                        _result(self.files, "b.jpg", id="b2"),
+                    ],
+                    "video": [_result(self.files, "c.mp4")],
+                },
+            }
+        )
+
+    def tearDown(self):
+        self.transloadit.close()
+        self.server.__exit__(None, None, None)
+        self.directory.cleanup()
+
+    def _path(self, *parts):
+        return os.path.join(self.directory.name, *parts)
+
+    def _read(self, *parts):
+        with open(self._path(*parts), "rb") as fs:
+            return fs.read()
+
+    def test_download_results(self):
+        paths = self.transloadit.download_results(
+            self.response, self.directory.name, max_workers=2
+        )
+
+        self.assertEqual(
+            paths,
+            {
+                "thumbs": [
+                    self._path("thumbs", "a.jpg"),
+                    self._path("thumbs", "b.jpg"),
+                    self._path("thumbs", "b2_b.jpg"),
+                ],
+                "video": [self._path("video", "c.mp4")],
+            },
+        )
+        self.assertEqual(self._read("thumbs", "a.jpg"), self.files.files["a.jpg"])
+        self.assertEqual(self._read("thumbs", "b2_b.jpg"), self.files.files["b.jpg"])
+        self.assertEqual(self._read("video", "c.mp4"), self.files.files["c.mp4"])
+
+        # finished files are not downloaded again.
+        requests = len(self.files.ranges)
+        self.transloadit.download_results(self.response, self.directory.name, steps=["video"])
+        self.assertEqual(len(self.files.ranges), requests)
+
+    def test_resume_dropped_connection(self):
+        self.files.drop_after["c.mp4"] = 2000
+
+        download.download_results(
+            self.transloadit, self.response, self.directory.name, steps=["video"], block_size=512
+        )
+
+        self.assertEqual(self._read("video", "c.mp4"), self.files.files["c.mp4"])
+        self.assertEqual(self.files.ranges, [("c.mp4", None), ("c.mp4", "bytes=2000-")])
+        self.assertFalse(os.path.exists(self._path("video", "c.mp4" + download.PARTIAL_SUFFIX)))
+
+    def test_resume_partial_file(self):
+        os.makedirs(self._path("video"))
+        with open(self._path("video", "c.mp4.part"), "wb") as fs:
+            fs.write(self.files.files["c.mp4"][:1234])
+
+        self.transloadit.download_results(self.response, self.directory.name, steps=["video"])
+
+        self.assertEqual(self._read("video", "c.mp4"), self.files.files["c.mp4"])
+        self.assertEqual(self.files.ranges, [("c.mp4", "bytes=1234-")])
+
+    def test_verification(self):
+        self.response.data["results"]["video"][0]["md5hash"] = "0" * 32
+
+        with self.assertRaises(download.DownloadError) as context:
+            self.transloadit.download_results(self.response, self.directory.name)
+
+        error = context.exception.errors[self._path("video", "c.mp4")]
+        self.assertIsInstance(error, download.VerificationError)
+        self.assertFalse(os.path.exists(self._path("video", "c.mp4")))
+        self.assertFalse(os.path.exists(self._path("video", "c.mp4.part")))
+
+        self.transloadit.download_results(self.response, self.directory.name, verify=False)
+        self.assertEqual(self._read("video", "c.mp4"), self.files.files["c.mp4"])
+
+    def test_nothing_is_downloaded_outside_dest_dir(self):
+        self.response.data["results"][".."] = [_result(self.files, "a.jpg")]
+        with self.assertRaises(ValueError):
+            self.transloadit.download_results(self.response, self._path("out"))
+
+        self.assertEqual(self.files.ranges, [])
+        self.assertFalse(os.path.exists(self._path("a.jpg")))
+
+
+
+class ResultPathsTest(unittest.TestCase):
+    def test_names_stay_in_their_step(self):
+        results = {
+            "thumbs/../..": [
+                {"id": "a", "name": "../../a.jpg"},
+                {"id": "../b", "name": ".."},
+                {"id": "..", "name": "c\\..\\..\\c.jpg"},
+            ],
+        }
+        paths = [path for _, _, path in download.result_paths(results, "out")]
+
+        step = os.path.join("out", "thumbs_.._..")
+        self.assertEqual(paths, [os.path.join(step, name) for name in ("a.jpg", ".._b", "c.jpg")])
+
+    def test_paths_outside_dest_dir_are_rejected(self):
+        results = {"..": [{"id": "a", "name": "a.jpg"}]}
+        with self.assertRaises(ValueError):
+            list(download.result_paths(results, "out"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import threading
+import unittest
+
+import requests
+
+from .server import StandInServer
+from transloadit.events import (
+    Event,
+    apply_event,
+    parse_events,
+    stream_events,
+    wait_for_final_event,
+)
+
+
+class ParseEventsTest(unittest.TestCase):
+    def test_parse(self):
+        lines = [
+            b": heartbeat\r\n",
+            b"event: assembly_upload_finished\r\n",
+            b'data: {"name":\r\n',
+            b'data: "a.png"}\r\n',
+            b"id: 1\r\n",
+            b"\r\n",
+            "data:plain",
+            "",
+            "",
+        ]
+        events = list(parse_events(lines))
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0].name, "assembly_upload_finished")
+        self.assertEqual(events[0].data, '{"name":\n"a.png"}')
+        self.assertEqual(events[0].json(), {"name": "a.png"})
+        self.assertEqual(events[0].id, "1")
+        self.assertEqual((events[1].name, events[1].data), ("message", "plain"))
+
+    def test_incomplete_event_is_not_yielded(self):
+        self.assertEqual(list(parse_events(["event: assembly_finished"])), [])
+
+    def test_apply_event(self):
+        status = {"ok": "ASSEMBLY_UPLOADING", "results": {"thumb": [{"id": "t1"}]}}
+        status = apply_event(status, Event("assembly_uploading_finished", ""))
+        status = apply_event(status, Event("assembly_result_finished", '["thumb", {"id": "t2"}]'))
+        status = apply_event(status, Event("assembly_result_finished", '{"bad": "data"}'))
+
+        self.assertEqual(status["ok"], "ASSEMBLY_EXECUTING")
+        self.assertEqual(status["results"], {"thumb": [{"id": "t1"}, {"id": "t2"}]})
+
+
+class StreamEventsTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.session = requests.Session()
+        self.url = f"{self.server.url}/events"
+
+    def tearDown(self):
+        self.session.close()
+        self.server.__exit__(None, None, None)
+
+    def _serve(self, blocks):
+        self.server.route(
+            "GET", "/events", lambda request: (200, {"Content-Type": "text/event-stream"}, blocks)
+        )
+
+    def test_events_arrive_incrementally(self):
+        received = threading.Event()
+
+        def blocks():
+            yield "event: assembly_uploading\ndata: {}\n\n"
+            self.assertTrue(received.wait(5))
+            yield "event: assembly_finished\ndata: {}\n\n"
+
+        self._serve(blocks())
+        names = []
+        for event in stream_events(self.session, self.url):
+            names.append(event.name)
+            received.set()
+        self.assertEqual(names, ["assembly_uploading", "assembly_finished"])
+        self.assertEqual(self.server.requests[0].headers["Accept"], "text/event-stream")
+
+    def test_wait_for_final_event(self):
+        self._serve(iter(["event: assembly_uploading\n\n", "event: assembly_error\n\n"]))
+        self.assertEqual(wait_for_final_event(self.session, self.url).name, "assembly_error")
+
+    def test_dropped_stream(self):
+        def blocks():
+            yield "event: assembly_uploading\n\n"
+            raise ConnectionError
+
+        self._serve(blocks())
+        self.assertIsNone(wait_for_final_event(self.session, self.url))
+
+    def test_stopped_stream(self):
+        self._serve(iter([": heartbeat\n\n", "event: assembly_finished\n\n"]))
+        self.assertEqual(list(stream_events(self.session, self.url, stopped=lambda: True)), [])
+
+    def test_unavailable_stream(self):
+        self.assertIsNone(wait_for_final_event(self.session, f"{self.server.url}/missing"))
@@ -0,0 +1,140 @@
+import itertools
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from .server import StandInServer
+from transloadit import hedge
+from transloadit.async_client import AsyncTransloadit
+from transloadit.client import Transloadit
+
+
+class HedgePolicyTest(unittest.TestCase):
+    def test_percentile_delay(self):
+        policy = hedge.HedgePolicy(min_samples=10)
+        for latency in range(1, 10):
+            policy.record(latency / 10)
+        self.assertIsNone(policy.start())
+
+        policy.record(1.0)
+        self.assertEqual(policy.start(), 1.0)
+        policy.percentile = 50
+        self.assertEqual(policy.start(), 0.5)
+        self.assertEqual(hedge.HedgePolicy(delay=0.2).start(), 0.2)
+
+    def test_budget(self):
+        policy = hedge.HedgePolicy(delay=0.1, budget=0.05)
+        hedges = 0
+        for _ in range(100):
+            policy.start()
+            hedges += policy.try_hedge()
+        self.assertEqual(hedges, 5)
+        self.assertEqual(policy.counters, {"requests": 100, "hedges": 5})
+
+
+def _slow_first_response(server):
+    """
+    Route GET /assemblies/abc so that its first request is only answered once the returned
+    event is set, and the later ones right away.
+    """
+    calls = itertools.count()
+    release = threading.Event()
+
+    def respond(request):
+        if next(calls) == 0:
+            release.wait(5)
+            return 200, {}, b'{"ok": "ASSEMBLY_EXECUTING", "slow": true}'
+        return 200, {}, b'{"ok": "ASSEMBLY_EXECUTING"}'
+
+    server.route("GET", "/assemblies/abc", respond)
+    return release
+
+
+class ClientHedgeTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.policy = hedge.HedgePolicy(delay=0.05, budget=1)
+        self.transloadit = Transloadit(
+            "key", "secret", service=self.server.url, hedge_policy=self.policy
+        )
+        self.release = _slow_first_response(self.server)
+
+    def tearDown(self):
+        self.release.set()
+        self.transloadit.close()
+        self.server.__exit__(None, None, None)
+
+    def test_slow_request_is_hedged(self):
+        started = time.monotonic()
+        response = self.transloadit.get_assembly(assembly_id="abc")
+
+        self.assertLess(time.monotonic() - started, 4)
+        self.assertNotIn("slow", response.data)
+        self.assertEqual(self.policy.counters["hedge_wins"], 1)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_budget_exhausted(self):
+        self.policy.budget = 0
+        self.policy.delay = 0.01
+        self.server.routes.pop()
+        self.server.json("GET", "/assemblies/abc", '{"ok": "ASSEMBLY_EXECUTING"}')
+
+        self.transloadit.get_assembly(assembly_id="abc")
+
+        self.assertEqual(self.policy.counters, {"requests": 1})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_busy_threads(self):
+        # the request is sent from the calling thread instead of waiting for a free one.
+        slots = self.transloadit.request._hedge_slots
+        for _ in range(2 * self.transloadit.request.pool_maxsize):
+            slots.acquire()
+        self.release.set()
+
+        response = self.transloadit.get_assembly(assembly_id="abc")
+
+        self.assertIn("slow", response.data)
+        self.assertEqual(self.policy.counters, {"requests": 1})
+
+    def test_closed_executor(self):
+        executor = ThreadPoolExecutor()
+        executor.shutdown()
+        self.release.set()
+        request = self.transloadit.request
+
+        with mock.patch.object(request, "_get_hedge_executor", return_value=executor):
+            response = self.transloadit.get_assembly(assembly_id="abc")
+
+        self.assertIn("slow", response.data)
+        # every thread is free again.
+        for _ in range(2 * request.pool_maxsize):
+            self.assertTrue(request._hedge_slots.acquire(blocking=False))
+
+
+class AsyncClientHedgeTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.policy = hedge.HedgePolicy(delay=0.05, budget=1)
+        self.transloadit = AsyncTransloadit(
+            "key", "secret", service=self.server.url, hedge_policy=self.policy
+        )
+        self.release = _slow_first_response(self.server)
+
+    async def asyncTearDown(self):
+        self.release.set()
+        await self.transloadit.close()
+        self.server.__exit__(None, None, None)
+
+    async def test_slow_request_is_hedged(self):
+        started = time.monotonic()
+        response = await self.transloadit.get_assembly(assembly_id="abc")
+
+        self.assertLess(time.monotonic() - started, 4)
+        self.assertNotIn("slow", response.data)
+        self.assertEqual(self.policy.counters["hedge_wins"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import io
+import unittest
+from email.parser import BytesParser
+
+from .server import StandInServer
+from transloadit.client import Transloadit
+from transloadit.multipart import MultipartEncoder, MultipartReader
+
+
+def _parse(content_type, body):
+    message = BytesParser().parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("ascii") + body
+    )
+    return {
+        part.get_param("name", header="content-disposition"): (
+            part.get_filename(),
+            part.get_payload(decode=True),
+        )
+        for part in message.get_payload()
+    }
+
+
+class MultipartEncoderTest(unittest.TestCase):
+    def test_encode(self):
+        upload = io.BytesIO(b"\x00\x01" * 100000)
+        upload.name = "/tmp/video.mp4"
+        encoder = MultipartEncoder({"params": '{"a": 1}', "signature": "sha384:x"}, {"file": upload})
+
+        body = b"".join(encoder)
+        self.assertEqual(encoder.length, len(body))
+        self.assertEqual(
+            _parse(encoder.content_type, body),
+            {
+                "params": (None, b'{"a": 1}'),
+                "signature": (None, b"sha384:x"),
+                "file": ("video.mp4", b"\x00\x01" * 100000),
+            },
+        )
+
+    def test_reader_reads_in_blocks(self):
+        encoder = MultipartEncoder({"params": "{}"}, {"file": io.BytesIO(b"x" * 1000)}, block_size=64)
+        reader = encoder.body()
+        self.assertIsInstance(reader, MultipartReader)
+        self.assertEqual(len(reader), encoder.length)
+
+        blocks = []
+        while True:
+            block = reader.read(100)
+            if not block:
+                break
+            self.assertLessEqual(len(block), 100)
+            blocks.append(block)
+        self.assertEqual(sum(map(len, blocks)), encoder.length)
+        self.assertIn(b"x" * 1000, b"".join(blocks))
+
+    def test_unknown_length(self):
+        with open("LICENSE") as fs:
+            encoder = MultipartEncoder({}, {"file": fs})
+            self.assertIsNone(encoder.length)
+            body = b"".join(encoder.body())
+
+        with open("LICENSE", "rb") as fs:
+            self.assertEqual(_parse(encoder.content_type, body)["file"], ("LICENSE", fs.read()))
+
+
+class StreamingPostTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.server.json("POST", "/assemblies", '{"ok": "ASSEMBLY_COMPLETED"}')
+        self.transloadit = Transloadit("key", "secret", service=self.server.url)
+
+    def tearDown(self):
+        self.transloadit.close()
+        self.server.__exit__(None, None, None)
+
+    def test_sized_body_is_sent_with_content_length(self):
+        with open("LICENSE", "rb") as fs:
+            self.transloadit.request.post("/assemblies", files={"file": fs})
+            fs.seek(0)
+            content = fs.read()
+
+        (request,) = self.server.requests
+        self.assertEqual(int(request.headers["Content-Length"]), len(request.body))
+        parts = _parse(request.headers["Content-Type"], request.body)
+        self.assertEqual(parts["file"], ("LICENSE", content))
+        self.assertIn("signature", parts)
+
+    def test_unsized_body_is_sent_chunked(self):
+        with open("LICENSE") as fs:
+            self.transloadit.request.post("/assemblies", files={"file": fs})
+
+        (request,) = self.server.requests
+        self.assertEqual(request.headers["Transfer-Encoding"], "chunked")
+        self.assertIn("file", _parse(request.headers["Content-Type"], request.body))
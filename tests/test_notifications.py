@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import hmac
+import io
+import json
+import queue
+import unittest
+from urllib.parse import urlencode
+
+import requests
+
+from transloadit.client import Transloadit
+from transloadit.multipart import MultipartEncoder
+from transloadit.notifications import (
+    InvalidNotification,
+    NotificationHandler,
+    NotificationServer,
+)
+
+
+class NotificationHandlerTest(unittest.TestCase):
+    def setUp(self):
+        self.transloadit = Transloadit("key", "secret")
+        self.notifications = queue.Queue()
+        self.handler = NotificationHandler("secret", queue=self.notifications)
+        self.payload = json.dumps({"ok": "ASSEMBLY_COMPLETED", "assembly_id": "abc"})
+        self.signature = self.transloadit.request._sign_data(self.payload)
+        self.body = urlencode({"transloadit": self.payload, "signature": self.signature})
+        self.content_type = "application/x-www-form-urlencoded"
+
+    def test_verify(self):
+        self.assertTrue(self.handler.verify(self.payload, self.signature))
+        self.assertTrue(self.handler.verify(self.payload.encode(), self.signature))
+        self.assertFalse(self.handler.verify(self.payload + " ", self.signature))
+        self.assertFalse(self.handler.verify(self.payload, self.signature[:-1]))
+        self.assertFalse(self.handler.verify(self.payload, "md5:" + self.signature[7:]))
+
+    def test_verify_legacy_signature(self):
+        digest = hmac.new(b"secret", self.payload.encode(), hashlib.sha1).hexdigest()
+        self.assertFalse(self.handler.verify(self.payload, digest))
+        self.assertFalse(self.handler.verify(self.payload, "sha1:" + digest))
+
+        handler = NotificationHandler("secret", legacy_sha1=True)
+        self.assertTrue(handler.verify(self.payload, digest))
+        self.assertTrue(handler.verify(self.payload, "sha1:" + digest))
+        self.assertTrue(handler.verify(self.payload, self.signature))
+
+    def test_non_ascii_signature(self):
+        self.assertFalse(self.handler.verify(self.payload, "sha384:\u00e9" * 2))
+        body = urlencode({"transloadit": self.payload, "signature": "sha384:\u00e9"})
+        self.assertEqual(
+            self.handler.respond("POST", body.encode(), self.content_type),
+            (403, b"Invalid signature."),
+        )
+
+    def test_handle(self):
+        callbacks = []
+        self.handler.add_callback(callbacks.append)
+
+        notification = self.handler.handle(self.body.encode(), self.content_type)
+
+        self.assertEqual(notification.ok, "ASSEMBLY_COMPLETED")
+        self.assertEqual(notification.assembly_id, "abc")
+        self.assertIsNone(notification.error)
+        self.assertEqual(callbacks, [notification])
+        self.assertIs(self.notifications.get_nowait(), notification)
+
+    def test_handle_multipart(self):
+        encoder = MultipartEncoder({"transloadit": self.payload, "signature": self.signature}, {})
+        notification = self.handler.handle(encoder.body().read(), encoder.content_type)
+        self.assertEqual(notification.assembly_id, "abc")
+
+    def test_invalid_notifications(self):
+        forged = urlencode({"transloadit": self.payload, "signature": "sha384:00"})
+        with self.assertRaises(InvalidNotification) as context:
+            self.handler.handle(forged.encode(), self.content_type)
+        self.assertEqual(context.exception.status, 403)
+
+        with self.assertRaises(InvalidNotification) as context:
+            self.handler.handle(b"transloadit=%7B%7D", self.content_type)
+        self.assertEqual(context.exception.status, 400)
+        self.assertTrue(self.notifications.empty())
+
+    def test_respond(self):
+        self.assertEqual(self.handler.respond("GET", b"", ""), (405, b""))
+        self.assertEqual(self.handler.respond("POST", b"", "")[0], 400)
+        self.assertEqual(
+            self.handler.respond("POST", self.body.encode(), self.content_type), (200, b"OK")
+        )
+
+        def fail(notification):
+            raise RuntimeError
+
+        self.handler.add_callback(fail)
+        with self.assertLogs("transloadit.notifications", "ERROR"):
+            status, _ = self.handler.respond("POST", self.body.encode(), self.content_type)
+        self.assertEqual(status, 500)
+
+    def test_wsgi(self):
+        body = self.body.encode()
+        environ = {
+            "REQUEST_METHOD": "POST",
+            "CONTENT_TYPE": self.content_type,
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body),
+        }
+        statuses = []
+        response = self.handler.wsgi(environ, lambda status, headers: statuses.append(status))
+
+        self.assertEqual(statuses, ["200 OK"])
+        self.assertEqual(b"".join(response), b"OK")
+        self.assertEqual(self.notifications.get_nowait().assembly_id, "abc")
+
+    def test_asgi(self):
+        body = self.body.encode()
+        messages = iter(
+            [
+                {"type": "http.request", "body": body[:10], "more_body": True},
+                {"type": "http.request", "body": body[10:]},
+            ]
+        )
+        sent = []
+
+        async def receive():
+            return next(messages)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "headers": [(b"content-type", self.content_type.encode())],
+        }
+        asyncio.run(self.handler.asgi(scope, receive, send))
+
+        self.assertEqual(sent[0]["status"], 200)
+        self.assertEqual(sent[1]["body"], b"OK")
+        self.assertEqual(self.notifications.get_nowait().assembly_id, "abc")
+
+    def test_server(self):
+        with NotificationServer(self.handler) as server, requests.Session() as session:
+            for _ in range(20):
+                response = session.post(
+                    server.url + "/notify",
+                    data={"transloadit": self.payload, "signature": self.signature},
+                )
+                self.assertEqual(response.status_code, 200)
+            response = session.post(
+                server.url, data={"transloadit": self.payload, "signature": "x"}
+            )
+            self.assertEqual(response.status_code, 403)
+
+        self.assertEqual(self.notifications.qsize(), 20)
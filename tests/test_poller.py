@@ -0,0 +1,179 @@
+import json
+import threading
+import unittest
+
+import requests
+
+from .server import StandInServer
+from transloadit.async_request import BufferedResponse
+from transloadit.client import Transloadit
+from transloadit.poller import StatusPoller, _Watch
+from transloadit.response import Response
+from transloadit.retry import RetryPolicy
+
+
+def _status(data):
+    return Response(BufferedResponse(200, {}, json.dumps(data).encode()))
+
+
+class StatusPollerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.transloadit = Transloadit("key", "secret", service=self.server.url)
+        self.poller = StatusPoller(self.transloadit, interval=0.01, max_interval=0.05)
+
+    def tearDown(self):
+        self.poller.close()
+        self.transloadit.close()
+        self.server.__exit__(None, None, None)
+
+    def _statuses(self, name, *statuses):
+        statuses = iter(statuses)
+        self.server.route(
+            "GET",
+            f"/assemblies/{name}",
+            lambda request: (200, {}, json.dumps(next(statuses, {"ok": "ASSEMBLY_COMPLETED"}))),
+        )
+        return f"{self.server.url}/assemblies/{name}"
+
+    def test_many_assemblies(self):
+        urls = [
+            self._statuses(f"a{i}", *[{"ok": "ASSEMBLY_EXECUTING"}] * i) for i in range(10)
+        ]
+        futures = [self.poller.watch(url) for url in urls]
+
+        for future in futures:
+            self.assertEqual(future.result(timeout=5).data["ok"], "ASSEMBLY_COMPLETED")
+        polls = [request.path for request in self.server.requests]
+        self.assertEqual(polls.count("/assemblies/a3"), 4)
+        schedulers = [
+            thread for thread in threading.enumerate() if thread.name == "transloadit-poller"
+        ]
+        self.assertEqual(len(schedulers), 1)
+
+    def test_same_assembly_is_watched_once(self):
+        url = self._statuses("abc", {"ok": "ASSEMBLY_EXECUTING"})
+        self.assertIs(self.poller.watch(url), self.poller.watch(url))
+
+    def test_callback(self):
+        url = self._statuses("abc", {"ok": "ASSEMBLY_UPLOADING"})
+        done = threading.Event()
+        results = []
+
+        def callback(future):
+            results.append(future.result().data["ok"])
+            done.set()
+
+        self.poller.watch(url, callback=callback)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(results, ["ASSEMBLY_COMPLETED"])
+
+    def test_finished_response_resolves_immediately(self):
+        response = _status({"ok": "ASSEMBLY_CANCELED"})
+        future = self.poller.watch("https://api2.transloadit.com/assemblies/abc", response)
+        self.assertIs(future.result(timeout=0), response)
+        self.assertEqual(self.server.requests, [])
+
+    def test_status_fetching_rate_limit_is_not_final(self):
+        url = self._statuses(
+            "abc",
+            {"error": "ASSEMBLY_STATUS_FETCHING_RATE_LIMIT_REACHED", "info": {"retryIn": 0.01}},
+        )
+        response = self.poller.watch(url).result(timeout=5)
+        self.assertEqual(response.data["ok"], "ASSEMBLY_COMPLETED")
+
+    def test_failed_assembly(self):
+        url = self._statuses("abc", {"error": "INVALID_FILE_META_DATA"})
+        response = self.poller.watch(url).result(timeout=5)
+        self.assertEqual(response.data["error"], "INVALID_FILE_META_DATA")
+
+    def test_request_errors(self):
+        # each failed poll counts once, instead of after the retries of the client.
+        self.transloadit.retry_policy = RetryPolicy(retries=0)
+        self.poller.max_errors = 2
+        future = self.poller.watch("http://127.0.0.1:9/assemblies/abc")
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            future.result(timeout=5)
+
+    def test_unwatch_and_close_cancel_futures(self):
+        self.poller.interval = 60
+        executing = _status({"ok": "ASSEMBLY_EXECUTING"})
+        first = self.poller.watch(f"{self.server.url}/assemblies/a", executing)
+        second = self.poller.watch(f"{self.server.url}/assemblies/b", executing)
+
+        self.poller.unwatch(f"{self.server.url}/assemblies/a")
+        self.assertTrue(first.cancelled())
+        self.poller.close()
+        self.assertTrue(second.cancelled())
+        with self.assertRaises(RuntimeError):
+            self.poller.watch(f"{self.server.url}/assemblies/c")
+
+    def test_bounded_update_streams(self):
+        self.poller.stream_updates = True
+        self.poller.max_streams = 1
+        self.poller.interval = 60
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def first_events():
+            yield "event: assembly_uploading_finished\ndata: {}\n\n"
+            yield 'event: assembly_result_finished\ndata: ["thumb", {"id": "t1"}]\n\n'
+            while not release.wait(0.05):
+                yield ": heartbeat\n\n"
+            yield "event: assembly_finished\ndata: {}\n\n"
+
+        futures = []
+        for name, blocks in (("a", first_events()), ("b", iter(["event: assembly_finished\n\n"]))):
+            url = self._statuses(name)
+            self.server.route(
+                "GET",
+                f"/assemblies/{name}/events",
+                lambda request, blocks=blocks: (200, {}, blocks),
+            )
+            response = _status({"ok": "ASSEMBLY_UPLOADING", "update_stream_url": f"{url}/events"})
+            futures.append(self.poller.watch(url, response))
+
+        first_url = f"{self.server.url}/assemblies/a"
+        for _ in range(100):
+            if "results" in self.poller.status(first_url).data:
+                break
+            release.wait(0.05)
+        status = self.poller.status(first_url).data
+        self.assertEqual(status["ok"], "ASSEMBLY_EXECUTING")
+        self.assertEqual(status["results"], {"thumb": [{"id": "t1"}]})
+        # the second stream waits for the only stream thread.
+        paths = [request.path for request in self.server.requests]
+        self.assertNotIn("/assemblies/b/events", paths)
+
+        release.set()
+        for future in futures:
+            self.assertEqual(future.result(timeout=5).data["ok"], "ASSEMBLY_COMPLETED")
+        names = [thread.name for thread in threading.enumerate()]
+        self.assertEqual(len([name for name in names if "transloadit-stream" in name]), 1)
+
+
+class NextDelayTest(unittest.TestCase):
+    def setUp(self):
+        self.poller = StatusPoller(None, interval=1, max_interval=4, backoff=2)
+
+    def test_interval_backs_off(self):
+        watch = _Watch("url", 1)
+        delays = [self.poller._next_delay(watch) for _ in range(4)]
+        self.assertEqual(delays, [1, 2, 4, 4])
+
+    def test_retry_in_takes_precedence(self):
+        watch = _Watch("url", 1)
+        response = _status({"ok": "ASSEMBLY_EXECUTING", "info": {"retryIn": 10}})
+        self.assertEqual(self.poller._next_delay(watch, response), 10)
+
+
+class ClientPollerTest(unittest.TestCase):
+    def test_poller_is_shared_and_closed(self):
+        transloadit = Transloadit("key", "secret")
+        status_poller = transloadit.poller
+        self.assertIs(transloadit.poller, status_poller)
+        transloadit.close()
+        self.assertTrue(status_poller._closed)
+        with self.assertRaisesRegex(RuntimeError, "closed"):
+            transloadit.poller
+        self.assertIsNone(transloadit._poller)
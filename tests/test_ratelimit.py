@@ -0,0 +1,215 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import requests_mock
+
+from .server import StandInServer
+from transloadit import ratelimit
+from transloadit.async_client import AsyncTransloadit
+from transloadit.client import Transloadit
+
+
+class TokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("transloadit.ratelimit.monotonic", return_value=100.0)
+        self.monotonic = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reservations_are_spaced(self):
+        bucket = ratelimit.TokenBucket(10, burst=2)
+
+        delays = [bucket.reserve() for _ in range(4)]
+
+        self.assertEqual(delays[:2], [0, 0])
+        self.assertAlmostEqual(delays[2], 0.1)
+        self.assertAlmostEqual(delays[3], 0.2)
+        self.monotonic.return_value = 101.0
+        self.assertEqual(bucket.reserve(), 0)
+
+    def test_throttled_and_accepted(self):
+        bucket = ratelimit.TokenBucket(10)
+
+        bucket.throttled(retry_in=5)
+
+        self.assertEqual(bucket.rate, 5)
+        self.assertAlmostEqual(bucket.reserve(), 5.2)
+        self.assertAlmostEqual(bucket.reserve(), 5.4)
+        bucket.throttled()
+        self.assertEqual(bucket.rate, 2.5)
+        for _ in range(20):
+            bucket.accepted()
+        self.assertEqual(bucket.rate, 10)
+
+    def test_min_rate(self):
+        bucket = ratelimit.TokenBucket(10, min_rate=2)
+        for _ in range(5):
+            bucket.throttled()
+        self.assertEqual(bucket.rate, 2)
+
+    @mock.patch("transloadit.ratelimit.sleep")
+    def test_acquire(self, sleep):
+        bucket = ratelimit.TokenBucket(2, burst=1)
+        bucket.acquire()
+        sleep.assert_not_called()
+        bucket.acquire()
+        sleep.assert_called_once_with(0.5)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_classify(self):
+        classify = ratelimit.RateLimiter.classify
+        self.assertEqual(classify("POST", "https://api2.transloadit.com/assemblies"), "create")
+        self.assertEqual(
+            classify("GET", "https://api2-x.transloadit.com/assemblies/abc"), "status"
+        )
+        self.assertEqual(classify("GET", "https://api2.transloadit.com/assemblies"), "other")
+        self.assertEqual(
+            classify("DELETE", "https://api2.transloadit.com/assemblies/abc"), "other"
+        )
+        self.assertEqual(classify("GET", "https://api2.transloadit.com/templates/t"), "other")
+
+    @mock.patch("transloadit.ratelimit.sleep")
+    def test_client_requests_are_limited(self, sleep):
+        limiter = ratelimit.RateLimiter(create_rate=1, status_rate=1, other_rate=1)
+        transloadit = Transloadit("key", "secret", rate_limiter=limiter)
+
+        with requests_mock.Mocker() as m:
+            m.post(
+                "https://api2.transloadit.com/assemblies",
+                json={"error": "RATE_LIMIT_REACHED", "info": {"retryIn": 3}},
+                status_code=413,
+            )
+            m.get(
+                "https://api2.transloadit.com/assemblies/abc", json={"ok": "ASSEMBLY_EXECUTING"}
+            )
+            transloadit.get_assembly(assembly_id="abc")
+            transloadit.request.post("/assemblies")
+            transloadit.get_assembly(assembly_id="abc")
+            transloadit.request.post("/assemblies")
+
+        self.assertEqual(limiter.buckets["create"].rate, 0.25)
+        self.assertEqual(limiter.buckets["status"].rate, 1)
+        (delay,), _ = sleep.call_args_list[-1]
+        self.assertGreater(delay, 3)
+
+
+class SharedRateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "ratelimit")
+        self.limiters = []
+
+    def tearDown(self):
+        for limiter in self.limiters:
+            limiter.close()
+        self.directory.cleanup()
+
+    def _limiter(self, **rates):
+        limiter = ratelimit.SharedRateLimiter(self.path, **rates)
+        self.limiters.append(limiter)
+        return limiter
+
+    def test_buckets_are_shared(self):
+        first = self._limiter(create_rate=10, burst=2)
+        second = self._limiter(create_rate=10, burst=2)
+        url = "https://api2.transloadit.com/assemblies"
+
+        self.assertEqual(first.reserve("POST", url), 0)
+        self.assertEqual(second.reserve("POST", url), 0)
+        self.assertGreater(first.reserve("POST", url), 0)
+
+    def test_pause_is_shared(self):
+        first = self._limiter(status_rate=10)
+        second = self._limiter(status_rate=10)
+        url = "https://api2.transloadit.com/assemblies/abc"
+
+        first.observe(
+            "GET",
+            url,
+            {"error": "ASSEMBLY_STATUS_FETCHING_RATE_LIMIT_REACHED", "info": {"retryIn": 5}},
+        )
+
+        self.assertGreater(second.reserve("GET", url), 4.9)
+        self.assertEqual(second.buckets["status"].rate, 5)
+        self.assertEqual(second.reserve("GET", "https://api2.transloadit.com/templates"), 0)
+
+    def test_pause_is_shared_across_processes(self):
+        script = (
+            "import sys\n"
+            "from transloadit.ratelimit import SharedRateLimiter\n"
+            "limiter = SharedRateLimiter(sys.argv[1])\n"
+            "limiter.observe('POST', 'https://api2.transloadit.com/assemblies',\n"
+            "                {'error': 'RATE_LIMIT_REACHED', 'info': {'retryIn': 10}})\n"
+        )
+        subprocess.run([sys.executable, "-c", script, self.path], check=True)
+
+        limiter = self._limiter()
+        self.assertGreater(limiter.reserve("POST", "https://api2.transloadit.com/assemblies"), 9)
+
+    @mock.patch("transloadit.ratelimit.monotonic")
+    def test_stale_pause_is_ignored(self, monotonic):
+        monotonic.return_value = 1_000_000.0
+        limiter = self._limiter()
+        limiter.buckets["create"].throttled(retry_in=10)
+        limiter.close()
+
+        # after a reboot, the monotonic clock starts over.
+        monotonic.return_value = 10.0
+        limiter = self._limiter()
+        self.assertEqual(limiter.reserve("POST", "https://api2.transloadit.com/assemblies"), 0)
+
+
+    def test_pause_from_before_reboot_is_ignored(self):
+        limiter = self._limiter()
+        limiter.reserve("POST", "https://api2.transloadit.com/assemblies")
+        limiter.close()
+
+        # a pause of 1700 seconds written at an uptime of 1800s, read at an uptime of 60s.
+        with open(self.path, "r+b") as shared:
+            data = bytearray(shared.read())
+            ratelimit._HEADER.pack_into(data, 0, time.time() - time.monotonic() - 1740)
+            ratelimit._SLOT.pack_into(
+                data, ratelimit._HEADER.size, 0, time.monotonic() + 1700, 5, 1
+            )
+            shared.seek(0)
+            shared.write(data)
+
+        limiter = self._limiter()
+        self.assertEqual(limiter.reserve("POST", "https://api2.transloadit.com/assemblies"), 0)
+
+
+class AsyncRateLimiterTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.limiter = ratelimit.RateLimiter(status_rate=1)
+        self.transloadit = AsyncTransloadit(
+            "key", "secret", service=self.server.url, rate_limiter=self.limiter
+        )
+
+    async def asyncTearDown(self):
+        await self.transloadit.close()
+        self.server.__exit__(None, None, None)
+
+    async def test_requests_are_limited(self):
+        self.server.json(
+            "GET",
+            "/assemblies/abc",
+            '{"error": "ASSEMBLY_STATUS_FETCHING_RATE_LIMIT_REACHED", "info": {"retryIn": 2}}',
+        )
+
+        with mock.patch("transloadit.async_request.asyncio.sleep") as sleep:
+            await self.transloadit.get_assembly(assembly_id="abc")
+            await self.transloadit.get_assembly(assembly_id="abc")
+
+        self.assertEqual(self.limiter.buckets["status"].rate, 0.25)
+        (delay,), _ = sleep.call_args
+        self.assertGreater(delay, 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
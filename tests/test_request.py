@@ -1,3 +1,4 @@
+import threading
 import unittest
 import urllib.parse
 
@@ -63,3 +64,53 @@ class RequestTest(unittest.TestCase):
 
         response = self.request.delete("/foo", data={"foo": "bar"})
         self.assertEqual(response.data["ok"], "it works")
+
+    @requests_mock.Mocker()
+    def test_session_is_reused(self, mock):
+        url = f"{self.transloadit.service}/foo"
+        mock.get(url, text='{"ok": "it works"}')
+
+        session = self.request.session
+        self.request.get("/foo")
+        self.request.get("/foo")
+        self.assertIs(self.request.session, session)
+        self.assertEqual(mock.call_count, 2)
+
+    def test_session_pool_options(self):
+        request = Request(self.transloadit, pool_maxsize=32, keep_alive=False)
+        adapter = request.session.get_adapter("https://api2.transloadit.com")
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertEqual(request.session.headers["Connection"], "close")
+
+    def test_close(self):
+        session = self.request.session
+        self.request.close()
+        self.assertIsNot(self.request.session, session)
+
+    @requests_mock.Mocker()
+    def test_warmup(self, mock):
+        mock.head(self.transloadit.service, text="")
+
+        self.request.warmup(4)
+        self.assertEqual(mock.call_count, 4)
+
+    @requests_mock.Mocker()
+    def test_shared_across_threads(self, mock):
+        url = f"{self.transloadit.service}/foo"
+        mock.get(url, text='{"ok": "it works"}')
+
+        sessions = []
+        results = []
+
+        def _worker():
+            sessions.append(self.request.session)
+            results.append(self.request.get("/foo").data["ok"])
+
+        threads = [threading.Thread(target=_worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["it works"] * 8)
+        self.assertEqual(len(set(map(id, sessions))), 1)
@@ -0,0 +1,100 @@
+import io
+import os
+import tempfile
+import unittest
+
+from transloadit.resume import SQLiteResumeStore, fingerprint, fingerprint_assembly
+from transloadit.sources import StreamSource
+
+
+class SQLiteResumeStoreTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "uploads.sqlite")
+        self.store = SQLiteResumeStore(self.path)
+        self.addCleanup(self.store.close)
+
+    def test_items(self):
+        self.assertIsNone(self.store.get_item("a"))
+        self.store.set_item("a", "https://tus/1")
+        self.store.set_item("a", "https://tus/2")
+        self.assertEqual(self.store.get_item("a"), "https://tus/2")
+        self.store.remove_item("a")
+        self.assertIsNone(self.store.get_item("a"))
+
+    def test_remove_items(self):
+        self.store.set_item("https://api/abc file", "1")
+        self.store.set_item("https://api/abc file_1", "2")
+        self.store.set_item("https://api/abcd file", "3")
+        self.store.remove_items("https://api/abc ")
+        self.assertIsNone(self.store.get_item("https://api/abc file"))
+        self.assertIsNone(self.store.get_item("https://api/abc file_1"))
+        self.assertEqual(self.store.get_item("https://api/abcd file"), "3")
+
+    def test_items_persist(self):
+        self.store.set_item("a", "https://tus/1")
+        other = SQLiteResumeStore(self.path)
+        self.addCleanup(other.close)
+        self.assertEqual(other.get_item("a"), "https://tus/1")
+
+
+class FingerprintTest(unittest.TestCase):
+    def test_fingerprint(self):
+        data = bytes(range(256)) * 1000
+        self.assertEqual(fingerprint(io.BytesIO(data)), fingerprint(io.BytesIO(data)))
+        changed = data[:-1] + b"x"
+        self.assertNotEqual(fingerprint(io.BytesIO(data)), fingerprint(io.BytesIO(changed)))
+        # streams held in memory are hashed whole.
+        changed = data[:100000] + b"x" + data[100001:]
+        self.assertNotEqual(fingerprint(io.BytesIO(data)), fingerprint(io.BytesIO(changed)))
+        self.assertNotEqual(fingerprint(io.BytesIO(data)), fingerprint(io.BytesIO(data + b"x")))
+
+    def test_files_are_identified(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        paths = [os.path.join(directory.name, name) for name in ("a.bin", "b.bin")]
+        data = bytes(range(256)) * 1000
+        for path in paths:
+            with open(path, "wb") as file_stream:
+                file_stream.write(data)
+
+        def fingerprint_file(path):
+            with open(path, "rb") as file_stream:
+                return fingerprint(file_stream)
+
+        first = fingerprint_file(paths[0])
+        self.assertEqual(fingerprint_file(paths[0]), first)
+        # same size and same first and last blocks, but another file.
+        self.assertNotEqual(fingerprint_file(paths[1]), first)
+        os.utime(paths[0], ns=(0, 0))
+        self.assertNotEqual(fingerprint_file(paths[0]), first)
+
+    def test_text_files(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "a.txt")
+        # the last block starts within a two-byte character.
+        with open(path, "w", encoding="utf-8") as file_stream:
+            file_stream.write("a" + "é" * 50000)
+
+        with open(path, "rb") as file_stream:
+            expected = fingerprint(file_stream)
+        with open(path, encoding="utf-8") as file_stream:
+            self.assertEqual(file_stream.read(3), "aéé")
+            self.assertEqual(fingerprint(file_stream), expected)
+            self.assertEqual(file_stream.read(2), "éé")
+        self.assertEqual(fingerprint(io.StringIO("abc")), fingerprint(io.BytesIO(b"abc")))
+
+    def test_streams_have_no_fingerprint(self):
+        self.assertIsNone(fingerprint(StreamSource(iter([b"data"]))))
+        self.assertIsNone(
+            fingerprint_assembly({}, {"a": io.BytesIO(b"a"), "b": StreamSource(iter([]))})
+        )
+
+    def test_fingerprint_assembly(self):
+        options = {"steps": {"resize": {"robot": "/image/resize"}}}
+        key = fingerprint_assembly(options, {"a": io.BytesIO(b"a")})
+        self.assertEqual(key, fingerprint_assembly(options, {"a": io.BytesIO(b"a")}))
+        self.assertNotEqual(key, fingerprint_assembly(options, {"b": io.BytesIO(b"a")}))
+        self.assertNotEqual(key, fingerprint_assembly({}, {"a": io.BytesIO(b"a")}))
@@ -0,0 +1,138 @@
+import unittest
+from unittest import mock
+
+import requests
+import requests_mock
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from .server import StandInServer
+from transloadit import retry
+from transloadit.async_client import AsyncTransloadit
+from transloadit.client import Transloadit
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.policy = retry.RetryPolicy(retries=2, backoff=1, max_backoff=3)
+
+    def test_statuses(self):
+        delay = self.policy.retry_delay("GET", 0, 0, 503)
+        self.assertTrue(0 <= delay <= 1)
+        self.assertIsNone(self.policy.retry_delay("GET", 0, 0, 404))
+        self.assertIsNone(self.policy.retry_delay("POST", 0, 0, 503))
+
+    def test_network_errors(self):
+        error = requests.exceptions.ConnectionError()
+        self.assertIsNotNone(self.policy.retry_delay("GET", 0, 0, error=error))
+        self.assertIsNone(self.policy.retry_delay("POST", 0, 0, error=error))
+        self.assertIsNotNone(self.policy.retry_delay("POST", 0, 0, error=error, sent=False))
+
+    def test_backoff_and_retries(self):
+        with mock.patch("transloadit.retry.random.uniform", side_effect=lambda a, b: b):
+            delays = [self.policy.retry_delay("GET", attempt, 0, 502) for attempt in range(3)]
+            self.assertEqual(delays, [1, 2, None])
+            self.policy.retries = 5
+            self.assertEqual(self.policy.retry_delay("GET", 4, 0, 502), 3)
+        self.assertEqual(
+            self.policy.counters,
+            {"attempts": 4, "retries": 3, "retry:502": 3, "exhausted": 1},
+        )
+
+    def test_retry_after(self):
+        self.assertEqual(
+            self.policy.retry_delay("GET", 0, 0, 429, {"Retry-After": "7"}), 7
+        )
+
+    @mock.patch("transloadit.retry.monotonic", return_value=100)
+    def test_deadline(self, monotonic):
+        self.policy.deadline = 10
+        self.assertIsNotNone(self.policy.retry_delay("GET", 0, 95, 503))
+        self.assertIsNone(self.policy.retry_delay("GET", 0, 95, 503, {"Retry-After": "6"}))
+        self.assertEqual(self.policy.timeout(95, 60), 5)
+        self.assertEqual(self.policy.timeout(80, 60), 0.001)
+
+    def test_was_sent(self):
+        refused = requests.exceptions.ConnectionError(
+            MaxRetryError(None, "/", NewConnectionError(None, "refused"))
+        )
+        self.assertFalse(retry.was_sent(refused))
+        self.assertFalse(retry.was_sent(requests.exceptions.ConnectTimeout()))
+        self.assertTrue(retry.was_sent(requests.exceptions.ConnectionError()))
+        self.assertTrue(retry.was_sent(requests.exceptions.ReadTimeout()))
+
+
+@mock.patch("transloadit.request.sleep")
+class ClientRetryTest(unittest.TestCase):
+    def setUp(self):
+        self.policy = retry.RetryPolicy()
+        self.transloadit = Transloadit("key", "secret", retry_policy=self.policy)
+
+    def test_get_is_retried(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.get(
+                "https://api2.transloadit.com/assemblies/abc",
+                [
+                    {"status_code": 502, "text": "Bad Gateway"},
+                    {"exc": requests.exceptions.ConnectionError},
+                    {"json": {"ok": "ASSEMBLY_COMPLETED"}},
+                ],
+            )
+            response = self.transloadit.get_assembly(assembly_id="abc")
+
+        self.assertEqual(response.data["ok"], "ASSEMBLY_COMPLETED")
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(self.policy.counters["retries"], 2)
+
+    def test_create_is_only_retried_before_it_is_sent(self, sleep):
+        with requests_mock.Mocker() as m:
+            m.post(
+                "https://api2.transloadit.com/assemblies",
+                [
+                    {"exc": requests.exceptions.ConnectTimeout},
+                    {"exc": requests.exceptions.ReadTimeout},
+                ],
+            )
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                self.transloadit.new_assembly().create(resumable=False)
+
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_disabled(self, sleep):
+        self.transloadit.retry_policy = retry.RetryPolicy(retries=0)
+        with requests_mock.Mocker() as m:
+            m.get("https://api2.transloadit.com/assemblies/abc", status_code=503, json={})
+            response = self.transloadit.get_assembly(assembly_id="abc")
+
+        self.assertEqual(response.status_code, 503)
+        sleep.assert_not_called()
+
+
+class AsyncClientRetryTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.transloadit = AsyncTransloadit("key", "secret", service=self.server.url)
+
+    async def asyncTearDown(self):
+        await self.transloadit.close()
+        self.server.__exit__(None, None, None)
+
+    async def test_get_is_retried(self):
+        responses = iter([(503, {}, "{}"), (429, {"Retry-After": "2"}, "{}")])
+        self.server.route(
+            "GET",
+            "/assemblies/abc",
+            lambda request: next(responses, (200, {}, '{"ok": "ASSEMBLY_COMPLETED"}')),
+        )
+
+        with mock.patch("transloadit.async_request.asyncio.sleep") as sleep:
+            response = await self.transloadit.get_assembly(assembly_id="abc")
+
+        self.assertEqual(response.data["ok"], "ASSEMBLY_COMPLETED")
+        self.assertEqual(sleep.call_count, 2)
+        (delay,), _ = sleep.call_args
+        self.assertGreaterEqual(delay, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
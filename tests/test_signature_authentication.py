@@ -46,13 +46,7 @@ class MockClient(Transloadit):
                  auth_secret: str,
                  service: str = "https://api2.transloadit.com",
                  duration: int = 300):
-        if not service.startswith(("http://", "https://")):
-            service = "https://" + service
-
-        self.service = service
-        self.auth_key = auth_key
-        self.auth_secret = auth_secret
-        self.duration = duration
+        super().__init__(auth_key, auth_secret, service, duration)
         self.request = MockRequest(self)
 
 
@@ -0,0 +1,84 @@
+import io
+import tempfile
+import unittest
+
+from transloadit.sources import (
+    FileSource,
+    MappedFileSource,
+    SpooledSource,
+    StreamSource,
+    open_source,
+)
+
+
+class SourcesTest(unittest.TestCase):
+    def setUp(self):
+        self.file = tempfile.TemporaryFile()
+        self.file.write(b"0123456789")
+        self.file.flush()
+
+    def tearDown(self):
+        self.file.close()
+
+    def test_regular_files_are_mapped(self):
+        source = open_source(self.file)
+        self.assertIsInstance(source, MappedFileSource)
+        self.assertEqual(source.size, 10)
+
+        chunk = source.read(2, 4)
+        self.assertIsInstance(chunk, memoryview)
+        self.assertEqual(bytes(chunk), b"2345")
+
+        buffer = bytearray(4)
+        self.assertEqual(source.readinto(8, buffer), 2)
+        self.assertEqual(bytes(buffer[:2]), b"89")
+
+        del chunk
+        source.close()
+        self.assertFalse(self.file.closed)
+
+    def test_streams_without_file_descriptor(self):
+        source = open_source(io.BytesIO(b"0123456789"))
+        self.assertIs(type(source), FileSource)
+        self.assertEqual(source.size, 10)
+        self.assertEqual(source.read(2, 4), b"2345")
+
+        buffer = bytearray(3)
+        self.assertEqual(source.readinto(7, buffer), 3)
+        self.assertEqual(bytes(buffer), b"789")
+
+    def test_empty_files_are_not_mapped(self):
+        with tempfile.TemporaryFile() as empty:
+            self.assertIs(type(open_source(empty)), FileSource)
+
+    def test_sources_are_returned_unchanged(self):
+        source = FileSource(self.file)
+        self.assertIs(open_source(source), source)
+
+
+class StreamSourceTest(unittest.TestCase):
+    def test_read_from_iterable(self):
+        source = StreamSource(iter([b"01", "234", bytearray(b"56789")]), name="digits.txt")
+        self.assertIsNone(source.size)
+        self.assertEqual(source.name, "digits.txt")
+        self.assertEqual(source.read(1), b"0")
+        self.assertEqual(source.read_exactly(6), b"123456")
+        self.assertEqual(source.read(), b"789")
+        self.assertEqual(source.read(1), b"")
+
+    def test_read_from_file_like(self):
+        source = StreamSource(io.BytesIO(b"0123456789"))
+        self.assertEqual(source.read_exactly(4), b"0123")
+        self.assertEqual(source.read_exactly(10), b"456789")
+
+    def test_sources_are_returned_unchanged(self):
+        source = StreamSource(io.BytesIO(b""))
+        self.assertIs(open_source(source), source)
+
+    def test_spooled_copy(self):
+        source = SpooledSource(StreamSource(iter([b"0123", b"456789"]), name="digits.txt"))
+        self.assertEqual(source.name, "digits.txt")
+        self.assertEqual(source.size, 10)
+        self.assertEqual(source.read(2, 4), b"2345")
+        source.close()
+        self.assertTrue(source.file_stream.closed)
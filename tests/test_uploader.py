@@ -0,0 +1,285 @@
+import io
+import unittest
+
+import requests
+from tusclient.exceptions import TusUploadFailed
+
+from .server import StandInServer, TusStandIn
+from transloadit.resume import SQLiteResumeStore
+from transloadit.sources import StreamSource
+from transloadit.uploader import AdaptiveChunkSize, ChunkBody, ReadAhead, Uploader
+
+
+class AdaptiveChunkSizeTest(unittest.TestCase):
+    def setUp(self):
+        self.sizer = AdaptiveChunkSize(min_size=100, max_size=1000, target_duration=1.0)
+
+    def test_starts_at_min_size(self):
+        self.assertEqual(self.sizer.size, 100)
+
+    def test_grows_while_healthy(self):
+        self.sizer.record(100, 0.01)
+        self.assertEqual(self.sizer.size, 200)
+        self.sizer.record(200, 0.01)
+        self.sizer.record(400, 0.01)
+        self.sizer.record(800, 0.01)
+        self.assertEqual(self.sizer.size, 1000)
+        self.assertEqual(len(self.sizer.history), 4)
+
+    def test_shrinks_when_slow(self):
+        self.sizer.size = 800
+        self.sizer.record(800, 2.0)
+        self.assertEqual(self.sizer.size, 400)
+
+    def test_shrinks_after_failure(self):
+        self.sizer.size = 800
+        self.sizer.record_failure()
+        self.assertEqual(self.sizer.size, 400)
+        self.sizer.record_failure()
+        self.sizer.record_failure()
+        self.sizer.record_failure()
+        self.assertEqual(self.sizer.size, 100)
+
+    def test_ignores_short_final_chunk(self):
+        self.sizer.size = 400
+        self.sizer.record(10, 5.0)
+        self.assertEqual(self.sizer.size, 400)
+
+    def test_invalid_bounds(self):
+        with self.assertRaises(ValueError):
+            AdaptiveChunkSize(min_size=10, max_size=5)
+
+
+class ReadAheadTest(unittest.TestCase):
+    def setUp(self):
+        self.data = bytes(range(256)) * 4
+        self.stream = io.BytesIO(self.data)
+
+    def _readinto(self, position, buffer):
+        self.stream.seek(position)
+        return self.stream.readinto(buffer)
+
+    def test_reads_chunks_in_order(self):
+        reader = ReadAhead(self._readinto, len(self.data), lambda: 100, buffers=2)
+        position = 0
+        buffers = set()
+        while position < len(self.data):
+            chunk = reader.get(position)
+            self.assertEqual(bytes(chunk), self.data[position:position + 100])
+            buffers.add(id(chunk.obj))
+            position += len(chunk)
+            reader.release(chunk)
+        reader.close()
+        self.assertEqual(len(buffers), 2)
+
+    def test_restarts_at_new_position(self):
+        reader = ReadAhead(self._readinto, len(self.data), lambda: 100)
+        reader.release(reader.get(0))
+        chunk = reader.get(50)
+        self.assertEqual(bytes(chunk), self.data[50:150])
+        reader.release(chunk)
+        reader.close()
+
+    def test_read_errors_are_raised(self):
+        reader = ReadAhead(lambda position, buffer: 0, 10, lambda: 5)
+        with self.assertRaises(EOFError):
+            reader.get(0)
+        reader.close()
+
+
+class ChunkBodyTest(unittest.TestCase):
+    def test_read(self):
+        body = ChunkBody(bytearray(b"abcdef"))
+        self.assertEqual(len(body), 6)
+        self.assertEqual(bytes(body.read(4)), b"abcd")
+        self.assertEqual(body.tell(), 4)
+        self.assertEqual(bytes(body.read()), b"ef")
+        body.seek(0)
+        self.assertEqual(bytes(body.read(2)), b"ab")
+
+
+class UploaderTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.tus = TusStandIn(self.server)
+        self.session = requests.Session()
+
+    def tearDown(self):
+        self.session.close()
+        self.server.__exit__(None, None, None)
+
+    def test_upload(self):
+        data = b"x" * 2500
+        tus_uploader = Uploader(
+            self.session, self.tus.url, io.BytesIO(data), {"fieldname": "file"}, chunk_size=1000
+        )
+        tus_uploader.upload()
+
+        (upload,) = self.tus.uploads.values()
+        self.assertEqual(upload["data"], data)
+        self.assertEqual(upload["metadata"], {"fieldname": "file"})
+        patches = [request for request in self.server.requests if request.method == "PATCH"]
+        self.assertEqual([len(request.body) for request in patches], [1000, 1000, 500])
+
+    def test_upload_range(self):
+        data = bytes(range(100))
+        Uploader(self.session, self.tus.url, io.BytesIO(data), start=10, end=30).upload()
+
+        (upload,) = self.tus.uploads.values()
+        self.assertEqual(upload["data"], data[10:30])
+
+    def test_upload_empty_file(self):
+        Uploader(self.session, self.tus.url, io.BytesIO(b"")).upload()
+
+        (upload,) = self.tus.uploads.values()
+        self.assertEqual(upload["length"], 0)
+
+    def test_adaptive_chunk_sizes(self):
+        data = b"x" * 3000
+        tus_uploader = Uploader(
+            self.session, self.tus.url, io.BytesIO(data), min_chunk_size=200, max_chunk_size=800
+        )
+        tus_uploader.upload()
+
+        self.assertEqual(self.tus.completed()[0]["data"], data)
+        sizes = [size for size, _ in tus_uploader.chunk_sizer.history]
+        self.assertEqual(sizes[:3], [200, 400, 800])
+        self.assertTrue(all(size <= 800 for size in sizes))
+
+    def test_failed_chunk_is_retried_smaller(self):
+        failures = iter([True])
+        self.server.route(
+            "PATCH",
+            r"/resumable/files/(\w+)",
+            lambda request: (500, {}, "") if next(failures, False) else self.tus._patch(request),
+        )
+        data = b"x" * 1000
+        tus_uploader = Uploader(
+            self.session,
+            self.tus.url,
+            io.BytesIO(data),
+            retries=1,
+            retry_delay=0,
+            min_chunk_size=100,
+            max_chunk_size=1000,
+        )
+        tus_uploader.chunk_sizer.size = 800
+        tus_uploader.upload()
+
+        self.assertEqual(self.tus.completed()[0]["data"], data)
+        self.assertEqual(tus_uploader.chunk_sizer.history[0][0], 400)
+
+    def test_read_ahead(self):
+        data = bytes(range(256)) * 10
+        tus_uploader = Uploader(
+            self.session, self.tus.url, io.BytesIO(data), chunk_size=300, read_ahead=2
+        )
+        tus_uploader.upload()
+
+        self.assertEqual(self.tus.completed()[0]["data"], data)
+        self.assertIsNone(tus_uploader._reader)
+
+    def test_read_ahead_resumes_after_failure(self):
+        failures = iter([False, True])
+        self.server.route(
+            "PATCH",
+            r"/resumable/files/(\w+)",
+            lambda request: (500, {}, "") if next(failures, False) else self.tus._patch(request),
+        )
+        data = bytes(range(256)) * 10
+        tus_uploader = Uploader(
+            self.session,
+            self.tus.url,
+            io.BytesIO(data),
+            chunk_size=300,
+            retries=1,
+            retry_delay=0,
+            read_ahead=3,
+        )
+        tus_uploader.upload()
+
+        self.assertEqual(self.tus.completed()[0]["data"], data)
+
+    def test_upload_stream_with_deferred_length(self):
+        blocks = [bytes([i]) * 300 for i in range(8)]
+        tus_uploader = Uploader(
+            self.session, self.tus.url, StreamSource(iter(blocks)), chunk_size=1000
+        )
+        tus_uploader.upload()
+
+        (upload,) = self.tus.completed()
+        self.assertEqual(upload["data"], b"".join(blocks))
+        self.assertEqual(upload["length"], 2400)
+        self.assertEqual(tus_uploader.length, 2400)
+        (create,) = [request for request in self.server.requests if request.method == "POST"]
+        self.assertEqual(create.headers["Upload-Defer-Length"], "1")
+        self.assertNotIn("Upload-Length", create.headers)
+        patches = [request for request in self.server.requests if request.method == "PATCH"]
+        self.assertEqual([len(request.body) for request in patches], [1000, 1000, 400])
+        self.assertEqual(patches[-1].headers["Upload-Length"], "2400")
+
+    def test_upload_stream_ending_on_chunk_boundary(self):
+        data = b"x" * 2000
+        stream = StreamSource(io.BytesIO(data))
+        Uploader(self.session, self.tus.url, stream, chunk_size=1000).upload()
+
+        (upload,) = self.tus.completed()
+        self.assertEqual(upload["data"], data)
+        patches = [request for request in self.server.requests if request.method == "PATCH"]
+        # the end of the stream is only noticed after the last full chunk was sent.
+        self.assertEqual([len(request.body) for request in patches], [1000, 1000, 0])
+        self.assertEqual(patches[-1].headers["Upload-Length"], "2000")
+
+    def test_empty_stream(self):
+        Uploader(self.session, self.tus.url, StreamSource(iter([]))).upload()
+
+        (upload,) = self.tus.completed()
+        self.assertEqual(upload["length"], 0)
+
+    def test_resume_from_store(self):
+        store = SQLiteResumeStore(":memory:")
+        self.addCleanup(store.close)
+        self.server.route("PATCH", r"/resumable/files/(\w+)", lambda request: (500, {}, ""))
+        data = bytes(range(256)) * 10
+        options = {"chunk_size": 1000, "store": store, "store_key": "f"}
+        tus_uploader = Uploader(self.session, self.tus.url, io.BytesIO(data), **options)
+        with self.assertRaises(TusUploadFailed):
+            tus_uploader.upload()
+        self.assertEqual(store.get_item("f"), tus_uploader.url)
+
+        (upload,) = self.tus.uploads.values()
+        upload["data"] = data[:1000]
+        self.server.route("PATCH", r"/resumable/files/(\w+)", self.tus._patch)
+        resumed = Uploader(self.session, self.tus.url, io.BytesIO(data), **options)
+        resumed.upload()
+
+        self.assertEqual(resumed.url, tus_uploader.url)
+        self.assertEqual(self.tus.completed()[0]["data"], data)
+        patches = [request for request in self.server.requests if request.method == "PATCH"]
+        self.assertEqual([len(request.body) for request in patches], [1000, 1000, 560])
+
+    def test_unknown_stored_upload_starts_over(self):
+        store = SQLiteResumeStore(":memory:")
+        self.addCleanup(store.close)
+        store.set_item("f", self.tus.url + "/gone")
+        tus_uploader = Uploader(
+            self.session, self.tus.url, io.BytesIO(b"data"), store=store, store_key="f"
+        )
+        tus_uploader.upload()
+
+        self.assertEqual(self.tus.completed()[0]["data"], b"data")
+        self.assertEqual(store.get_item("f"), tus_uploader.url)
+
+    def test_stored_upload_of_another_length_starts_over(self):
+        store = SQLiteResumeStore(":memory:")
+        self.addCleanup(store.close)
+        options = {"store": store, "store_key": "f"}
+        first = Uploader(self.session, self.tus.url, io.BytesIO(b"other data"), **options)
+        first.url = first.create_url()
+        store.set_item("f", first.url)
+
+        tus_uploader = Uploader(self.session, self.tus.url, io.BytesIO(b"data"), **options)
+        tus_uploader.upload()
+
+        self.assertNotEqual(tus_uploader.url, first.url)
+        self.assertEqual(self.tus.completed()[0]["data"], b"data")
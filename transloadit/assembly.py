@@ -1,9 +1,252 @@
+import hashlib
+import io
+import json
 import os
+import threading
+from concurrent.futures import (
+    FIRST_EXCEPTION,
+    Future,
+    InvalidStateError,
+    ThreadPoolExecutor,
+    wait as wait_futures,
+)
+from functools import partial
 from time import sleep
 
-from tusclient import client as tus
+from . import dedup, events, optionbuilder, resume, sources, uploader
+from .deadline import DeadlineExceeded, from_timeout
 
-from . import optionbuilder
+RATE_LIMIT_MAX_DELAY = 60
+
+
+def assembly_finished(response):
+    """
+    Return whether the assembly status in the response is final, i.e. the assembly will not
+    change anymore.
+    """
+    status = response.data.get("ok")
+    is_aborted = status == "REQUEST_ABORTED"
+    is_canceled = status == "ASSEMBLY_CANCELED"
+    is_completed = status == "ASSEMBLY_COMPLETED"
+    error = response.data.get("error")
+    is_failed = error is not None
+    is_fetch_rate_limit = error == "ASSEMBLY_STATUS_FETCHING_RATE_LIMIT_REACHED"
+    return is_aborted or is_canceled or is_completed or (is_failed and not is_fetch_rate_limit)
+
+
+def new_results(response, seen):
+    """
+    Return the (step name, result) tuples of the results in the assembly status that are
+    not in 'seen' yet, and add them to it.
+
+    :Args:
+        - response (<transloadit.response.Response>): The status of the assembly.
+        - seen (set): Keys of the results already returned.
+    """
+    found = []
+    for step, results in (response.data.get("results") or {}).items():
+        for index, result in enumerate(results):
+            key = (step, result.get("id", index))
+            if key not in seen:
+                seen.add(key)
+                found.append((step, result))
+    return found
+
+
+def iter_results(transloadit, assembly_url, response=None, poll_interval=1):
+    """
+    Poll the status of an assembly until it has finished, and yield each step result as
+    soon as it appears in the 'results' of the assembly, as a (step name, result) tuple.
+    The generator returns the final <transloadit.response.Response>.
+
+    :Args:
+        - transloadit (<transloadit.client.Transloadit>)
+        - assembly_url (str): The URL of the assembly.
+        - response (Optional[<transloadit.response.Response>]): The latest known status of
+            the assembly. If not given, the status is fetched right away.
+        - poll_interval (Optional[float]): Seconds to wait between status requests, unless
+            the API asks for a different period. Defaults to 1.
+    """
+    seen = set()
+    while True:
+        if response is None:
+            response = transloadit.get_assembly(assembly_url=assembly_url)
+        yield from new_results(response, seen)
+        if assembly_finished(response):
+            return response
+        sleep(response.data.get("info", {}).get("retryIn", poll_interval))
+        response = None
+
+
+class UploadError(Exception):
+    """
+    Raised when one or more files of an assembly fail to upload in parallel.
+
+    :Attributes:
+        - errors (dict):
+            Key, value pair of the field name of each failed file and the exception
+            that caused it to fail.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(
+            "Failed to upload: "
+            + ", ".join(f"{key} ({error!r})" for key, error in errors.items())
+        )
+
+
+class AssemblyFuture(Future):
+    """
+    <concurrent.futures.Future> of an assembly submitted with
+    <transloadit.assembly.Assembly.submit>. It is resolved with the
+    <transloadit.response.Response> of the final status of the assembly, or fails with the
+    error that stopped its files from being uploaded or its status from being polled.
+
+    :Attributes:
+        - transloadit (<transloadit.client.Transloadit>)
+        - response (<transloadit.response.Response>): The response to the creation of the
+            assembly.
+        - assembly_url (str): The URL of the assembly.
+        - assembly_id (str): The id of the assembly.
+        - total_bytes (int): The total size of the files to upload, or None if the size of
+            some file is not known up front.
+        - uploaded_bytes (int): How many bytes of the files have been uploaded so far.
+
+    :Constructor Args:
+        - transloadit (<transloadit.client.Transloadit>)
+        - response (<transloadit.response.Response>): The response to the creation of the
+            assembly.
+        - total_bytes (Optional[int]): The total size of the files to upload.
+    """
+
+    def __init__(self, transloadit, response, total_bytes=None):
+        super().__init__()
+        self.transloadit = transloadit
+        self.response = response
+        self.assembly_url = response.data.get("assembly_ssl_url")
+        self.assembly_id = response.data.get("assembly_id")
+        self.total_bytes = total_bytes
+        self.uploaded_bytes = 0
+        self._progress_lock = threading.Lock()
+        self._cancel_uploads = threading.Event()
+        self._uploaded = False
+        self._uploaded_callbacks = []
+
+    @property
+    def progress(self):
+        """
+        Return the fraction of the files uploaded so far, from 0 to 1, or None if the total
+        size of the files is not known.
+        """
+        if self.total_bytes is None:
+            return None
+        if not self.total_bytes:
+            return 1.0
+        return min(self.uploaded_bytes / self.total_bytes, 1.0)
+
+    @property
+    def uploaded(self):
+        """
+        Return whether all files of the assembly have been uploaded.
+        """
+        return self._uploaded
+
+    def add_uploaded_callback(self, fn):
+        """
+        Attach a callable that will be called with the future once all files of the assembly
+        have been uploaded, while the assembly may still be processing. If they have already
+        been uploaded, it is called immediately. It is not called if an upload fails.
+        """
+        with self._progress_lock:
+            if not self._uploaded:
+                self._uploaded_callbacks.append(fn)
+                return
+        fn(self)
+
+    def cancel(self):
+        """
+        Cancel the assembly with the API, stop uploading its files and polling its status,
+        and cancel the future. Return False if the future is already done.
+        """
+        if self.done():
+            return False
+        if self.assembly_url is not None:
+            self.transloadit.cancel_assembly(assembly_url=self.assembly_url)
+        self._cancel_uploads.set()
+        cancelled = super().cancel()
+        if self.assembly_url is not None:
+            try:
+                self.transloadit.poller.unwatch(self.assembly_url)
+            except RuntimeError:
+                # the client is closed, and its poller along with it.
+                pass
+        return cancelled
+
+    def iter_results(self, poll_interval=1):
+        """
+        Yield each step result of the assembly as soon as it appears, as a
+        (step name, result) tuple, until the assembly has finished. See
+        <transloadit.assembly.iter_results>.
+
+        :Args:
+            - poll_interval (Optional[float]): Seconds to wait between status requests.
+                Defaults to 1.
+        """
+        return iter_results(self.transloadit, self.assembly_url, self.response, poll_interval)
+
+    def download_results(self, dest_dir, timeout=None, **options):
+        """
+        Wait for the assembly to finish and download its results to 'dest_dir'. See
+        <transloadit.client.Transloadit.download_results>.
+
+        :Args:
+            - dest_dir (str): The directory to download results to.
+            - timeout (Optional[float]): Seconds to wait for the assembly to finish.
+            - options: Options passed to <transloadit.client.Transloadit.download_results>.
+        """
+        return self.transloadit.download_results(self.result(timeout), dest_dir, **options)
+
+    def _add_progress(self, size):
+        with self._progress_lock:
+            self.uploaded_bytes += size
+
+    def _set_uploaded(self):
+        with self._progress_lock:
+            self._uploaded = True
+            callbacks, self._uploaded_callbacks = self._uploaded_callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def _watch(self):
+        if self.done():
+            return
+        try:
+            self.transloadit.poller.watch(self.assembly_url, self.response, self._on_status)
+        except RuntimeError as error:
+            # the client was closed while the files were uploaded.
+            self._set_error(error)
+
+    def _on_status(self, status_future):
+        if status_future.cancelled():
+            # the poller was closed, e.g. along with the client, so no status will follow.
+            super().cancel()
+            return
+        error = status_future.exception()
+        if error is not None:
+            self._set_error(error)
+            return
+        try:
+            self.set_result(status_future.result())
+        except InvalidStateError:
+            pass
+
+    def _set_error(self, error):
+        try:
+            self.set_exception(error)
+        except InvalidStateError:
+            # the future was cancelled, which is what stopped the uploads.
+            pass
 
 
 class Assembly(optionbuilder.OptionBuilder):
@@ -36,7 +279,10 @@ class Assembly(optionbuilder.OptionBuilder):
         Add a file to be uploaded along with the Assembly.
 
         :Args:
-            - file_stream (file): File stream object of the file to upload.
+            - file_stream (file|<transloadit.sources.FileSource>): File stream object of the file
+                to upload. For resumable uploads, regular files are memory-mapped so their chunks
+                are sent without being copied. Pass a <transloadit.sources.FileSource> wrapping
+                the stream to read it with plain 'read()' calls instead.
             - field_name (Optional[str]): The field name assigned to the file.
                 If not specified, a field name is auto-generated.
         """
@@ -45,6 +291,25 @@ class Assembly(optionbuilder.OptionBuilder):
 
         self.files[field_name] = file_stream
 
+    def add_stream(self, stream, filename, field_name=None):
+        """
+        Add a non-seekable stream to be uploaded along with the Assembly, such as the stdout
+        pipe of a subprocess, an HTTP response body or a generator of bytes chunks.
+
+        With resumable uploads, the stream is sent while it is being read and its length is
+        declared once it ends, so it never has to be written to disk first. If the TUS server
+        does not support deferred upload lengths, the stream is copied to a temporary file
+        before it is uploaded.
+
+        :Args:
+            - stream (file|iterable): Object with a 'read(size)' method, or an iterable
+                yielding bytes.
+            - filename (str): The file name reported for the upload.
+            - field_name (Optional[str]): The field name assigned to the stream.
+                If not specified, a field name is auto-generated.
+        """
+        self.add_file(sources.StreamSource(stream, filename), field_name)
+
     def _get_field_name(self):
         name = "file"
         if name not in self.files:
@@ -64,20 +329,209 @@ class Assembly(optionbuilder.OptionBuilder):
         """
         self.files.pop(field_name)
 
-    def _do_tus_upload(self, assembly_url, tus_url, retries):
-        tus_client = tus.TusClient(tus_url)
-        metadata = {"assembly_url": assembly_url}
+    def _do_tus_upload(
+        self,
+        assembly_url,
+        tus_url,
+        retries,
+        max_parallel_uploads=1,
+        parallel_parts=1,
+        resume_store=None,
+        cancelled=None,
+        **uploader_options,
+    ):
+        has_streams = any(
+            isinstance(file_stream, sources.StreamSource) for file_stream in self.files.values()
+        )
+        extensions = set()
+        if parallel_parts > 1 or has_streams:
+            extensions = uploader.get_extensions(
+                self.transloadit.request.session, tus_url, uploader_options.get("deadline")
+            )
+        if "concatenation" not in extensions:
+            # the server cannot join partial uploads, so each file is sent as one stream.
+            parallel_parts = 1
+
+        upload_file = partial(
+            self._tus_upload_file,
+            tus_url,
+            assembly_url,
+            retries=retries,
+            parallel_parts=parallel_parts,
+            defer_length="creation-defer-length" in extensions,
+            resume_store=resume_store,
+            **uploader_options,
+        )
+        if max_parallel_uploads > 1 and len(self.files) > 1:
+            self._do_parallel_tus_upload(upload_file, max_parallel_uploads, cancelled)
+            return
+
         for key in self.files:
-            metadata["fieldname"] = key
-            metadata["filename"] = os.path.basename(self.files[key].name)
-            tus_client.uploader(
-                file_stream=self.files[key],
-                chunk_size=5 * 1024 * 1024,
+            upload_file(key, cancelled=cancelled)
+
+    def _do_parallel_tus_upload(self, upload_file, max_workers, cancelled=None):
+        cancelled = cancelled or threading.Event()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(upload_file, key, cancelled=cancelled): key
+                for key in self.files
+            }
+            done, pending = wait_futures(futures, return_when=FIRST_EXCEPTION)
+            if pending:
+                cancelled.set()
+                for future in pending:
+                    future.cancel()
+
+        errors = {}
+        for future, key in futures.items():
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None and not isinstance(error, uploader.UploadCancelled):
+                errors[key] = error
+        if errors:
+            raise UploadError(errors)
+
+    def _tus_upload_file(
+        self,
+        tus_url,
+        assembly_url,
+        field_name,
+        retries,
+        cancelled=None,
+        parallel_parts=1,
+        defer_length=False,
+        resume_store=None,
+        **uploader_options,
+    ):
+        store_key = None
+        if resume_store is not None:
+            file_fingerprint = resume.fingerprint(self.files[field_name])
+            if file_fingerprint is not None:
+                store_key = f"{assembly_url} {field_name} {file_fingerprint}"
+
+        source = sources.open_source(self.files[field_name])
+        if isinstance(source, sources.StreamSource) and not defer_length:
+            source = sources.SpooledSource(source)
+        metadata = {
+            "assembly_url": assembly_url,
+            "fieldname": field_name,
+            "filename": os.path.basename(source.name),
+        }
+        try:
+            self._tus_upload_source(
+                tus_url,
+                source,
+                metadata,
+                retries,
+                cancelled,
+                parallel_parts,
+                store=resume_store,
+                store_key=store_key,
+                **uploader_options,
+            )
+        finally:
+            if source is not self.files[field_name]:
+                source.close()
+
+    def _tus_upload_source(
+        self,
+        tus_url,
+        source,
+        metadata,
+        retries,
+        cancelled,
+        parallel_parts,
+        store=None,
+        store_key=None,
+        **uploader_options,
+    ):
+        session = self.transloadit.request.session
+        file_size = source.size
+        parts = 1
+        if file_size is not None:
+            # never split a file into parts smaller than a single chunk.
+            parts = min(parallel_parts, -(-file_size // uploader.CHUNK_SIZE))
+        if parts <= 1:
+            uploader.Uploader(
+                session,
+                tus_url,
+                source,
                 metadata=metadata,
+                end=file_size,
+                retries=retries,
+                store=store,
+                store_key=store_key,
+                **uploader_options,
+            ).upload(cancelled)
+            return
+
+        part_size = -(-file_size // parts)
+        partial_uploaders = [
+            uploader.Uploader(
+                session,
+                tus_url,
+                source,
+                start=start,
+                end=min(start + part_size, file_size),
                 retries=retries,
-            ).upload()
+                headers={"Upload-Concat": "partial"},
+                store=store,
+                store_key=store_key and f"{store_key} {start}",
+                **uploader_options,
+            )
+            for start in range(0, file_size, part_size)
+        ]
+
+        cancelled = cancelled or threading.Event()
+        with ThreadPoolExecutor(max_workers=len(partial_uploaders)) as executor:
+            futures = [
+                executor.submit(partial_uploader.upload, cancelled)
+                for partial_uploader in partial_uploaders
+            ]
+            done, pending = wait_futures(futures, return_when=FIRST_EXCEPTION)
+            if pending:
+                cancelled.set()
+                for future in pending:
+                    future.cancel()
+
+        errors = [
+            future.exception()
+            for future in futures
+            if not future.cancelled() and future.exception() is not None
+        ]
+        if errors:
+            # prefer the error that caused the cancellation over the cancellations.
+            errors.sort(key=lambda error: isinstance(error, uploader.UploadCancelled))
+            raise errors[0]
 
-    def create(self, wait=False, resumable=True, retries=3):
+        uploader.concatenate(
+            session,
+            tus_url,
+            [partial_uploader.url for partial_uploader in partial_uploaders],
+            metadata,
+            uploader_options.get("deadline"),
+        )
+
+    def create(
+        self,
+        wait=False,
+        resumable=True,
+        retries=3,
+        max_parallel_uploads=1,
+        parallel_parts=1,
+        min_chunk_size=None,
+        max_chunk_size=None,
+        read_ahead=0,
+        resume_store=None,
+        rate_limit_retries=None,
+        poll_interval=1,
+        on_progress=None,
+        stream_updates=False,
+        dedup_cache=None,
+        timeout=None,
+        cancel_on_timeout=False,
+    ):
         """
         Save/Submit the assembly for processing.
 
@@ -89,50 +543,363 @@ class Assembly(optionbuilder.OptionBuilder):
             - retries (Optional[int]): In the event of an upload failure, this specifies how many
                 more times the upload should be retried before crying for help. This option is only
                 available if 'resumable' is set to 'True'. Defaults to 3 if not specified.
+            - max_parallel_uploads (Optional[int]): How many files may be uploaded at the same
+                time. Each file gets its own TUS upload. If one of them fails for good, uploads
+                that have not finished yet are cancelled and an <transloadit.assembly.UploadError>
+                listing every failed file is raised. This option is only available if
+                'resumable' is set to 'True'. Defaults to 1 if not specified.
+            - parallel_parts (Optional[int]): Split each large file into up to this many parts,
+                upload the parts concurrently and join them on the server with the TUS
+                concatenation extension. Files are uploaded as a single stream if the server does
+                not support concatenation. This option is only available if 'resumable' is set
+                to 'True'. Defaults to 1 if not specified.
+            - min_chunk_size (Optional[int]): If this or 'max_chunk_size' is set, the size of each
+                uploaded chunk adapts to the measured throughput: it starts at 'min_chunk_size'
+                (256 KiB by default), grows while chunks upload quickly and shrinks after failed
+                attempts. Chunk sizes are logged at DEBUG level on the 'transloadit.uploader'
+                logger. This option is only available if 'resumable' is set to 'True'.
+            - max_chunk_size (Optional[int]): Upper bound of adaptive chunk sizes. Defaults to
+                64 MiB if only 'min_chunk_size' is specified.
+            - read_ahead (Optional[int]): If set, upcoming chunks are read on a background thread
+                while the current chunk is being sent, so disk and network work at the same time.
+                The value is the number of reusable chunk buffers per upload (2 or 3 is
+                plenty), which bounds the extra memory used. This option is only available if
+                'resumable' is set to 'True'. Defaults to 0, which disables read-ahead.
+            - resume_store (Optional[<transloadit.resume.ResumeStore>]): If set, the assembly
+                and the URLs of its uploads are saved in the store until all files are uploaded.
+                Creating an assembly with the same options and files again, e.g. after the
+                process was restarted, then resumes the saved assembly if it is still waiting
+                for uploads, and each file continues from the last byte the server received.
+                Assemblies with streams added through 'add_stream' are never resumed. This
+                option is only available if 'resumable' is set to 'True'.
+            - rate_limit_retries (Optional[int]): How many more times the assembly is submitted
+                while the API responds that the rate limit of the account is reached. Each
+                attempt waits for the period given by the API, or backs off exponentially up to
+                60 seconds if there is none. Files are only uploaded once the assembly has been
+                accepted. Defaults to 'retries' if not specified.
+            - poll_interval (Optional[float]): Seconds to wait between status requests while
+                waiting for the assembly to finish, unless the API asks for a different period.
+                Defaults to 1 if not specified.
+            - on_progress (Optional[callable]): Called with the number of bytes the TUS server
+                acknowledged each time a chunk of a file is uploaded. It may be called from
+                several threads at once. This option is only available if 'resumable' is set
+                to 'True'.
+            - stream_updates (Optional[bool]): If set, waiting for the assembly subscribes to
+                the server-sent events of its 'update_stream_url' and fetches its status once
+                the stream says it has finished, instead of polling it. If the stream drops
+                before that, the status is polled. Defaults to False if not specified.
+            - dedup_cache (Optional[<transloadit.dedup.DedupCache>]): If set, the final status
+                of the assembly is cached under the content hash of its files and its steps,
+                template id and fields once it completes, which requires 'wait'. Creating an
+                assembly with identical files and options again returns the cached status
+                right away, without contacting the API. Seekable files are hashed before the
+                assembly is created; streams added through 'add_stream' are hashed while they
+                are uploaded, so they can fill the cache but never hit it.
+            - timeout (Optional[float|<transloadit.deadline.Deadline>]): Seconds the whole
+                call may take: creating the assembly, uploading its files and, with 'wait',
+                waiting for it to finish. Every request and every uploaded chunk gets what is
+                left as its timeout, and retries that would end later are not attempted. Once
+                it is over, <transloadit.deadline.DeadlineExceeded> is raised with the last
+                response of the assembly, if it was created. Defaults to no limit.
+            - cancel_on_timeout (Optional[bool]): If set, an assembly that was created but
+                did not finish within 'timeout' is cancelled before the error is raised.
+                Defaults to False.
         """
-        data = self.get_options()
-        if resumable:
-            extra_data = {"tus_num_expected_upload_files": len(self.files)}
-            response = self.transloadit.request.post(
-                "/assemblies", extra_data=extra_data, data=data
+        if rate_limit_retries is None:
+            rate_limit_retries = retries
+        deadline = from_timeout(timeout)
+        dedup_key = None
+        if dedup_cache is not None:
+            dedup_key = self._get_dedup_key()
+            data = dedup_cache.get(dedup_key) if dedup_key is not None else None
+            if data is not None:
+                return dedup.cached_response(data)
+            streams = [
+                file_stream
+                for file_stream in self.files.values()
+                if isinstance(file_stream, sources.StreamSource)
+            ]
+            for stream in streams:
+                stream.digest = hashlib.sha256()
+
+        response = None
+        try:
+            response, assembly_key = self._submit(
+                resumable, rate_limit_retries, resume_store, deadline
             )
-            self._do_tus_upload(
-                response.data.get("assembly_ssl_url"),
-                response.data.get("tus_url"),
-                retries,
+            if resumable and "error" not in response.data:
+                self._upload(
+                    response,
+                    assembly_key,
+                    retries,
+                    max_parallel_uploads=max_parallel_uploads,
+                    parallel_parts=parallel_parts,
+                    min_chunk_size=min_chunk_size,
+                    max_chunk_size=max_chunk_size,
+                    read_ahead=read_ahead,
+                    resume_store=resume_store,
+                    on_progress=on_progress,
+                    deadline=deadline,
+                )
+            if wait:
+                response = self._wait_for_assembly(
+                    response, poll_interval, stream_updates, deadline
+                )
+        except Exception as error:
+            out_of_time = deadline is not None and deadline.expired()
+            if not (out_of_time or isinstance(error, DeadlineExceeded)):
+                raise
+            self._on_deadline_exceeded(response, cancel_on_timeout, error)
+
+        if wait:
+            completed = response.data.get("ok") == "ASSEMBLY_COMPLETED"
+            if dedup_cache is not None and completed and "error" not in response.data:
+                if dedup_key is None:
+                    dedup_key = self._get_dedup_key(streams)
+                dedup_cache.set(dedup_key, response.data)
+        return response
+
+    def submit(self, resumable=True, retries=3, rate_limit_retries=None, **upload_options):
+        """
+        Submit the assembly for processing without waiting for its files to be uploaded.
+
+        The assembly is created before this method returns, so its URL and id are known right
+        away. Files are then uploaded on a background thread, after which the client's
+        <transloadit.poller.StatusPoller> polls the assembly until it finishes.
+
+        :Args:
+            - resumable (Optional[bool]): A flag indicating if the upload should be resumable.
+                Non-resumable files are sent along with the assembly, before this method returns.
+                Defaults to True if not specified.
+            - retries (Optional[int]): See <transloadit.assembly.Assembly.create>.
+            - rate_limit_retries (Optional[int]): See <transloadit.assembly.Assembly.create>.
+            - upload_options: 'max_parallel_uploads', 'parallel_parts', 'min_chunk_size',
+                'max_chunk_size', 'read_ahead', 'resume_store' and 'on_progress', see
+                <transloadit.assembly.Assembly.create>.
+
+        Return an instance of <transloadit.assembly.AssemblyFuture>
+        """
+        if rate_limit_retries is None:
+            rate_limit_retries = retries
+        response, assembly_key = self._submit(
+            resumable, rate_limit_retries, upload_options.get("resume_store")
+        )
+        future = AssemblyFuture(self.transloadit, response, self._get_total_size())
+        if not resumable or "error" in response.data:
+            future.uploaded_bytes = future.total_bytes
+            future._set_uploaded()
+            future._watch()
+            return future
+
+        on_progress = upload_options.pop("on_progress", None)
+
+        def _on_progress(size):
+            future._add_progress(size)
+            if on_progress is not None:
+                on_progress(size)
+
+        def _upload():
+            try:
+                self._upload(
+                    response,
+                    assembly_key,
+                    retries,
+                    cancelled=future._cancel_uploads,
+                    on_progress=_on_progress,
+                    **upload_options,
+                )
+            except BaseException as error:
+                future._set_error(error)
+            else:
+                future._set_uploaded()
+                future._watch()
+
+        threading.Thread(target=_upload, name="transloadit-upload", daemon=True).start()
+        return future
+
+    def _on_deadline_exceeded(self, response, cancel, error):
+        """
+        Raise <transloadit.deadline.DeadlineExceeded> for the assembly created with
+        'response', if any, after 'error' stopped it for lack of time, cancelling it first
+        if 'cancel' is set.
+        """
+        assembly_url = response.data.get("assembly_ssl_url") if response is not None else None
+        if isinstance(error, DeadlineExceeded) and error.response is not None:
+            # the wait for the assembly reports the last status it received.
+            response = error.response
+        if response is not None and not self._assembly_finished(response) and cancel:
+            assembly_url = response.data.get("assembly_ssl_url") or assembly_url
+            if assembly_url:
+                # the budget is spent, so the cancellation gets the default timeouts.
+                response = self.transloadit.cancel_assembly(assembly_url=assembly_url)
+        if isinstance(error, DeadlineExceeded):
+            error.response = response
+            raise error
+        raise DeadlineExceeded(response=response) from error
+
+    def _get_dedup_key(self, streams=()):
+        hashes = {}
+        for field_name, file_stream in self.files.items():
+            if file_stream in streams:
+                hashes[field_name] = file_stream.digest.hexdigest()
+            else:
+                hashes[field_name] = dedup.content_hash(file_stream)
+            if hashes[field_name] is None:
+                return None
+        return dedup.cache_key(self.get_options(), hashes)
+
+    def _get_total_size(self):
+        total = 0
+        for file_stream in self.files.values():
+            if isinstance(file_stream, sources.StreamSource):
+                return None
+            if not isinstance(file_stream, sources.FileSource):
+                file_stream = sources.FileSource(file_stream)
+            total += file_stream.size
+        return total
+
+    def _submit(self, resumable, rate_limit_retries, resume_store=None, deadline=None):
+        """
+        Create the assembly, or resume the one saved in the resume store, and return the
+        response along with the key the assembly is saved under, if any.
+        """
+        data = self.get_options()
+        if not resumable:
+            response = self._post_assembly(
+                rate_limit_retries, data=data, files=self.files, deadline=deadline
             )
-        else:
-            response = self.transloadit.request.post(
-                "/assemblies", data=data, files=self.files
+            return response, None
+
+        assembly_key = None
+        if resume_store is not None:
+            assembly_key = resume.fingerprint_assembly(data, self.files)
+        if assembly_key is not None:
+            response = self._resume_assembly(resume_store, assembly_key, deadline)
+            if response is not None:
+                return response, assembly_key
+
+        extra_data = {"tus_num_expected_upload_files": len(self.files)}
+        response = self._post_assembly(
+            rate_limit_retries, extra_data=extra_data, data=data, deadline=deadline
+        )
+        if assembly_key is not None and "error" not in response.data:
+            resume_store.set_item(
+                assembly_key,
+                json.dumps(
+                    {
+                        "assembly_url": response.data.get("assembly_ssl_url"),
+                        "tus_url": response.data.get("tus_url"),
+                    }
+                ),
             )
+        return response, assembly_key
+
+    def _upload(self, response, assembly_key, retries, resume_store=None, **upload_options):
+        """
+        Upload the files of the assembly created with 'response' over TUS.
+        """
+        assembly_url = response.data.get("assembly_ssl_url")
+        self._do_tus_upload(
+            assembly_url,
+            response.data.get("tus_url"),
+            retries,
+            resume_store=resume_store,
+            **upload_options,
+        )
+        if resume_store is not None:
+            resume_store.remove_items(f"{assembly_url} ")
+            if assembly_key is not None:
+                resume_store.remove_item(assembly_key)
+
+    def _post_assembly(self, retries, **kwargs):
+        """
+        Send the request creating the assembly, and send it again, up to 'retries' more
+        times, while the response says the rate limit of the account is reached. Return
+        the last response.
+        """
+        positions = {}
+        for key, file_stream in (kwargs.get("files") or {}).items():
+            try:
+                positions[key] = sources.unwrap(file_stream).tell()
+            except (AttributeError, OSError, io.UnsupportedOperation):
+                pass
+
+        attempt = 0
+        while True:
+            response = self.transloadit.request.post("/assemblies", **kwargs)
+            if not self._rate_limit_reached(response) or attempt >= retries:
+                return response
+            # wait till rate limit is expired, backing off if the API gives no period.
+            retry_in = response.data.get("info", {}).get("retryIn")
+            if retry_in is None:
+                retry_in = min(2**attempt, RATE_LIMIT_MAX_DELAY)
+            if kwargs.get("deadline") is not None:
+                kwargs["deadline"].check(retry_in)
+            sleep(retry_in)
+            attempt += 1
+            for key, position in positions.items():
+                # the rejected request consumed the file streams.
+                sources.unwrap(kwargs["files"][key]).seek(position)
+
+    def _wait_for_assembly(
+        self, response, poll_interval=1, stream_updates=False, deadline=None
+    ):
+        """
+        Wait until the assembly has finished and return the last response, by subscribing to
+        its update stream if 'stream_updates' is set, or else by polling its status.
+        <transloadit.deadline.DeadlineExceeded> carries the last status received.
+        """
+        assembly_url = response.data.get("assembly_ssl_url")
+        stream_url = response.data.get("update_stream_url")
+        try:
+            if stream_updates and stream_url and not self._assembly_finished(response):
+                event = events.wait_for_final_event(
+                    self.transloadit.request.session, stream_url, deadline=deadline
+                )
+                # if the stream dropped before the assembly finished, fall back to polling.
+                if event is not None:
+                    response = self.transloadit.get_assembly(
+                        assembly_url=assembly_url, timeout=deadline
+                    )
 
-        if wait:
             while not self._assembly_finished(response):
                 # if a wait period is provided by the API due to polling
                 # rate limit, we should use that period, otherwise, we
-                # will fallback to 1 second.
-                sleep_time = response.data.get("info", {}).get("retryIn", 1)
-                sleep(sleep_time)
+                # will fallback to 'poll_interval'.
+                interval = response.data.get("info", {}).get("retryIn", poll_interval)
+                if deadline is not None:
+                    deadline.check(interval)
+                sleep(interval)
                 response = self.transloadit.get_assembly(
-                    assembly_url=response.data.get("assembly_ssl_url")
+                    assembly_url=assembly_url, timeout=deadline
                 )
+        except DeadlineExceeded as error:
+            error.response = response
+            raise
+        return response
 
-        if self._rate_limit_reached(response) and retries:
-            # wait till rate limit is expired
-            sleep(response.data.get("info", {}).get("retryIn", 1))
-            return self.create(wait, resumable, retries - 1)
-
+    def _resume_assembly(self, resume_store, assembly_key, deadline=None):
+        """
+        Return the status of the assembly saved under 'assembly_key' if it is still waiting
+        for uploads, otherwise forget it and return None.
+        """
+        saved = resume_store.get_item(assembly_key)
+        if saved is None:
+            return None
+        saved = json.loads(saved)
+        response = self.transloadit.get_assembly(
+            assembly_url=saved["assembly_url"], timeout=deadline
+        )
+        if response.data.get("ok") != "ASSEMBLY_UPLOADING":
+            resume_store.remove_items(f"{saved['assembly_url']} ")
+            resume_store.remove_item(assembly_key)
+            return None
+        response.data.setdefault("assembly_ssl_url", saved["assembly_url"])
+        response.data.setdefault("tus_url", saved["tus_url"])
         return response
 
     def _assembly_finished(self, response):
-        status = response.data.get("ok")
-        is_aborted = status == "REQUEST_ABORTED"
-        is_canceled = status == "ASSEMBLY_CANCELED"
-        is_completed = status == "ASSEMBLY_COMPLETED"
-        error = response.data.get("error")
-        is_failed = error is not None
-        is_fetch_rate_limit = error == "ASSEMBLY_STATUS_FETCHING_RATE_LIMIT_REACHED"
-        return is_aborted or is_canceled or is_completed or (is_failed and not is_fetch_rate_limit)
+        return assembly_finished(response)
 
     def _rate_limit_reached(self, response):
         return response.data.get("error") == "RATE_LIMIT_REACHED"
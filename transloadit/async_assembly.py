@@ -0,0 +1,269 @@
+import asyncio
+import io
+import os
+from functools import partial
+from urllib.parse import urljoin
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    raise ImportError(
+        "The asyncio client requires aiohttp, install it with 'pip install pytransloadit[async]'."
+    ) from None
+from tusclient.exceptions import TusCommunicationError, TusUploadFailed
+
+from . import assembly, sources, uploader
+from .deadline import DeadlineExceeded, from_timeout
+
+
+class AsyncAssembly(assembly.Assembly):
+    """
+    asyncio counterpart of <transloadit.assembly.Assembly>. Files are uploaded through the
+    client's pooled <aiohttp.ClientSession> and the assembly status is polled without
+    blocking the event loop.
+
+    :Constructor Args:
+        - transloadit (<transloadit.async_client.AsyncTransloadit>)
+        - files (Optional[dict]):
+            Key, value pair of the file's field name and the file stream respectively.
+        - options (Optional[dict]):
+            Params to send along with the assembly. Please see
+            https://transloadit.com/docs/api-docs/#21-create-a-new-assembly for available options.
+    """
+
+    async def _do_tus_upload(
+        self, assembly_url, tus_url, retries, max_parallel_uploads=1, deadline=None
+    ):
+        semaphore = asyncio.Semaphore(max(max_parallel_uploads, 1))
+
+        async def _upload(key):
+            metadata = {
+                "assembly_url": assembly_url,
+                "fieldname": key,
+                "filename": os.path.basename(self.files[key].name),
+            }
+            async with semaphore:
+                await self._tus_upload_file(
+                    tus_url, self.files[key], metadata, retries, deadline
+                )
+
+        if max_parallel_uploads <= 1 or len(self.files) <= 1:
+            for key in self.files:
+                await _upload(key)
+            return
+
+        tasks = {asyncio.ensure_future(_upload(key)): key for key in self.files}
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        errors = {
+            tasks[task]: task.exception()
+            for task in done
+            if task.exception() is not None
+        }
+        if errors:
+            raise assembly.UploadError(errors)
+
+    async def _tus_upload_file(self, tus_url, file_stream, metadata, retries, deadline=None):
+        # the TUS server has its own limits, and failed chunks are resumed below.
+        send = partial(self.transloadit.request.send, deadline=deadline, api=False)
+        file_stream = sources.unwrap(file_stream)
+        file_stream.seek(0, os.SEEK_END)
+        file_size = file_stream.tell()
+
+        headers = {
+            "Tus-Resumable": uploader.TUS_VERSION,
+            "Upload-Length": str(file_size),
+            "Upload-Metadata": uploader.encode_metadata(metadata),
+        }
+        response = await send("POST", tus_url, headers=headers)
+        location = response.headers.get("Location")
+        if location is None:
+            raise TusCommunicationError(
+                None, response.status_code, response.content
+            )
+        upload_url = urljoin(tus_url, location)
+
+        offset = 0
+        retried = 0
+        while offset < file_size:
+            if deadline is not None:
+                deadline.check()
+            file_stream.seek(offset)
+            chunk = await asyncio.to_thread(file_stream.read, uploader.CHUNK_SIZE)
+            try:
+                response = await send(
+                    "PATCH",
+                    upload_url,
+                    data=chunk,
+                    headers={
+                        "Tus-Resumable": uploader.TUS_VERSION,
+                        "Upload-Offset": str(offset),
+                        "Content-Type": "application/offset+octet-stream",
+                    },
+                )
+                if not 200 <= response.status_code < 300:
+                    raise TusUploadFailed(None, response.status_code, response.content)
+                offset = int(response.headers["Upload-Offset"])
+            except (aiohttp.ClientError, TusUploadFailed) as error:
+                if deadline is not None:
+                    deadline.check(uploader.RETRY_DELAY)
+                if retried >= retries:
+                    raise error
+                retried += 1
+                await asyncio.sleep(uploader.RETRY_DELAY)
+                response = await send(
+                    "HEAD", upload_url, headers={"Tus-Resumable": uploader.TUS_VERSION}
+                )
+                offset = int(response.headers.get("Upload-Offset", offset))
+
+    async def create(
+        self,
+        wait=False,
+        resumable=True,
+        retries=3,
+        max_parallel_uploads=1,
+        rate_limit_retries=None,
+        poll_interval=1,
+        timeout=None,
+        cancel_on_timeout=False,
+    ):
+        """
+        Save/Submit the assembly for processing.
+
+        :Args:
+            - wait (Optional[bool]): If set to True, the coroutine will wait till the assembly
+                processing is complete before returning a response.
+            - resumable (Optional[bool]): A flag indicating if the upload should be resumable.
+                This is good for cases of network failures. Defaults to True if not specified.
+            - retries (Optional[int]): In the event of an upload failure, this specifies how many
+                more times the upload should be retried before crying for help. This option is only
+                available if 'resumable' is set to 'True'. Defaults to 3 if not specified.
+            - max_parallel_uploads (Optional[int]): How many files may be uploaded at the same
+                time. See <transloadit.assembly.Assembly.create>. Defaults to 1 if not specified.
+            - rate_limit_retries (Optional[int]): How many more times the assembly is submitted
+                while the rate limit of the account is reached. See
+                <transloadit.assembly.Assembly.create>. Defaults to 'retries' if not specified.
+            - poll_interval (Optional[float]): Seconds to wait between status requests while
+                waiting for the assembly to finish. Defaults to 1 if not specified.
+            - timeout (Optional[float|<transloadit.deadline.Deadline>]): Seconds the whole
+                call may take. See <transloadit.assembly.Assembly.create>.
+            - cancel_on_timeout (Optional[bool]): Whether an assembly that did not finish
+                within 'timeout' is cancelled. Defaults to False.
+        """
+        if rate_limit_retries is None:
+            rate_limit_retries = retries
+        deadline = from_timeout(timeout)
+        data = self.get_options()
+        response = None
+        try:
+            if resumable:
+                extra_data = {"tus_num_expected_upload_files": len(self.files)}
+                response = await self._post_assembly(
+                    rate_limit_retries, extra_data=extra_data, data=data, deadline=deadline
+                )
+                if "error" in response.data:
+                    return response
+                await self._do_tus_upload(
+                    response.data.get("assembly_ssl_url"),
+                    response.data.get("tus_url"),
+                    retries,
+                    max_parallel_uploads,
+                    deadline,
+                )
+            else:
+                response = await self._post_assembly(
+                    rate_limit_retries, data=data, files=self.files, deadline=deadline
+                )
+
+            if wait:
+                response = await self._wait_for_assembly(response, poll_interval, deadline)
+        except Exception as error:
+            out_of_time = deadline is not None and deadline.expired()
+            if not (out_of_time or isinstance(error, DeadlineExceeded)):
+                raise
+            await self._on_deadline_exceeded(response, cancel_on_timeout, error)
+        return response
+
+    def add_file(self, file_stream, field_name=None):
+        """
+        Add a file to be uploaded along with the Assembly.
+
+        :Args:
+            - file_stream (file|<transloadit.sources.FileSource>): File stream object of the file
+                to upload. It must be seekable.
+            - field_name (Optional[str]): The field name assigned to the file.
+                If not specified, a field name is auto-generated.
+        """
+        if isinstance(file_stream, sources.StreamSource):
+            self.add_stream(file_stream, file_stream.name, field_name)
+        super().add_file(file_stream, field_name)
+
+    def add_stream(self, *args, **kwargs):
+        """
+        Not supported: non-seekable streams are only uploaded by
+        <transloadit.assembly.Assembly>. Write the stream to a file and pass it to
+        'add_file()' instead.
+        """
+        raise TypeError("AsyncAssembly cannot upload non-seekable streams, use 'add_file()'.")
+
+    def submit(self, *args, **kwargs):
+        """
+        Not supported: <transloadit.assembly.Assembly.submit> uploads files and polls the
+        assembly on background threads. Await 'create()' instead, e.g. in a task.
+        """
+        raise TypeError("AsyncAssembly cannot be submitted, use 'await assembly.create()'.")
+
+    async def _on_deadline_exceeded(self, response, cancel, error):
+        assembly_url = response.data.get("assembly_ssl_url") if response is not None else None
+        if isinstance(error, DeadlineExceeded) and error.response is not None:
+            response = error.response
+        if response is not None and not self._assembly_finished(response) and cancel:
+            assembly_url = response.data.get("assembly_ssl_url") or assembly_url
+            if assembly_url:
+                response = await self.transloadit.cancel_assembly(assembly_url=assembly_url)
+        if isinstance(error, DeadlineExceeded):
+            error.response = response
+            raise error
+        raise DeadlineExceeded(response=response) from error
+
+    async def _post_assembly(self, retries, **kwargs):
+        positions = {}
+        for key, file_stream in (kwargs.get("files") or {}).items():
+            try:
+                positions[key] = sources.unwrap(file_stream).tell()
+            except (AttributeError, OSError, io.UnsupportedOperation):
+                pass
+
+        attempt = 0
+        while True:
+            response = await self.transloadit.request.post("/assemblies", **kwargs)
+            if not self._rate_limit_reached(response) or attempt >= retries:
+                return response
+            retry_in = response.data.get("info", {}).get("retryIn")
+            if retry_in is None:
+                retry_in = min(2**attempt, assembly.RATE_LIMIT_MAX_DELAY)
+            if kwargs.get("deadline") is not None:
+                kwargs["deadline"].check(retry_in)
+            await asyncio.sleep(retry_in)
+            attempt += 1
+            for key, position in positions.items():
+                sources.unwrap(kwargs["files"][key]).seek(position)
+
+    async def _wait_for_assembly(self, response, poll_interval=1, deadline=None):
+        assembly_url = response.data.get("assembly_ssl_url")
+        try:
+            while not self._assembly_finished(response):
+                interval = response.data.get("info", {}).get("retryIn", poll_interval)
+                if deadline is not None:
+                    deadline.check(interval)
+                await asyncio.sleep(interval)
+                response = await self.transloadit.get_assembly(
+                    assembly_url=assembly_url, timeout=deadline
+                )
+        except DeadlineExceeded as error:
+            error.response = response
+            raise
+        return response
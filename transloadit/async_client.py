@@ -0,0 +1,128 @@
+import asyncio
+from typing import Optional
+
+from . import assembly, async_assembly, async_request, client, hedge, ratelimit, retry
+
+
+class AsyncTransloadit(client.Transloadit):
+    """
+    asyncio client interface to the Transloadit API.
+
+    It exposes the same methods as <transloadit.client.Transloadit>, but every method that
+    talks to the API returns an awaitable, e.g.:
+
+        async with AsyncTransloadit(key, secret) as tl:
+            response = await tl.get_assembly(assembly_id)
+
+    The methods that work on background threads, 'poller', 'process_many', 'submit_input'
+    and 'download_results', are not supported and raise TypeError.
+
+    :Constructor Args:
+        see <transloadit.client.Transloadit>.
+    """
+
+    def __init__(
+            self,
+            auth_key: str,
+            auth_secret: str,
+            service: str = "https://api2.transloadit.com",
+            duration: int = 300,
+            pool_connections: int = 10,
+            pool_maxsize: int = 10,
+            pool_block: bool = False,
+            keep_alive: bool = True,
+            rate_limiter: Optional[ratelimit.RateLimiter] = None,
+            retry_policy: Optional[retry.RetryPolicy] = None,
+            hedge_policy: Optional[hedge.HedgePolicy] = None,
+    ):
+        super().__init__(
+            auth_key,
+            auth_secret,
+            service,
+            duration,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            hedge_policy=hedge_policy,
+        )
+        self.request = async_request.AsyncRequest(
+            self,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+        )
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' with AsyncTransloadit.")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def poller(self):
+        raise TypeError(
+            "AsyncTransloadit has no status poller, await 'assembly.create(wait=True)' or "
+            "iterate over 'iter_results()' instead."
+        )
+
+    def process_many(self, *args, **kwargs):
+        raise TypeError(
+            "AsyncTransloadit cannot process many inputs, create their assemblies with "
+            "'asyncio.gather()' instead."
+        )
+
+    def submit_input(self, *args, **kwargs):
+        raise TypeError(
+            "AsyncTransloadit cannot submit assemblies, use 'await assembly.create()' instead."
+        )
+
+    def download_results(self, *args, **kwargs):
+        raise TypeError(
+            "AsyncTransloadit cannot download results, use Transloadit.download_results() "
+            "instead."
+        )
+
+    async def close(self):
+        """
+        Close all pooled HTTP connections held by the client.
+        """
+        await self.request.close()
+
+    async def warmup(self, connections: Optional[int] = None):
+        """
+        Pre-open pooled connections to the Transloadit API.
+
+        :Args:
+            - connections (Optional[int]): How many connections to open. Defaults to the
+                client's 'pool_maxsize' if not specified.
+        """
+        await self.request.warmup(connections)
+
+    async def iter_results(self, assembly_url: str, poll_interval: float = 1):
+        """
+        Asynchronously yield each step result of the assembly at 'assembly_url' as soon as it
+        appears, as a (step name, result) tuple, until the assembly has finished.
+
+        :Args:
+            - assembly_url (str)
+            - poll_interval (Optional[float]): Seconds to wait between status requests.
+                Defaults to 1.
+        """
+        seen = set()
+        while True:
+            response = await self.get_assembly(assembly_url=assembly_url)
+            for step_result in assembly.new_results(response, seen):
+                yield step_result
+            if assembly.assembly_finished(response):
+                return
+            await asyncio.sleep(response.data.get("info", {}).get("retryIn", poll_interval))
+
+    def new_assembly(self, params: dict = None) -> async_assembly.AsyncAssembly:
+        """
+        Return an instance of <transloadit.async_assembly.AsyncAssembly> which would be used
+        to create a new assembly.
+        """
+        return async_assembly.AsyncAssembly(self, options=params)
@@ -0,0 +1,290 @@
+import asyncio
+import os
+from time import monotonic
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    raise ImportError(
+        "The asyncio client requires aiohttp, install it with 'pip install pytransloadit[async]'."
+    ) from None
+
+from . import sources
+from .deadline import DeadlineExceeded
+from .request import CONNECT_TIMEOUT, Request, TIMEOUT, _json_or_none, _past_deadline
+from .response import BufferedResponse, as_async_response
+
+_TRANSIENT_ERRORS = (
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+)
+
+
+class AsyncRequest(Request):
+    """
+    asyncio counterpart of <transloadit.request.Request>. Requests are signed exactly
+    like their synchronous counterparts, but are sent through a pooled
+    <aiohttp.ClientSession> and must be awaited.
+
+    :Constructor Args:
+        see <transloadit.request.Request>.
+    """
+
+    @property
+    def session(self):
+        """
+        Return the pooled <aiohttp.ClientSession>, creating it on first access.
+        This must happen while an event loop is running.
+        """
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_connections * self.pool_maxsize,
+            limit_per_host=self.pool_maxsize,
+            force_close=not self.keep_alive,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=self.HEADERS,
+            timeout=aiohttp.ClientTimeout(connect=CONNECT_TIMEOUT, sock_read=TIMEOUT),
+        )
+
+    async def close(self):
+        """
+        Close the pooled session and all of its open connections.
+        """
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
+
+    async def warmup(self, connections=None):
+        """
+        Pre-open connections to the Transloadit API.
+
+        :Args:
+            - connections (Optional[int]): How many connections to open. Defaults to
+                'pool_maxsize' if not specified.
+        """
+        connections = connections or self.pool_maxsize
+        await asyncio.gather(
+            *(self.send("HEAD", self.transloadit.service) for _ in range(connections))
+        )
+
+    async def send(
+        self, method, url, data=None, deadline=None, read_timeout=TIMEOUT, api=True, **kwargs
+    ):
+        """
+        Send a raw HTTP request through the pooled session, after waiting for the client's
+        <transloadit.ratelimit.RateLimiter>, if any, and return a
+        <transloadit.response.BufferedResponse>. Transient failures are retried according
+        to the client's <transloadit.retry.RetryPolicy>, if any.
+
+        'data' may be a callable returning the body, called again for each attempt.
+        'deadline' and 'read_timeout' bound each attempt as in
+        <transloadit.request.Request._send>. Requests that are not API requests, such as
+        TUS uploads, pass 'api=False' to skip the rate limiter and the retry policy, as
+        <transloadit.uploader.Uploader> does.
+        """
+        rate_limiter = self.transloadit.rate_limiter if api else None
+        retry_policy = self.transloadit.retry_policy if api else None
+        started = monotonic()
+        attempt = 0
+        while True:
+            if rate_limiter is not None:
+                delay = rate_limiter.reserve(method, url, deadline)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            if deadline is None:
+                timeout = CONNECT_TIMEOUT, read_timeout or TIMEOUT
+            else:
+                timeout = deadline.timeout(CONNECT_TIMEOUT, read_timeout)
+            if retry_policy is not None:
+                timeout = tuple(retry_policy.timeout(started, value) for value in timeout)
+            # like requests, 'sock_read' bounds each wait for the server, not the whole
+            # attempt, so that large uploads are not cut off.
+            kwargs["timeout"] = aiohttp.ClientTimeout(
+                total=None if deadline is None else deadline.remaining(),
+                connect=timeout[0],
+                sock_read=timeout[1],
+            )
+            try:
+                async with self.session.request(
+                    method, url, data=data() if callable(data) else data, **kwargs
+                ) as response:
+                    buffered = BufferedResponse(
+                        response.status, response.headers, await response.read()
+                    )
+            except _TRANSIENT_ERRORS as error:
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded() from error
+                if retry_policy is None:
+                    raise
+                delay = retry_policy.retry_delay(
+                    method,
+                    attempt,
+                    started,
+                    error=error,
+                    sent=not isinstance(error, aiohttp.ClientConnectorError),
+                )
+                if delay is None or _past_deadline(deadline, delay):
+                    raise
+            else:
+                if rate_limiter is not None:
+                    rate_limiter.observe(method, url, _json_or_none(buffered))
+                if retry_policy is None:
+                    return buffered
+                delay = retry_policy.retry_delay(
+                    method, attempt, started, buffered.status_code, buffered.headers
+                )
+                if delay is None or _past_deadline(deadline, delay):
+                    return buffered
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @as_async_response
+    async def get(self, path, params=None, deadline=None):
+        """
+        Makes a HTTP GET request.
+
+        :Args:
+            - path (str): URL path to which the request should be made.
+            - params (Optional[dict]): Optional params to send along with the request.
+            - deadline (Optional[<transloadit.deadline.Deadline>]): Time budget of the request,
+                retries included.
+
+        The request is hedged according to the client's <transloadit.hedge.HedgePolicy>, if
+        any.
+
+        Return an instance of <transloadit.response.Response>
+        """
+        url = self._get_full_url(path)
+        params = self._to_payload(params)
+        hedge_policy = self.transloadit.hedge_policy
+        if hedge_policy is None:
+            return await self.send("GET", url, params=params, deadline=deadline)
+        return await self._hedged_send(
+            hedge_policy, "GET", url, params=params, deadline=deadline
+        )
+
+    async def _hedged_send(self, hedge_policy, method, url, **kwargs):
+        """
+        asyncio counterpart of <transloadit.request.Request._hedged_send>. The request that
+        loses the race is cancelled.
+        """
+
+        async def send():
+            started = monotonic()
+            response = await self.send(method, url, **kwargs)
+            return response, monotonic() - started
+
+        delay = hedge_policy.start()
+        if delay is None:
+            response, latency = await send()
+            hedge_policy.record(latency)
+            return response
+
+        primary = asyncio.ensure_future(send())
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done and hedge_policy.try_hedge():
+                pending.add(asyncio.ensure_future(send()))
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    response, latency = task.result()
+                    hedge_policy.record(latency, hedge=task is not primary)
+                    return response
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @as_async_response
+    async def post(self, path, data=None, extra_data=None, files=None, deadline=None):
+        """
+        Makes a HTTP POST request.
+
+        :Args:
+            - path (str): URL path to which the request should be made.
+            - data (Optional[dict]): The body of the request. This would be stored under the 'params' field.
+            - extra_data (Optional[dict]): This is also added to the body of the request but not under the
+                'params' field.
+            - files (Optional[dict]): Files to upload with the request. This should be a key, value pair of
+                field name and file stream respectively.
+            - deadline (Optional[<transloadit.deadline.Deadline>]): Time budget of the request,
+                retries included. Files are then sent for as long as the budget allows, instead
+                of failing after 60 seconds.
+
+        Return an instance of <transloadit.response.Response>
+        """
+        data = self._to_payload(data)
+        if extra_data:
+            data.update({key: str(value) for key, value in extra_data.items()})
+        read_timeout = TIMEOUT
+        if files:
+            fields = data
+            read_timeout = None
+
+            def data():
+                # forms can only be sent once, so each attempt gets its own.
+                form = aiohttp.FormData()
+                for key, value in fields.items():
+                    form.add_field(key, value)
+                for key, file_stream in files.items():
+                    filename = getattr(file_stream, "name", None) or key
+                    form.add_field(
+                        key, sources.unwrap(file_stream), filename=os.path.basename(filename)
+                    )
+                return form
+
+        return await self.send(
+            "POST",
+            self._get_full_url(path),
+            data=data,
+            deadline=deadline,
+            read_timeout=read_timeout,
+        )
+
+    @as_async_response
+    async def put(self, path, data=None, deadline=None):
+        """
+        Makes a HTTP PUT request.
+
+        :Args:
+            - path (str): URL path to which the request should be made.
+            - data (Optional[dict]): The body of the request.
+            - deadline (Optional[<transloadit.deadline.Deadline>]): Time budget of the request,
+                retries included.
+
+        Return an instance of <transloadit.response.Response>
+        """
+        return await self.send(
+            "PUT", self._get_full_url(path), data=self._to_payload(data), deadline=deadline
+        )
+
+    @as_async_response
+    async def delete(self, path, data=None, deadline=None):
+        """
+        Makes a HTTP DELETE request.
+
+        :Args:
+            - path (str): URL path to which the request should be made.
+            - data (Optional[dict]): The body of the request.
+            - deadline (Optional[<transloadit.deadline.Deadline>]): Time budget of the request,
+                retries included.
+
+        Return an instance of <transloadit.response.Response>
+        """
+        return await self.send(
+            "DELETE", self._get_full_url(path), data=self._to_payload(data), deadline=deadline
+        )
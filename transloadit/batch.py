@@ -0,0 +1,331 @@
+import glob
+import json
+import math
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, CancelledError, wait
+
+from . import resume
+
+PENDING = "pending"
+UPLOADING = "uploading"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+STATES = (PENDING, UPLOADING, PROCESSING, DONE, FAILED)
+
+# how many checkpoint rows are read or inserted at a time.
+PAGE_SIZE = 500
+
+
+def items_from_glob(pattern):
+    """
+    Yield a batch item for each file matching the glob 'pattern', keyed by its path.
+    '**' matches any number of directories.
+    """
+    for path in sorted(glob.iglob(pattern, recursive=True)):
+        yield {"key": path, "path": path}
+
+
+def items_from_manifest(path):
+    """
+    Yield the batch items of a JSONL manifest. Each line is an object with the 'path' of a
+    file, and optionally the 'fields' of its assembly and an 'id' it is checkpointed under,
+    which defaults to its path.
+    """
+    with open(path, encoding="utf-8") as manifest:
+        for number, line in enumerate(manifest, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                item = {"path": entry["path"], "fields": entry.get("fields")}
+            except (ValueError, KeyError, TypeError, AttributeError):
+                raise ValueError(f"Invalid manifest entry on line {number} of {path}.")
+            item["key"] = str(entry.get("id", item["path"]))
+            yield item
+
+
+class BatchSummary:
+    """
+    Outcome of a <transloadit.batch.BatchRunner.run>.
+
+    :Attributes:
+        - counts (dict): How many items of the checkpoint are in each state.
+        - processed (int): How many items were done during the run.
+        - elapsed (float): Duration of the run in seconds.
+        - throughput (float): Items done per second during the run.
+        - latencies (list): Seconds from submission to completion of each item done during
+            the run, in ascending order.
+    """
+
+    def __init__(self, counts, processed, elapsed, latencies):
+        self.counts = counts
+        self.processed = processed
+        self.elapsed = elapsed
+        self.latencies = sorted(latencies)
+        self.throughput = self.processed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def failed(self):
+        return self.counts.get(FAILED, 0)
+
+    def percentile(self, percent):
+        """
+        Return the latency below which 'percent' percent of the items were done, or None if
+        no item was done during the run.
+        """
+        if not self.latencies:
+            return None
+        rank = max(math.ceil(percent / 100 * len(self.latencies)), 1)
+        return self.latencies[rank - 1]
+
+    def __str__(self):
+        lines = [
+            "items: " + ", ".join(f"{self.counts.get(state, 0)} {state}" for state in STATES),
+            f"processed {self.processed} in {self.elapsed:.1f}s "
+            f"({self.throughput:.2f} items/s)",
+        ]
+        if self.latencies:
+            lines.append(
+                f"latency: p50 {self.percentile(50):.2f}s, p95 {self.percentile(95):.2f}s, "
+                f"max {self.latencies[-1]:.2f}s"
+            )
+        return "\n".join(lines)
+
+
+class BatchRunner:
+    """
+    Processes many files with one assembly each, keeping the state of every item in an
+    SQLite checkpoint, so an interrupted batch resumes where it stopped when it is run again.
+
+    Items go from "pending" to "uploading" once their assembly is created, to "processing"
+    once their files are uploaded, and end "done" or "failed". On the next run, finished
+    items are skipped, the assemblies of processing items are polled again instead of being
+    created again, and uploading items resume their uploads from the same checkpoint file.
+
+    :Attributes:
+        - transloadit (<transloadit.client.Transloadit>)
+        - checkpoint_path (str): Path of the SQLite checkpoint file.
+
+    :Constructor Args:
+        - transloadit (<transloadit.client.Transloadit>)
+        - checkpoint_path (str): Path of the SQLite checkpoint file. It is created if it does
+            not exist.
+        - template_id (Optional[str]): The id of the template to process items with.
+        - params (Optional[dict]): Other params of each assembly, such as 'steps'.
+        - max_in_flight (Optional[int]): How many assemblies may be in flight at the same
+            time. Defaults to 4.
+        - submit_options: Options passed to <transloadit.assembly.Assembly.submit>.
+    """
+
+    def __init__(
+        self,
+        transloadit,
+        checkpoint_path,
+        template_id=None,
+        params=None,
+        max_in_flight=4,
+        **submit_options,
+    ):
+        self.transloadit = transloadit
+        self.checkpoint_path = checkpoint_path
+        self.template_id = template_id
+        self.params = params
+        self.max_in_flight = max_in_flight
+        self.submit_options = submit_options
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            checkpoint_path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS batch_items ("
+            "key TEXT PRIMARY KEY, path TEXT NOT NULL, fields TEXT, "
+            "state TEXT NOT NULL, assembly_url TEXT, error TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, started_at REAL, finished_at REAL)"
+        )
+        self._resume_store = resume.SQLiteResumeStore(checkpoint_path)
+
+    def _execute(self, statement, parameters=()):
+        with self._lock:
+            return self._connection.execute(statement, parameters).fetchall()
+
+    def add(self, items):
+        """
+        Add items to the checkpoint as pending, and return how many were new. Items whose key
+        is already checkpointed keep their state.
+
+        :Args:
+            - items (iterable): Dicts with the 'path' of a file, and optionally the 'fields' of
+                its assembly and the 'key' it is checkpointed under, which defaults to its path.
+        """
+        added = 0
+        rows = []
+        for item in items:
+            fields = item.get("fields")
+            rows.append(
+                (
+                    str(item.get("key") or item["path"]),
+                    item["path"],
+                    json.dumps(fields) if fields is not None else None,
+                    PENDING,
+                )
+            )
+            if len(rows) == PAGE_SIZE:
+                added += self._insert(rows)
+                rows = []
+        if rows:
+            added += self._insert(rows)
+        return added
+
+    def _insert(self, rows):
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO batch_items (key, path, fields, state) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            added = cursor.rowcount
+            cursor.execute("COMMIT")
+        return added
+
+    def counts(self):
+        """
+        Return how many items of the checkpoint are in each state.
+        """
+        rows = self._execute("SELECT state, COUNT(*) FROM batch_items GROUP BY state")
+        return dict(rows)
+
+    def run(self, retry_failed=False):
+        """
+        Process every unfinished item of the checkpoint and return a
+        <transloadit.batch.BatchSummary>.
+
+        :Args:
+            - retry_failed (Optional[bool]): Whether to process failed items again. Defaults to
+                False.
+        """
+        if retry_failed:
+            self._execute(
+                "UPDATE batch_items SET state = ?, error = NULL WHERE state = ?",
+                (PENDING, FAILED),
+            )
+        started = time.monotonic()
+        processed = 0
+        latencies = []
+        rows = self._unfinished()
+        in_flight = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < self.max_in_flight:
+                row = next(rows, None)
+                if row is None:
+                    exhausted = True
+                    break
+                future = self._start(*row)
+                if future is not None:
+                    in_flight[future] = row[0]
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished, latency = self._finish(in_flight.pop(future), future)
+                processed += finished
+                if latency is not None:
+                    latencies.append(latency)
+
+        return BatchSummary(self.counts(), processed, time.monotonic() - started, latencies)
+
+    def _unfinished(self):
+        rowid = 0
+        while True:
+            rows = self._execute(
+                "SELECT rowid, key, path, fields, state, assembly_url FROM batch_items "
+                "WHERE rowid > ? AND state IN (?, ?, ?) ORDER BY rowid LIMIT ?",
+                (rowid, PENDING, UPLOADING, PROCESSING, PAGE_SIZE),
+            )
+            for row in rows:
+                yield row[1:]
+            if len(rows) < PAGE_SIZE:
+                return
+            rowid = rows[-1][0]
+
+    def _start(self, key, path, fields, state, assembly_url):
+        if state == PROCESSING and assembly_url:
+            return self.transloadit.poller.watch(assembly_url)
+
+        self._execute(
+            "UPDATE batch_items SET attempts = attempts + 1, "
+            "started_at = COALESCE(started_at, ?) WHERE key = ?",
+            (time.time(), key),
+        )
+        try:
+            future = self.transloadit.submit_input(
+                path,
+                self.template_id,
+                json.loads(fields) if fields is not None else None,
+                self.params,
+                **dict(self.submit_options, resume_store=self._resume_store),
+            )
+        except Exception as error:
+            self._set_failed(key, error)
+            return None
+
+        self._execute(
+            "UPDATE batch_items SET state = ?, assembly_url = ? WHERE key = ?",
+            (UPLOADING, future.assembly_url, key),
+        )
+        future.add_uploaded_callback(
+            lambda future: self._execute(
+                "UPDATE batch_items SET state = ? WHERE key = ? AND state = ?",
+                (PROCESSING, key, UPLOADING),
+            )
+        )
+        return future
+
+    def _finish(self, key, future):
+        try:
+            response = future.result()
+        except (Exception, CancelledError) as error:
+            self._set_failed(key, error)
+            return False, None
+
+        error = response.data.get("error")
+        if error is None and response.data.get("ok") == "ASSEMBLY_CANCELED":
+            error = "ASSEMBLY_CANCELED"
+        if error is not None:
+            self._set_failed(key, response.data.get("message") or error)
+            return False, None
+
+        finished_at = time.time()
+        self._execute(
+            "UPDATE batch_items SET state = ?, error = NULL, finished_at = ? WHERE key = ?",
+            (DONE, finished_at, key),
+        )
+        rows = self._execute("SELECT started_at FROM batch_items WHERE key = ?", (key,))
+        started_at = rows[0][0] if rows else None
+        return True, finished_at - started_at if started_at is not None else None
+
+    def _set_failed(self, key, error):
+        self._execute(
+            "UPDATE batch_items SET state = ?, error = ?, finished_at = ? WHERE key = ?",
+            (FAILED, str(error) or repr(error), time.time(), key),
+        )
+
+    def close(self):
+        """
+        Close the checkpoint.
+        """
+        self._resume_store.close()
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
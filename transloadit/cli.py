@@ -0,0 +1,97 @@
+import argparse
+import os
+import sys
+
+from . import batch
+from .client import Transloadit
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog="transloadit", description="Command line interface to Transloadit."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch_parser = commands.add_parser(
+        "batch",
+        help="Process many files with one assembly each, resuming an interrupted batch.",
+    )
+    source = batch_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--glob", help="Glob pattern of the files to process, e.g. 'in/**/*.jpg'.")
+    source.add_argument(
+        "--manifest",
+        help="JSONL file with one {\"path\": ..., \"fields\": ..., \"id\": ...} object per line.",
+    )
+    batch_parser.add_argument("--template", required=True, help="Id of the template to use.")
+    batch_parser.add_argument(
+        "--checkpoint",
+        default="transloadit-batch.sqlite",
+        help="SQLite file recording the state of each item. Defaults to %(default)s.",
+    )
+    batch_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="How many assemblies may be in flight at the same time. Defaults to %(default)s.",
+    )
+    batch_parser.add_argument(
+        "--retry-failed", action="store_true", help="Process failed items again."
+    )
+    batch_parser.add_argument(
+        "--key",
+        default=os.environ.get("TRANSLOADIT_KEY"),
+        help="Auth key. Defaults to $TRANSLOADIT_KEY.",
+    )
+    batch_parser.add_argument(
+        "--secret",
+        default=os.environ.get("TRANSLOADIT_SECRET"),
+        help="Auth secret. Defaults to $TRANSLOADIT_SECRET.",
+    )
+    batch_parser.add_argument(
+        "--service", default="https://api2.transloadit.com", help="URL of the Transloadit API."
+    )
+    return parser
+
+
+def run_batch(args):
+    """
+    Run the 'batch' command and return its exit status: 0 if every item is done, 1 otherwise.
+    """
+    if args.glob is not None:
+        items = batch.items_from_glob(args.glob)
+    else:
+        items = batch.items_from_manifest(args.manifest)
+
+    with Transloadit(args.key, args.secret, service=args.service) as transloadit:
+        with batch.BatchRunner(
+            transloadit,
+            args.checkpoint,
+            template_id=args.template,
+            max_in_flight=args.concurrency,
+        ) as runner:
+            added = runner.add(items)
+            print(f"added {added} new items to {args.checkpoint}")
+            summary = runner.run(retry_failed=args.retry_failed)
+    print(summary)
+    return 1 if summary.failed else 0
+
+
+def main(argv=None):
+    """
+    Entry point of the 'transloadit' command. Return its exit status.
+
+    :Args:
+        - argv (Optional[list]): The arguments of the command. Defaults to 'sys.argv[1:]'.
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        if not args.key or not args.secret:
+            parser.error("--key and --secret are required, or set TRANSLOADIT_KEY and "
+                         "TRANSLOADIT_SECRET.")
+        return run_batch(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,16 @@
+import copy
+import os
 import typing
 import hmac
 import hashlib
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, CancelledError, wait
 from urllib.parse import urlencode, quote_plus
 
 from typing import Optional, Union, List
 
-from . import assembly, request, template
+from . import assembly, deadline, download, hedge, poller, ratelimit, request, retry, template
 
 if typing.TYPE_CHECKING:
     from requests import Response
@@ -22,6 +26,15 @@ class Transloadit:
         - service (Optional[str]): URL of the Transloadit API.
         - duration (int): How long in seconds for which a Transloadit request should be valid.
         - request (transloadit.request.Request): An instance of the Transloadit HTTP Request object.
+        - poller (transloadit.poller.StatusPoller): Background poller of assembly statuses,
+            started on first use. Accessing it once the client is closed raises RuntimeError.
+        - rate_limiter (transloadit.ratelimit.RateLimiter): Client-side rate limiter of API
+            requests, if any.
+        - retry_policy (transloadit.retry.RetryPolicy): Policy retrying API requests after
+            transient failures.
+        - hedge_policy (transloadit.hedge.HedgePolicy): Policy hedging slow GET requests, if
+            any.
+        - poller_options (dict): Keyword arguments the status poller is created with.
 
     :Constructor Args:
         - auth_key (str): Transloadit auth key.
@@ -32,6 +45,35 @@ class Transloadit:
         - duration (Optional[int]):
             How long in seconds for which a Transloadit request should be valid. Defaults to 300
             if not specified.
+        - pool_connections (Optional[int]):
+            Number of distinct hosts for which HTTP connection pools are cached. Defaults to 10.
+        - pool_maxsize (Optional[int]):
+            Maximum number of keep-alive connections per host. Raise this when sharing one client
+            across many worker threads. Defaults to 10.
+        - pool_block (Optional[bool]):
+            Whether requests should wait for a free pooled connection instead of opening
+            throwaway ones once 'pool_maxsize' is reached. Defaults to False.
+        - keep_alive (Optional[bool]):
+            Whether HTTP connections should be kept open between requests. Defaults to True.
+        - rate_limiter (Optional[<transloadit.ratelimit.RateLimiter>]):
+            If set, every API request waits for a token of the limiter before it is sent.
+            Share one limiter between clients to limit them together.
+        - retry_policy (Optional[<transloadit.retry.RetryPolicy>]):
+            How API requests are retried after connection errors, timeouts, 429 and 5xx
+            responses. Defaults to 'RetryPolicy()'. Pass 'RetryPolicy(retries=0)' to disable
+            retries.
+        - hedge_policy (Optional[<transloadit.hedge.HedgePolicy>]):
+            If set, GET requests that are not answered in time are sent a second time, and
+            the first response is used. Defaults to no hedging.
+        - poller_options (Optional[dict]):
+            Keyword arguments of the <transloadit.poller.StatusPoller> that follows submitted
+            assemblies, e.g. {'interval': 5, 'max_workers': 8, 'stream_updates': True}.
+
+    The client holds pooled HTTP connections and, once used, a background status poller.
+    Call 'close()' when done with it, or use it as a context manager:
+
+        with Transloadit(key, secret) as tl:
+            tl.get_assembly(assembly_id)
     """
 
     def __init__(
@@ -40,6 +82,14 @@ class Transloadit:
             auth_secret: str,
             service: str = "https://api2.transloadit.com",
             duration: int = 300,
+            pool_connections: int = 10,
+            pool_maxsize: int = 10,
+            pool_block: bool = False,
+            keep_alive: bool = True,
+            rate_limiter: Optional[ratelimit.RateLimiter] = None,
+            retry_policy: Optional[retry.RetryPolicy] = None,
+            hedge_policy: Optional[hedge.HedgePolicy] = None,
+            poller_options: Optional[dict] = None,
     ):
         if not service.startswith(("http://", "https://")):
             service = "https://" + service
@@ -48,7 +98,61 @@ class Transloadit:
         self.auth_key = auth_key
         self.auth_secret = auth_secret
         self.duration = duration
-        self.request = request.Request(self)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else retry.RetryPolicy()
+        self.hedge_policy = hedge_policy
+        self.poller_options = poller_options or {}
+        self.request = request.Request(
+            self,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+        )
+        self._poller = None
+        self._poller_lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def poller(self) -> poller.StatusPoller:
+        """
+        Return the <transloadit.poller.StatusPoller> shared by the client, creating it on
+        first use. Raise RuntimeError once the client is closed, instead of starting a poller
+        that would never be stopped.
+        """
+        with self._poller_lock:
+            if self._closed:
+                raise RuntimeError("The client is closed.")
+            if self._poller is None:
+                self._poller = poller.StatusPoller(self, **self.poller_options)
+            return self._poller
+
+    def close(self):
+        """
+        Stop the status poller and close all pooled HTTP connections held by the client.
+        """
+        with self._poller_lock:
+            self._closed = True
+            status_poller, self._poller = self._poller, None
+        if status_poller is not None:
+            status_poller.close()
+        self.request.close()
+
+    def warmup(self, connections: Optional[int] = None):
+        """
+        Pre-open pooled connections to the Transloadit API.
+
+        :Args:
+            - connections (Optional[int]): How many connections to open. Defaults to the
+                client's 'pool_maxsize' if not specified.
+        """
+        self.request.warmup(connections)
 
     def new_assembly(self, params: dict = None) -> assembly.Assembly:
         """
@@ -57,7 +161,124 @@ class Transloadit:
         """
         return assembly.Assembly(self, options=params)
 
-    def get_assembly(self, assembly_id: str = None, assembly_url: str = None):
+    def process_many(
+        self,
+        inputs: typing.Iterable,
+        template_id: Optional[str] = None,
+        fields_fn: Optional[typing.Callable] = None,
+        max_in_flight: int = 4,
+        params: Optional[dict] = None,
+        return_exceptions: bool = False,
+        **submit_options,
+    ) -> typing.Iterator:
+        """
+        Process each input with its own assembly, keeping at most 'max_in_flight' assemblies
+        uploading or processing at a time, and yield an (input, response) tuple for each
+        input in the order their assemblies finish.
+
+        Inputs are pulled from the iterable only when an assembly slot is free, so a long or
+        endless input stream is consumed at the pace of processing, and memory use does not
+        depend on its length.
+
+        :Args:
+            - inputs (iterable): File paths or file streams to process, one per assembly.
+                Files opened from paths are closed once their assembly is done.
+            - template_id (Optional[str]): The id of the template to process inputs with.
+            - fields_fn (Optional[callable]): Called with each input to return the 'fields'
+                of its assembly.
+            - max_in_flight (Optional[int]): How many assemblies may be in flight at the same
+                time. Defaults to 4.
+            - params (Optional[dict]): Other params of each assembly, such as 'steps'.
+            - return_exceptions (Optional[bool]): If set, an input whose assembly fails to be
+                submitted, uploaded or polled is yielded along with the exception instead of
+                a response. Otherwise the exception is raised. Defaults to False.
+            - submit_options: Options passed to <transloadit.assembly.Assembly.submit>.
+        """
+        inputs = iter(inputs)
+        in_flight = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    item = next(inputs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                try:
+                    future = self.submit_input(
+                        item,
+                        template_id,
+                        fields_fn(item) if fields_fn is not None else None,
+                        params,
+                        **submit_options,
+                    )
+                except Exception as error:
+                    if not return_exceptions:
+                        raise
+                    yield item, error
+                    continue
+                in_flight[future] = item
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except (Exception, CancelledError) as error:
+                    if not return_exceptions:
+                        raise
+                    result = error
+                yield item, result
+
+    def submit_input(
+        self,
+        item: Union[str, os.PathLike, typing.BinaryIO],
+        template_id: Optional[str] = None,
+        fields: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **submit_options,
+    ) -> assembly.AssemblyFuture:
+        """
+        Submit a new assembly processing one input, as done for each input of
+        'process_many', and return its <transloadit.assembly.AssemblyFuture>.
+
+        :Args:
+            - item (str|file): The path or the stream of the file to process. A file opened
+                from a path is closed once the assembly is done.
+            - template_id (Optional[str]): The id of the template to process the input with.
+            - fields (Optional[dict]): The 'fields' of the assembly.
+            - params (Optional[dict]): Other params of the assembly, such as 'steps'.
+            - submit_options: Options passed to <transloadit.assembly.Assembly.submit>.
+        """
+        options = copy.deepcopy(params) if params else {}
+        if template_id is not None:
+            options["template_id"] = template_id
+        if fields is not None:
+            options["fields"] = fields
+        new_assembly = self.new_assembly(options)
+
+        file_stream = item
+        if isinstance(item, (str, os.PathLike)):
+            file_stream = open(item, "rb")
+        new_assembly.add_file(file_stream)
+        try:
+            future = new_assembly.submit(**submit_options)
+        except BaseException:
+            if file_stream is not item:
+                file_stream.close()
+            raise
+        if file_stream is not item:
+            future.add_done_callback(lambda future: file_stream.close())
+        return future
+
+    def get_assembly(
+        self,
+        assembly_id: str = None,
+        assembly_url: str = None,
+        timeout: Optional[float] = None,
+    ):
         """
         Get the assembly specified by the 'assembly_id' or the 'assembly_url'
         Either the assembly_id or the assembly_url must be specified
@@ -65,6 +286,8 @@ class Transloadit:
         :Args:
             - assembly_id (Optional[str])
             - assembly_url (Optional[str])
+            - timeout (Optional[float]): Seconds the request may take, retries included.
+                Defaults to no limit beyond the timeout of each attempt.
 
         Return an instance of <transloadit.response.Response>
         """
@@ -72,9 +295,50 @@ class Transloadit:
             raise ValueError("Either 'assembly_id' or 'assembly_url' cannot be None.")
 
         url = assembly_url if assembly_url else f"/assemblies/{assembly_id}"
-        return self.request.get(url)
+        return self.request.get(url, deadline=deadline.from_timeout(timeout))
+
+    def iter_results(self, assembly_url: str, poll_interval: float = 1):
+        """
+        Yield each step result of the assembly at 'assembly_url' as soon as it appears, as a
+        (step name, result) tuple, until the assembly has finished.
+
+        :Args:
+            - assembly_url (str)
+            - poll_interval (Optional[float]): Seconds to wait between status requests.
+                Defaults to 1.
+        """
+        return assembly.iter_results(self, assembly_url, poll_interval=poll_interval)
 
-    def list_assemblies(self, params: dict = None):
+    def download_results(
+        self,
+        response,
+        dest_dir: str,
+        steps: Optional[List[str]] = None,
+        max_workers: int = 4,
+        verify: bool = True,
+    ) -> dict:
+        """
+        Download the results of a finished assembly to 'dest_dir', over the pooled
+        connections of the client, and return a dict of the name of each step and the paths
+        of its results. Partially downloaded files are resumed with HTTP Range requests. See
+        <transloadit.download.download_results>.
+
+        :Args:
+            - response (<transloadit.response.Response>): The final status of the assembly.
+            - dest_dir (str): The directory to download results to. Results are saved as
+                '<dest_dir>/<step name>/<result name>'.
+            - steps (Optional[list]): The names of the steps whose results to download.
+                Defaults to all steps.
+            - max_workers (Optional[int]): How many files may be downloaded at the same time.
+                Defaults to 4.
+            - verify (Optional[bool]): Whether to check the size and MD5 checksum of each
+                file against the metadata of its result. Defaults to True.
+        """
+        return download.download_results(
+            self, response, dest_dir, steps=steps, max_workers=max_workers, verify=verify
+        )
+
+    def list_assemblies(self, params: dict = None, timeout: Optional[float] = None):
         """
         Get the list of assemblies.
 
@@ -82,12 +346,21 @@ class Transloadit:
             - options (Optional[dict]):
                 params to send along with the request. Please see
                 https://transloadit.com/docs/api-docs/#25-retrieve-assembly-list for available options.
+            - timeout (Optional[float]): Seconds the request may take, retries included.
+                Defaults to no limit beyond the timeout of each attempt.
 
         Return an instance of <transloadit.response.Response>
         """
-        return self.request.get("/assemblies", params=params)
+        return self.request.get(
+            "/assemblies", params=params, deadline=deadline.from_timeout(timeout)
+        )
 
-    def cancel_assembly(self, assembly_id: str = None, assembly_url: str = None):
+    def cancel_assembly(
+        self,
+        assembly_id: str = None,
+        assembly_url: str = None,
+        timeout: Optional[float] = None,
+    ):
         """
         Cancel the assembly specified by the 'assembly_id' or the 'assembly_url'
         Either the assembly_id or the assembly_url must be specified
@@ -95,6 +368,8 @@ class Transloadit:
         :Args:
             - assembly_id (Optional[str])
             - assembly_url (Optional[str])
+            - timeout (Optional[float]): Seconds the request may take, retries included.
+                Defaults to no limit beyond the timeout of each attempt.
 
         Return an instance of <transloadit.response.Response>
         """
@@ -102,20 +377,24 @@ class Transloadit:
             raise ValueError("Either 'assembly_id' or 'assembly_url' cannot be None.")
 
         url = assembly_url if assembly_url else f"/assemblies/{assembly_id}"
-        return self.request.delete(url)
+        return self.request.delete(url, deadline=deadline.from_timeout(timeout))
 
-    def get_template(self, template_id: str):
+    def get_template(self, template_id: str, timeout: Optional[float] = None):
         """
         Get the template specified by the 'template_id'.
 
         :Args:
             - template_id (str)
+            - timeout (Optional[float]): Seconds the request may take, retries included.
+                Defaults to no limit beyond the timeout of each attempt.
 
         Return an instance of <transloadit.response.Response>
         """
-        return self.request.get(f"/templates/{template_id}")
+        return self.request.get(
+            f"/templates/{template_id}", deadline=deadline.from_timeout(timeout)
+        )
 
-    def list_templates(self, params: Optional[dict] = None):
+    def list_templates(self, params: Optional[dict] = None, timeout: Optional[float] = None):
         """
         Get the list of templates.
 
@@ -123,10 +402,14 @@ class Transloadit:
             - options (Optional[dict]):
                 params to send along with the request. Please see
                 https://transloadit.com/docs/api-docs/#45-retrieve-template-list for available options.
+            - timeout (Optional[float]): Seconds the request may take, retries included.
+                Defaults to no limit beyond the timeout of each attempt.
 
         Return an instance of <transloadit.response.Response>
         """
-        return self.request.get("/templates", params=params)
+        return self.request.get(
+            "/templates", params=params, deadline=deadline.from_timeout(timeout)
+        )
 
     def new_template(self, name: str, params: Optional[dict] = None) -> template.Template:
         """
@@ -138,40 +421,54 @@ class Transloadit:
         """
         return template.Template(self, name, options=params)
 
-    def update_template(self, template_id: str, data: dict):
+    def update_template(
+        self, template_id: str, data: dict, timeout: Optional[float] = None
+    ):
         """
         Update the template specified by the 'template_id'.
 
         :Args:
             - template_id (str)
             - data (dict): key, value pair of fields and their new values.
+            - timeout (Optional[float]): Seconds the request may take, retries included.
+                Defaults to no limit beyond the timeout of each attempt.
 
         Return an instance of <transloadit.response.Response>
         """
-        return self.request.put(f"/templates/{template_id}", data=data)
+        return self.request.put(
+            f"/templates/{template_id}", data=data, deadline=deadline.from_timeout(timeout)
+        )
 
-    def delete_template(self, template_id: str):
+    def delete_template(self, template_id: str, timeout: Optional[float] = None):
         """
         Delete the template specified by the 'template_id'.
 
         :Args:
             - template_id (str)
+            - timeout (Optional[float]): Seconds the request may take, retries included.
+                Defaults to no limit beyond the timeout of each attempt.
 
         Return an instance of <transloadit.response.Response>
         """
-        return self.request.delete(f"/templates/{template_id}")
+        return self.request.delete(
+            f"/templates/{template_id}", deadline=deadline.from_timeout(timeout)
+        )
 
-    def get_bill(self, month: int, year: int):
+    def get_bill(self, month: int, year: int, timeout: Optional[float] = None):
         """
         Get the bill for the specified month and year.
 
         :Args:
             - month (int): e.g 1 for January
             - year (int)
+            - timeout (Optional[float]): Seconds the request may take, retries included.
+                Defaults to no limit beyond the timeout of each attempt.
 
         Return an instance of <transloadit.response.Response>
         """
-        return self.request.get(f"/bill/{year}-{month:02d}")
+        return self.request.get(
+            f"/bill/{year}-{month:02d}", deadline=deadline.from_timeout(timeout)
+        )
 
     def get_signed_smart_cdn_url(
         self,
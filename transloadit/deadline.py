@@ -0,0 +1,87 @@
+from time import monotonic
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when an operation runs out of the time it was given.
+
+    :Attributes:
+        - response (<transloadit.response.Response>): The last response of the operation,
+            e.g. the status of the assembly it created, if any.
+    """
+
+    def __init__(self, message="The deadline of the operation is exceeded.", response=None):
+        super().__init__(message)
+        self.response = response
+
+
+class Deadline:
+    """
+    Time budget of an operation made of several requests, such as creating an assembly,
+    uploading its files and waiting for it to finish. Each request gets what is left of the
+    budget as its timeout, and the operation stops once nothing is left.
+
+    :Attributes:
+        - expires (float): <time.monotonic> time at which the budget runs out.
+
+    :Constructor Args:
+        - timeout (float): The budget in seconds, starting now.
+    """
+
+    def __init__(self, timeout):
+        self.expires = monotonic() + timeout
+
+    def remaining(self):
+        """
+        Return how many seconds are left, 0 once the deadline is over.
+        """
+        return max(self.expires - monotonic(), 0)
+
+    def expired(self):
+        """
+        Return whether the deadline is over.
+        """
+        return self.remaining() <= 0
+
+    def check(self, wait=0):
+        """
+        Raise <transloadit.deadline.DeadlineExceeded> if the deadline is over, or will be
+        after waiting 'wait' more seconds.
+        """
+        if self.remaining() <= wait:
+            raise DeadlineExceeded()
+
+    def timeout(self, connect, read=None):
+        """
+        Return the (connect, read) timeout of the next request, bounded by the remaining
+        budget. Raise <transloadit.deadline.DeadlineExceeded> if nothing is left.
+
+        :Args:
+            - connect (float): Seconds to wait for the connection to be established.
+            - read (Optional[float]): Seconds to wait for the server to send the next bytes.
+                Defaults to the remaining budget.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded()
+        return min(connect, remaining), min(read or remaining, remaining)
+
+
+def from_timeout(timeout):
+    """
+    Return a <transloadit.deadline.Deadline> of 'timeout' seconds, or None if 'timeout' is
+    None. A deadline is returned as it is, so one budget can be shared by several calls.
+    """
+    if timeout is None or isinstance(timeout, Deadline):
+        return timeout
+    return Deadline(timeout)
+
+
+def request_timeout(deadline, connect, read):
+    """
+    Return the (connect, read) timeout of a request made within 'deadline', which may be
+    None.
+    """
+    if deadline is None:
+        return connect, read
+    return deadline.timeout(connect, read)
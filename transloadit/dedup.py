@@ -0,0 +1,202 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from . import sources
+from .response import BufferedResponse, Response
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def content_hash(file_stream):
+    """
+    Return the SHA-256 hex digest of the whole content of a seekable file stream, or None
+    for a <transloadit.sources.StreamSource>, which can only be hashed while it is uploaded.
+    Text file streams are hashed through their binary buffer, so a file opened with
+    'open(path)' has the same hash as when opened with 'open(path, "rb")'. The position of
+    the stream is left unchanged.
+
+    :Args:
+        - file_stream (file|<transloadit.sources.FileSource>): The file to hash.
+    """
+    if isinstance(file_stream, sources.StreamSource):
+        return None
+    stream = sources.unwrap(file_stream)
+    position = stream.tell()
+    digest = hashlib.sha256()
+    try:
+        data = sources.binary(stream)
+        data.seek(0)
+        while True:
+            block = data.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(sources.to_bytes(block))
+    finally:
+        # seeking a text stream also drops what it had decoded ahead from its buffer.
+        stream.seek(position)
+    return digest.hexdigest()
+
+
+def cache_key(options, hashes):
+    """
+    Return the key the results of an assembly are cached under: a digest of its 'steps',
+    'template_id' and 'fields' options and of the content hash of each of its files.
+
+    :Args:
+        - options (dict): The options of the assembly.
+        - hashes (dict): Key, value pair of the field name of each file and its content hash.
+    """
+    payload = json.dumps(
+        {
+            "steps": options.get("steps"),
+            "template_id": options.get("template_id"),
+            "fields": options.get("fields"),
+            "files": hashes,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return "dedup " + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached_response(data):
+    """
+    Return a <transloadit.response.Response> holding the cached assembly status 'data'.
+    """
+    return Response(BufferedResponse(200, {}, json.dumps(data).encode("utf-8")))
+
+
+class DedupCache:
+    """
+    Cache of the final status of completed assemblies, keyed on the content of their files
+    and on their steps, template and fields, so byte-identical submissions can be answered
+    without uploading or processing the files again.
+
+    Entries expire 'ttl' seconds after they are stored, and the least recently used entries
+    are evicted once there are more than 'max_entries'. Subclasses implement the methods
+    below. They may be called from several threads at once.
+
+    :Constructor Args:
+        - max_entries (Optional[int]): How many entries are kept at most. Defaults to no limit.
+        - ttl (Optional[float]): Seconds an entry is valid for. Defaults to no expiry.
+    """
+
+    def __init__(self, max_entries=None, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    def get(self, key):
+        """
+        Return the assembly status cached under 'key', or None if there is none or it expired.
+        """
+        raise NotImplementedError
+
+    def set(self, key, data):
+        """
+        Cache the assembly status 'data' under 'key', evicting old entries if needed.
+        """
+        raise NotImplementedError
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.time() - stored_at >= self.ttl
+
+
+class MemoryDedupCache(DedupCache):
+    """
+    In-memory, least recently used <transloadit.dedup.DedupCache>.
+
+    :Constructor Args:
+        - max_entries (Optional[int]): How many entries are kept at most. Defaults to 1024.
+        - ttl (Optional[float]): Seconds an entry is valid for. Defaults to no expiry.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None):
+        super().__init__(max_entries, ttl)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry[0]):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, data):
+        with self._lock:
+            self._entries[key] = (time.time(), data)
+            self._entries.move_to_end(key)
+            while self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteDedupCache(DedupCache):
+    """
+    <transloadit.dedup.DedupCache> backed by an SQLite database file, which may be shared by
+    several processes and outlives them.
+
+    :Constructor Args:
+        - path (str): Path of the database file. It is created if it does not exist.
+        - max_entries (Optional[int]): How many entries are kept at most. Defaults to no limit.
+        - ttl (Optional[float]): Seconds an entry is valid for. Defaults to no expiry.
+        - timeout (Optional[float]): Seconds to wait for another process to release a lock
+            on the database. Defaults to 30.
+    """
+
+    def __init__(self, path, max_entries=None, ttl=None, timeout=30.0):
+        super().__init__(max_entries, ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS dedup_cache (key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+
+    def _execute(self, statement, parameters=()):
+        with self._lock:
+            return self._connection.execute(statement, parameters).fetchall()
+
+    def get(self, key):
+        rows = self._execute("SELECT value, stored_at FROM dedup_cache WHERE key = ?", (key,))
+        if not rows:
+            return None
+        value, stored_at = rows[0]
+        if self._expired(stored_at):
+            self._execute("DELETE FROM dedup_cache WHERE key = ?", (key,))
+            return None
+        self._execute("UPDATE dedup_cache SET used_at = ? WHERE key = ?", (time.time(), key))
+        return json.loads(value)
+
+    def set(self, key, data):
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO dedup_cache (key, value, stored_at, used_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, json.dumps(data), now, now),
+        )
+        if self.ttl is not None:
+            self._execute("DELETE FROM dedup_cache WHERE stored_at <= ?", (now - self.ttl,))
+        if self.max_entries is not None:
+            self._execute(
+                "DELETE FROM dedup_cache WHERE key NOT IN "
+                "(SELECT key FROM dedup_cache ORDER BY used_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def close(self):
+        """
+        Close the connection to the database.
+        """
+        with self._lock:
+            self._connection.close()
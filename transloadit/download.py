@@ -0,0 +1,254 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+import requests
+
+from .request import TIMEOUT
+
+# size of the blocks results are streamed to disk in.
+BLOCK_SIZE = 1024 * 1024
+
+# suffix of files still being downloaded.
+PARTIAL_SUFFIX = ".part"
+
+# file names that do not name a file of their own.
+_NO_NAMES = frozenset(["", ".", ".."])
+
+_RETRIED_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class DownloadCancelled(Exception):
+    """
+    Raised from a download that was cancelled before it completed.
+    """
+
+
+class VerificationError(Exception):
+    """
+    Raised when the size or the checksum of a downloaded file does not match the metadata
+    of its result.
+    """
+
+
+class DownloadError(Exception):
+    """
+    Raised when one or more results of an assembly fail to download.
+
+    :Attributes:
+        - errors (dict):
+            Key, value pair of the destination path of each failed result and the exception
+            that caused it to fail.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(
+            "Failed to download: "
+            + ", ".join(f"{path} ({error!r})" for path, error in errors.items())
+        )
+
+
+def result_paths(results, dest_dir, steps=None):
+    """
+    Yield a (step name, result, path) tuple for each result, where 'path' is the file the
+    result is downloaded to: '<dest_dir>/<step name>/<result name>'. Results of a step with
+    the same name are told apart by prefixing their id.
+
+    Path separators in step names and ids are replaced, and only the last component of
+    result names is kept. A ValueError is raised for a result whose path would still end
+    up outside of 'dest_dir', e.g. through a step named '..'.
+
+    :Args:
+        - results (dict): The 'results' of an assembly status.
+        - dest_dir (str): The directory to download results to.
+        - steps (Optional[list]): The names of the steps whose results to download.
+            Defaults to all steps.
+    """
+    root = os.path.realpath(dest_dir)
+    for step, step_results in results.items():
+        if steps is not None and step not in steps:
+            continue
+        names = set()
+        for index, result in enumerate(step_results):
+            result_id = _path_component(result.get("id", index))
+            if result_id in _NO_NAMES:
+                result_id = str(index)
+            name = _path_component(result.get("name") or "", last=True)
+            if name in _NO_NAMES:
+                name = result_id
+            if name in names:
+                name = f"{result_id}_{name}"
+            names.add(name)
+            path = os.path.join(dest_dir, _path_component(step), name)
+            if os.path.commonpath([root, os.path.realpath(path)]) != root:
+                raise ValueError(
+                    f"Result {name!r} of step {step!r} would be saved outside of {dest_dir!r}."
+                )
+            yield step, result, path
+
+
+def _path_component(value, last=False):
+    # a name that does not reach into other directories: 'a_b' for 'a/b', or 'b' if 'last'.
+    value = str(value).replace("\\", "/")
+    if last:
+        return value.rsplit("/", 1)[-1]
+    return value.replace("/", "_")
+
+
+def download_file(
+    session,
+    url,
+    path,
+    size=None,
+    md5=None,
+    block_size=BLOCK_SIZE,
+    retries=3,
+    cancelled=None,
+):
+    """
+    Download the file at 'url' to 'path' and return 'path'.
+
+    The file is streamed to '<path>.part' in blocks of 'block_size' bytes and only moved to
+    'path' once complete, so it never holds partial content. If the '.part' file of an
+    earlier attempt exists, the download resumes from its end with an HTTP Range request.
+    Dropped connections are resumed the same way, up to 'retries' times. If 'path' already
+    exists, with the expected size if it is known, it is not downloaded again.
+
+    :Args:
+        - session (<requests.Session>): The session to download with.
+        - url (str): The URL of the file.
+        - path (str): Where to save the file.
+        - size (Optional[int]): The expected size of the file in bytes.
+        - md5 (Optional[str]): The expected MD5 hex digest of the file.
+        - block_size (Optional[int]): Size of the blocks written to disk in bytes.
+        - retries (Optional[int]): How many times to resume after a connection error.
+        - cancelled (Optional[<threading.Event>]): Once set, the download stops with
+            <transloadit.download.DownloadCancelled>.
+    """
+    if os.path.isfile(path) and (size is None or os.path.getsize(path) == size):
+        return path
+
+    partial = path + PARTIAL_SUFFIX
+    for attempt in range(retries + 1):
+        try:
+            _download_part(session, url, partial, size, block_size, cancelled)
+            break
+        except _RETRIED_ERRORS:
+            if attempt == retries:
+                raise
+
+    if size is not None and os.path.getsize(partial) != size:
+        os.remove(partial)
+        raise VerificationError(f"Expected {size} bytes from {url}.")
+    if md5 is not None and _md5(partial, block_size) != md5.lower():
+        os.remove(partial)
+        raise VerificationError(f"MD5 checksum mismatch for {url}.")
+    os.replace(partial, path)
+    return path
+
+
+def _download_part(session, url, partial, size, block_size, cancelled):
+    offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+    if offset and offset == size:
+        return
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+        if response.status_code == 416 and offset:
+            # the partial file is at least as large as the file, start over.
+            os.remove(partial)
+            return _download_part(session, url, partial, size, block_size, cancelled)
+        response.raise_for_status()
+        content_range = response.headers.get("Content-Range", "")
+        resumed = response.status_code == 206 and content_range.startswith(f"bytes {offset}-")
+        with open(partial, "ab" if resumed else "wb") as fs:
+            for block in response.iter_content(block_size):
+                if cancelled is not None and cancelled.is_set():
+                    raise DownloadCancelled()
+                fs.write(block)
+
+
+def _md5(path, block_size):
+    digest = hashlib.md5()
+    with open(path, "rb") as fs:
+        for block in iter(lambda: fs.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def download_results(
+    transloadit,
+    response,
+    dest_dir,
+    steps=None,
+    max_workers=4,
+    verify=True,
+    block_size=BLOCK_SIZE,
+    retries=3,
+):
+    """
+    Download the results of a finished assembly to 'dest_dir', 'max_workers' files at a
+    time over the pooled connections of the client, and return a dict of the name of each
+    step and the paths of its results. See <transloadit.download.download_file> and
+    <transloadit.download.result_paths>.
+
+    If a download fails, the others are stopped and a <transloadit.download.DownloadError>
+    is raised. Calling it again resumes from the files already downloaded.
+
+    :Args:
+        - transloadit (<transloadit.client.Transloadit>)
+        - response (<transloadit.response.Response>): The final status of the assembly.
+        - dest_dir (str): The directory to download results to.
+        - steps (Optional[list]): The names of the steps whose results to download.
+            Defaults to all steps.
+        - max_workers (Optional[int]): How many files may be downloaded at the same time.
+            Defaults to 4.
+        - verify (Optional[bool]): Whether to check the size and MD5 checksum of each file
+            against the metadata of its result. Defaults to True.
+        - block_size (Optional[int]): Size of the blocks written to disk in bytes.
+        - retries (Optional[int]): How many times to resume each file after a connection
+            error. Defaults to 3.
+    """
+    session = transloadit.request.session
+    cancelled = threading.Event()
+    paths = {}
+    # every path is checked before anything is downloaded.
+    planned = list(result_paths(response.data.get("results", {}), dest_dir, steps))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for step, result, path in planned:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            paths.setdefault(step, []).append(path)
+            future = executor.submit(
+                download_file,
+                session,
+                result.get("ssl_url") or result["url"],
+                path,
+                size=result.get("size") if verify else None,
+                md5=result.get("md5hash") if verify else None,
+                block_size=block_size,
+                retries=retries,
+                cancelled=cancelled,
+            )
+            futures[future] = path
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        if pending:
+            cancelled.set()
+            for future in pending:
+                future.cancel()
+
+    errors = {}
+    for future, path in futures.items():
+        if future.cancelled():
+            continue
+        error = future.exception()
+        if error is not None and not isinstance(error, DownloadCancelled):
+            errors[path] = error
+    if errors:
+        raise DownloadError(errors)
+    return paths
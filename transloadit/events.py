@@ -0,0 +1,155 @@
+import json
+
+import requests
+
+from .deadline import DeadlineExceeded
+from .request import CONNECT_TIMEOUT, TIMEOUT
+
+# events after which the status of an assembly does not change anymore.
+FINAL_EVENTS = frozenset(["assembly_finished", "assembly_error", "assembly_canceled"])
+
+# events after which the assembly is known to be processing its files.
+_EXECUTING_EVENTS = frozenset(["assembly_uploading_finished", "assembly_execution_progress"])
+
+
+class Event:
+    """
+    Server-sent event.
+
+    :Attributes:
+        - name (str): The type of the event, "message" if the server did not name it.
+        - data (str): The data of the event.
+        - id (str): The id of the event, if any.
+    """
+
+    def __init__(self, name, data, id=None):
+        self.name = name
+        self.data = data
+        self.id = id
+
+    def __repr__(self):
+        return f"Event({self.name!r}, {self.data!r}, {self.id!r})"
+
+    def json(self):
+        """
+        Return the data of the event decoded from JSON.
+        """
+        return json.loads(self.data)
+
+
+def parse_events(lines):
+    """
+    Parse a text/event-stream incrementally and yield each
+    <transloadit.events.Event> as soon as the blank line ending it is received.
+
+    :Args:
+        - lines (iterable): The lines of the stream, as str or bytes, with or without
+            their line endings.
+    """
+    name, data, event_id = "", [], None
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.rstrip("\r\n")
+        if not line:
+            if name or data:
+                yield Event(name or "message", "\n".join(data), event_id)
+            name, data = "", []
+            continue
+        if line.startswith(":"):
+            # comment, e.g. a heartbeat keeping the connection open.
+            continue
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            name = value
+        elif field == "data":
+            data.append(value)
+        elif field == "id":
+            event_id = value
+
+
+def stream_events(session, url, timeout=TIMEOUT, deadline=None, stopped=None):
+    """
+    Subscribe to the server-sent events at 'url' and yield each
+    <transloadit.events.Event> as it arrives. The generator ends when the server closes the
+    stream; connection errors and read timeouts are raised as
+    <requests.exceptions.RequestException>.
+
+    :Args:
+        - session (<requests.Session>): The session to open the stream with.
+        - url (str): The URL of the event stream.
+        - timeout (Optional[float]): Seconds to wait for the next bytes of the stream.
+        - deadline (Optional[<transloadit.deadline.Deadline>]): Time budget of the stream.
+            It is checked on every line received, heartbeats included, and
+            <transloadit.deadline.DeadlineExceeded> is raised once it is over.
+        - stopped (Optional[callable]): Called on every line received, heartbeats included.
+            The stream is closed and the generator ends once it returns True.
+    """
+    if deadline is not None:
+        timeout = deadline.timeout(CONNECT_TIMEOUT, timeout)
+    response = session.get(
+        url, headers={"Accept": "text/event-stream"}, stream=True, timeout=timeout
+    )
+    try:
+        response.raise_for_status()
+        lines = response.iter_lines()
+        if deadline is not None or stopped is not None:
+            lines = _within(lines, deadline, stopped)
+        yield from parse_events(lines)
+    finally:
+        response.close()
+
+
+def _within(lines, deadline, stopped):
+    for line in lines:
+        if deadline is not None:
+            deadline.check()
+        if stopped is not None and stopped():
+            return
+        yield line
+
+
+def apply_event(status, event):
+    """
+    Return a copy of the assembly status 'status' updated with what 'event' tells about it:
+    the assembly is executing once its files are uploaded, and each finished result is
+    added to its 'results'. Other events leave the status as it is.
+
+    :Args:
+        - status (dict): The data of the latest status response of the assembly.
+        - event (<transloadit.events.Event>): An event of the update stream of the assembly.
+    """
+    status = dict(status)
+    if event.name in _EXECUTING_EVENTS:
+        status["ok"] = "ASSEMBLY_EXECUTING"
+    elif event.name == "assembly_result_finished":
+        try:
+            data = event.json()
+        except ValueError:
+            return status
+        if not (isinstance(data, list) and len(data) == 2):
+            # not a [step name, result] pair.
+            return status
+        step, result = data
+        results = dict(status.get("results") or {})
+        results[step] = [*results.get(step, []), result]
+        status["results"] = results
+    return status
+
+
+def wait_for_final_event(session, url, timeout=TIMEOUT, deadline=None):
+    """
+    Return the first event of the stream after which the assembly is finished, or None
+    if the stream ends or fails before that. With a 'deadline', raise
+    <transloadit.deadline.DeadlineExceeded> once it is over.
+    """
+    try:
+        for event in stream_events(session, url, timeout, deadline):
+            if event.name in FINAL_EVENTS:
+                return event
+    except requests.exceptions.RequestException as error:
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded() from error
+    return None
@@ -0,0 +1,85 @@
+import math
+import threading
+from collections import Counter, deque
+
+
+class HedgePolicy:
+    """
+    Decides when a GET request that has not been answered yet is sent a second time.
+
+    A slow response is often caused by one overloaded server or connection rather than by
+    the request itself. If no response arrives within 'delay' seconds, or within the
+    observed 'percentile' of recent response times, a duplicate request (a "hedge") is sent
+    and whichever answers first is used. The other one is cancelled, or, if it is already
+    being sent, its response is discarded.
+
+    Hedges are capped by 'budget', the fraction of extra requests they may add: with the
+    default of 0.05, at most one request in twenty is hedged. Only GET requests are
+    hedged, since sending them twice has no side effects.
+
+    The policy may be shared by clients and threads. It counts what it does in 'counters'.
+
+    :Attributes:
+        - counters (<collections.Counter>): How many requests were sent ('requests'), how
+            many of them were hedged ('hedges'), and how many were answered by the hedge
+            first ('hedge_wins').
+
+    :Constructor Args:
+        - delay (Optional[float]): Seconds to wait for a response before hedging. Defaults
+            to the observed 'percentile' of response times.
+        - percentile (Optional[float]): Percentile of recent response times after which a
+            request is hedged, if 'delay' is not set. Defaults to 95.
+        - budget (Optional[float]): Fraction of requests that may be hedged. Defaults to
+            0.05.
+        - min_samples (Optional[int]): How many response times are needed before the
+            percentile is trusted. Requests are not hedged until then. Defaults to 20.
+        - window (Optional[int]): How many recent response times the percentile is computed
+            over. Defaults to 1000.
+    """
+
+    def __init__(self, delay=None, percentile=95, budget=0.05, min_samples=20, window=1000):
+        self.delay = delay
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.counters = Counter()
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Count a new request and return how many seconds to wait for its response before
+        hedging it, or None if it should not be hedged.
+        """
+        with self._lock:
+            self.counters["requests"] += 1
+            if self.delay is not None:
+                return self.delay
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = math.ceil(self.percentile / 100 * len(latencies)) - 1
+        return latencies[min(max(index, 0), len(latencies) - 1)]
+
+    def try_hedge(self):
+        """
+        Return whether the budget allows one more hedge, and count it if it does.
+        """
+        with self._lock:
+            if self.counters["hedges"] + 1 > self.budget * self.counters["requests"]:
+                return False
+            self.counters["hedges"] += 1
+            return True
+
+    def record(self, latency, hedge=False):
+        """
+        Record the response time of a request.
+
+        :Args:
+            - latency (float): Seconds between sending the request and its response.
+            - hedge (Optional[bool]): Whether the response answered the hedge.
+        """
+        with self._lock:
+            self._latencies.append(latency)
+            if hedge:
+                self.counters["hedge_wins"] += 1
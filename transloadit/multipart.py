@@ -0,0 +1,143 @@
+import io
+import os
+import uuid
+
+from . import sources
+
+BLOCK_SIZE = 64 * 1024
+
+
+def _quote(value):
+    return value.replace("\\", "\\\\").replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+def _get_size(file_stream):
+    """
+    Return how many bytes are left to read from the file stream, or None if that cannot
+    be known without reading it.
+    """
+    if isinstance(file_stream, io.TextIOBase):
+        return None
+    try:
+        return os.fstat(file_stream.fileno()).st_size - file_stream.tell()
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        pass
+    try:
+        position = file_stream.tell()
+        size = file_stream.seek(0, os.SEEK_END) - position
+        file_stream.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None
+
+
+class MultipartEncoder:
+    """
+    Generates a multipart/form-data request body on the fly, reading each file in
+    fixed-size blocks, so memory use does not depend on the size of the files.
+
+    :Attributes:
+        - content_type (str): The value of the request's Content-Type header.
+        - length (int): The size of the body in bytes, or None if the size of some file is
+            not known up front.
+
+    :Constructor Args:
+        - fields (dict): Key, value pair of form field names and their string values.
+        - files (dict): Key, value pair of form field names and file streams.
+        - block_size (Optional[int]): Size in bytes of the blocks files are read in.
+            Defaults to 64 KiB.
+    """
+
+    def __init__(self, fields, files, block_size=BLOCK_SIZE):
+        self.boundary = uuid.uuid4().hex
+        self.block_size = block_size
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._fields = [
+            (self._header(name), str(value).encode("utf-8")) for name, value in fields.items()
+        ]
+        self._files = []
+        for name, file_stream in files.items():
+            filename = os.path.basename(getattr(file_stream, "name", None) or name)
+            self._files.append((self._header(name, filename), sources.unwrap(file_stream)))
+        self._closing = f"--{self.boundary}--\r\n".encode("ascii")
+        self.length = self._get_length()
+
+    def _header(self, name, filename=None):
+        disposition = f'form-data; name="{_quote(name)}"'
+        if filename is not None:
+            disposition += f'; filename="{_quote(filename)}"'
+        return (
+            f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n\r\n".encode("utf-8")
+        )
+
+    def _get_length(self):
+        length = len(self._closing)
+        for header, value in self._fields:
+            length += len(header) + len(value) + 2
+        for header, file_stream in self._files:
+            size = _get_size(file_stream)
+            if size is None:
+                return None
+            length += len(header) + size + 2
+        return length
+
+    def __iter__(self):
+        for header, value in self._fields:
+            yield header + value + b"\r\n"
+        for header, file_stream in self._files:
+            yield header
+            while True:
+                block = file_stream.read(self.block_size)
+                if not block:
+                    break
+                if isinstance(block, str):
+                    block = block.encode("utf-8")
+                yield block
+            yield b"\r\n"
+        yield self._closing
+
+    def body(self):
+        """
+        Return the request body: a sized file-like object if the length of the body is known,
+        so it is sent with a Content-Length header, otherwise a generator, which is sent
+        with chunked transfer encoding.
+        """
+        if self.length is None:
+            return iter(self)
+        return MultipartReader(self)
+
+
+class MultipartReader:
+    """
+    Sized, file-like view over a <transloadit.multipart.MultipartEncoder>.
+
+    :Constructor Args:
+        - encoder (<transloadit.multipart.MultipartEncoder>)
+    """
+
+    def __init__(self, encoder):
+        self._length = encoder.length
+        self._blocks = iter(encoder)
+        self._block = b""
+        self._offset = 0
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = self._block[self._offset:] + b"".join(self._blocks)
+            self._block, self._offset = b"", 0
+            return data
+
+        pieces = []
+        while size > 0:
+            if self._offset >= len(self._block):
+                self._block, self._offset = next(self._blocks, b""), 0
+                if not self._block:
+                    break
+            piece = self._block[self._offset:self._offset + size]
+            self._offset += len(piece)
+            size -= len(piece)
+            pieces.append(piece)
+        return b"".join(pieces)
@@ -0,0 +1,314 @@
+import hashlib
+import hmac
+import json
+import logging
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+# digest of the signatures of notifications, prefixed to them as in "sha384:<hex digest>".
+ALGORITHM = "sha384"
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+class InvalidNotification(Exception):
+    """
+    Raised when a notification cannot be parsed or its signature does not match.
+
+    :Attributes:
+        - status (int): The HTTP status code to respond with.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Notification:
+    """
+    Assembly status sent by Transloadit to the 'notify_url' of an assembly.
+
+    :Attributes:
+        - data (dict): Dictionary representation of the assembly status.
+        - assembly_id (str): The id of the assembly.
+        - ok (str): The status of the assembly, e.g. "ASSEMBLY_COMPLETED".
+        - error (str): The error of the assembly, if it failed.
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def assembly_id(self):
+        return self.data.get("assembly_id")
+
+    @property
+    def ok(self):
+        return self.data.get("ok")
+
+    @property
+    def error(self):
+        return self.data.get("error")
+
+
+class NotificationHandler:
+    """
+    Receiver of the notifications Transloadit sends to the 'notify_url' of assemblies.
+
+    Each notification is a POST request with a 'transloadit' field holding the assembly
+    status as JSON and a 'signature' field holding its HMAC, made with the auth secret like
+    the signature of API requests. Only SHA-384 signatures are accepted unless 'legacy_sha1'
+    is set. The signature is checked in constant time before anything else is done with the
+    payload. Valid notifications are then passed to every
+    registered callback and put on the queue, if any.
+
+    The handler can be mounted as a WSGI app ('handler.wsgi') or an ASGI app
+    ('handler.asgi'), or served by a <transloadit.notifications.NotificationServer>.
+
+    :Constructor Args:
+        - auth_secret (str): Transloadit auth secret.
+        - callback (Optional[callable]): Called with each
+            <transloadit.notifications.Notification>.
+        - queue (Optional[<queue.Queue>]): Queue each
+            <transloadit.notifications.Notification> is put on.
+        - legacy_sha1 (Optional[bool]): Whether to also accept SHA-1 signatures, with a
+            "sha1:" prefix or without any, as sent by older accounts. Defaults to False.
+    """
+
+    def __init__(self, auth_secret, callback=None, queue=None, legacy_sha1=False):
+        key = auth_secret.encode("utf-8")
+        # keyed HMACs are copied for each notification, so the key is only hashed once.
+        self._hmacs = {ALGORITHM: hmac.new(key, digestmod=hashlib.sha384)}
+        if legacy_sha1:
+            self._hmacs["sha1"] = self._hmacs[""] = hmac.new(key, digestmod=hashlib.sha1)
+        self.callbacks = [callback] if callback is not None else []
+        self.queue = queue
+
+    def add_callback(self, callback):
+        """
+        Register a callable to be called with each valid
+        <transloadit.notifications.Notification>.
+        """
+        self.callbacks.append(callback)
+
+    def verify(self, payload, signature):
+        """
+        Return whether 'signature' is a valid signature of 'payload'.
+
+        :Args:
+            - payload (str|bytes): The value of the 'transloadit' field.
+            - signature (str): The value of the 'signature' field, e.g. "sha384:<hex digest>".
+                With 'legacy_sha1', signatures without an algorithm prefix are SHA-1 digests.
+        """
+        algorithm, _, digest = signature.rpartition(":")
+        prototype = self._hmacs.get(algorithm)
+        if prototype is None:
+            return False
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        mac = prototype.copy()
+        mac.update(payload)
+        # bytes, since compare_digest rejects str with non-ASCII characters.
+        return hmac.compare_digest(mac.hexdigest().encode("ascii"), digest.encode("utf-8"))
+
+    def handle(self, body, content_type):
+        """
+        Verify and dispatch a notification, and return it as a
+        <transloadit.notifications.Notification>. Raise
+        <transloadit.notifications.InvalidNotification> if it is malformed or not signed
+        with the auth secret.
+
+        :Args:
+            - body (bytes): The body of the request.
+            - content_type (str): The Content-Type header of the request.
+        """
+        fields = _parse_form(body, content_type or "")
+        payload = fields.get("transloadit")
+        signature = fields.get("signature")
+        if payload is None or signature is None:
+            raise InvalidNotification("Missing 'transloadit' or 'signature' field.")
+        if not self.verify(payload, signature):
+            raise InvalidNotification("Invalid signature.", status=403)
+        try:
+            notification = Notification(json.loads(payload))
+        except ValueError:
+            raise InvalidNotification("The 'transloadit' field is not valid JSON.")
+
+        for callback in self.callbacks:
+            callback(notification)
+        if self.queue is not None:
+            self.queue.put(notification)
+        return notification
+
+    def respond(self, method, body, content_type):
+        """
+        Handle a request and return the status code and body of the response.
+        """
+        if method != "POST":
+            return 405, b""
+        try:
+            self.handle(body, content_type)
+        except InvalidNotification as error:
+            logger.warning("Rejected notification: %s", error)
+            return error.status, str(error).encode("utf-8")
+        except Exception:
+            logger.exception("Failed to handle notification")
+            return 500, b""
+        return 200, b"OK"
+
+    def wsgi(self, environ, start_response):
+        """
+        WSGI application receiving notifications.
+        """
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            length = 0
+        body = environ["wsgi.input"].read(length) if length else b""
+        status, response_body = self.respond(
+            environ.get("REQUEST_METHOD"), body, environ.get("CONTENT_TYPE")
+        )
+        start_response(
+            f"{status} {_REASONS[status]}",
+            [("Content-Type", "text/plain"), ("Content-Length", str(len(response_body)))],
+        )
+        return [response_body]
+
+    async def asgi(self, scope, receive, send):
+        """
+        ASGI application receiving notifications.
+        """
+        if scope["type"] != "http":
+            return
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        headers = dict(scope.get("headers") or [])
+        content_type = headers.get(b"content-type", b"").decode("latin-1")
+        status, response_body = self.respond(scope["method"], b"".join(chunks), content_type)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"text/plain"),
+                    (b"content-length", str(len(response_body)).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": response_body})
+
+
+def _parse_form(body, content_type):
+    """
+    Return the fields of an urlencoded or multipart/form-data body as a dict of strings.
+    """
+    if content_type.startswith("multipart/form-data"):
+        message = BytesParser(policy=HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+        )
+        fields = {}
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if name is not None:
+                fields[name] = part.get_payload(decode=True).decode("utf-8")
+        return fields
+
+    try:
+        query = parse_qs(body.decode("utf-8"), keep_blank_values=True)
+    except UnicodeDecodeError:
+        raise InvalidNotification("The body is not valid UTF-8.")
+    return {name: values[0] for name, values in query.items()}
+
+
+class NotificationServer(ThreadingHTTPServer):
+    """
+    Standalone threaded HTTP server receiving notifications on any path.
+
+    :Attributes:
+        - url (str): The URL of the server.
+
+    :Constructor Args:
+        - handler (<transloadit.notifications.NotificationHandler>)
+        - host (Optional[str]): The address to listen on. Defaults to "127.0.0.1".
+        - port (Optional[int]): The port to listen on. Defaults to 0, which picks a free port.
+
+    Use it as a context manager to serve notifications on a background thread:
+
+        with NotificationServer(NotificationHandler(secret, callback), "0.0.0.0", 8000):
+            ...
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, handler, host="127.0.0.1", port=0):
+        self.handler = handler
+        self._thread = None
+        super().__init__((host, port), _RequestHandler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Start serving notifications on a background thread.
+        """
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="transloadit-notifications", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop serving notifications and close the socket.
+        """
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, response_body = self.server.handler.respond(
+            self.command, body, self.headers.get("Content-Type")
+        )
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(response_body)))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
@@ -0,0 +1,284 @@
+import copy
+import heapq
+import itertools
+import logging
+import threading
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from time import monotonic
+
+import requests
+
+from . import assembly, events
+
+logger = logging.getLogger(__name__)
+
+
+class _Watch:
+    def __init__(self, assembly_url, interval):
+        self.assembly_url = assembly_url
+        self.interval = interval
+        self.errors = 0
+        self.streaming = False
+        self.sequence = None
+        self.response = None
+        self.future = Future()
+
+
+class StatusPoller:
+    """
+    Polls the status of many assemblies from one background scheduler thread, instead of
+    one blocked thread per assembly.
+
+    Each watched assembly is polled on its own schedule: the interval starts at 'interval'
+    and grows by 'backoff' after each poll, up to 'max_interval', so long-running assemblies
+    are polled less often. A 'retryIn' period given by the API, e.g. along with
+    ASSEMBLY_STATUS_FETCHING_RATE_LIMIT_REACHED, takes precedence. Status requests are sent
+    from a small pool of worker threads, so a slow response does not delay other assemblies.
+
+    With 'stream_updates', an assembly whose status has an 'update_stream_url' is followed
+    through its server-sent events instead, by one of up to 'max_streams' stream threads.
+    Its status is updated as events arrive, fetched as soon as the stream says the assembly
+    has finished, and only polled every 'max_interval' seconds in the meantime, as a safety
+    net. Assemblies wait to be streamed with regular polling while all stream threads are
+    busy, and regular polling resumes if their stream drops.
+
+    :Constructor Args:
+        - transloadit (<transloadit.client.Transloadit>)
+        - interval (Optional[float]): Seconds between the first polls of an assembly.
+            Defaults to 1.
+        - max_interval (Optional[float]): Upper bound of the polling interval in seconds.
+            Defaults to 30.
+        - backoff (Optional[float]): Factor the interval grows by after each poll.
+            Defaults to 1.5.
+        - max_workers (Optional[int]): How many status requests may be in flight at the
+            same time. Defaults to 4.
+        - max_errors (Optional[int]): After this many consecutive failed status requests of
+            an assembly, its future fails with the last error. Defaults to 3.
+        - stream_updates (Optional[bool]): Whether to follow the update streams of assemblies.
+            Defaults to False.
+        - max_streams (Optional[int]): How many update streams may be followed at the same
+            time. Defaults to 16.
+    """
+
+    def __init__(
+        self,
+        transloadit,
+        interval=1,
+        max_interval=30,
+        backoff=1.5,
+        max_workers=4,
+        max_errors=3,
+        stream_updates=False,
+        max_streams=16,
+    ):
+        self.transloadit = transloadit
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_workers = max_workers
+        self.max_errors = max_errors
+        self.stream_updates = stream_updates
+        self.max_streams = max_streams
+        self._condition = threading.Condition()
+        self._schedule = []
+        self._counter = itertools.count()
+        self._watches = {}
+        self._thread = None
+        self._executor = None
+        self._stream_executor = None
+        self._closed = False
+
+    def watch(self, assembly_url, response=None, callback=None):
+        """
+        Start polling the status of an assembly and return a <concurrent.futures.Future>
+        resolved with the <transloadit.response.Response> of its final status, or failed
+        with the error that stopped polling. Watching an assembly that is already watched
+        returns the same future.
+
+        :Args:
+            - assembly_url (str): The URL of the assembly.
+            - response (Optional[<transloadit.response.Response>]): The latest known status of
+                the assembly, e.g. the response to its creation. If given, the first poll is
+                scheduled according to it instead of being sent right away.
+            - callback (Optional[callable]): Called with the future once it is done.
+        """
+        if response is not None and assembly.assembly_finished(response):
+            future = Future()
+            future.set_result(response)
+            if callback is not None:
+                callback(future)
+            return future
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot watch assemblies with a closed poller.")
+            watch = self._watches.get(assembly_url)
+            if watch is None:
+                watch = _Watch(assembly_url, self.interval)
+                watch.response = response
+                self._watches[assembly_url] = watch
+                stream_url = response.data.get("update_stream_url") if response else None
+                if self.stream_updates and stream_url:
+                    if self._stream_executor is None:
+                        self._stream_executor = ThreadPoolExecutor(
+                            max_workers=self.max_streams,
+                            thread_name_prefix="transloadit-stream",
+                        )
+                    self._stream_executor.submit(self._follow, watch, stream_url)
+                delay = 0 if response is None else self._next_delay(watch, response)
+                self._schedule_poll(watch, delay)
+                self._start()
+
+        if callback is not None:
+            watch.future.add_done_callback(callback)
+        return watch.future
+
+    def status(self, assembly_url):
+        """
+        Return the latest known status of a watched assembly, as updated by its polls and
+        update stream, or None if the assembly is not watched or its status is not known
+        yet.
+
+        :Args:
+            - assembly_url (str): The URL of the assembly.
+        """
+        with self._condition:
+            watch = self._watches.get(assembly_url)
+            return None if watch is None else watch.response
+
+    def unwatch(self, assembly_url):
+        """
+        Stop polling the status of an assembly and cancel its future.
+        """
+        with self._condition:
+            watch = self._watches.pop(assembly_url, None)
+        if watch is not None:
+            watch.future.cancel()
+
+    def close(self):
+        """
+        Stop the scheduler and cancel the futures of assemblies still being watched.
+        """
+        with self._condition:
+            self._closed = True
+            watches = list(self._watches.values())
+            self._watches.clear()
+            self._condition.notify_all()
+        for watch in watches:
+            watch.future.cancel()
+        if self._stream_executor is not None:
+            # streams stop at their next line, once they see that their watch is done.
+            self._stream_executor.shutdown(wait=False, cancel_futures=True)
+        if self._thread is not None:
+            self._thread.join()
+            self._executor.shutdown(wait=True)
+
+    def _start(self):
+        if self._thread is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="transloadit-poller"
+            )
+            self._thread = threading.Thread(
+                target=self._run, name="transloadit-poller", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        with self._condition:
+            while not self._closed:
+                if not self._schedule:
+                    self._condition.wait()
+                    continue
+                due = self._schedule[0][0]
+                delay = due - monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                _, sequence, watch = heapq.heappop(self._schedule)
+                if sequence != watch.sequence:
+                    # the poll was rescheduled.
+                    continue
+                if watch.future.done():
+                    # cancelled by its owner.
+                    if self._watches.get(watch.assembly_url) is watch:
+                        del self._watches[watch.assembly_url]
+                    continue
+                self._executor.submit(self._poll, watch)
+
+    def _poll(self, watch):
+        try:
+            response = self.transloadit.get_assembly(assembly_url=watch.assembly_url)
+        except requests.exceptions.RequestException as error:
+            watch.errors += 1
+            logger.debug("Failed to poll %s: %r", watch.assembly_url, error)
+            if watch.errors >= self.max_errors:
+                self._finish(watch, error=error)
+                return
+            with self._condition:
+                self._schedule_poll(watch, self._next_delay(watch))
+            return
+        except Exception as error:
+            self._finish(watch, error=error)
+            return
+
+        watch.errors = 0
+        if assembly.assembly_finished(response):
+            self._finish(watch, response)
+            return
+        with self._condition:
+            watch.response = response
+            self._schedule_poll(watch, self._next_delay(watch, response))
+
+    def _follow(self, watch, stream_url):
+        with self._condition:
+            if watch.future.done():
+                return
+            watch.streaming = True
+        session = self.transloadit.request.session
+        final_event = None
+        try:
+            for event in events.stream_events(session, stream_url, stopped=watch.future.done):
+                if event.name in events.FINAL_EVENTS:
+                    final_event = event
+                    break
+                with self._condition:
+                    watch.response = copy.copy(watch.response)
+                    watch.response.data = events.apply_event(watch.response.data, event)
+        except requests.exceptions.RequestException as error:
+            logger.debug("Update stream of %s failed: %r", watch.assembly_url, error)
+        logger.debug("Update stream of %s ended with %r", watch.assembly_url, final_event)
+        with self._condition:
+            watch.streaming = False
+            if not watch.future.done():
+                self._schedule_poll(watch, 0 if final_event is not None else watch.interval)
+
+    def _next_delay(self, watch, response=None):
+        if watch.streaming:
+            return self.max_interval
+        delay = watch.interval
+        watch.interval = min(watch.interval * self.backoff, self.max_interval)
+        if response is not None:
+            retry_in = response.data.get("info", {}).get("retryIn")
+            if retry_in is not None:
+                return retry_in
+        return delay
+
+    def _schedule_poll(self, watch, delay):
+        if self._closed:
+            return
+        watch.sequence = next(self._counter)
+        heapq.heappush(self._schedule, (monotonic() + delay, watch.sequence, watch))
+        self._condition.notify()
+
+    def _finish(self, watch, response=None, error=None):
+        with self._condition:
+            if self._watches.get(watch.assembly_url) is watch:
+                del self._watches[watch.assembly_url]
+        try:
+            if error is not None:
+                watch.future.set_exception(error)
+            else:
+                watch.future.set_result(response)
+        except InvalidStateError:
+            # the future was cancelled while its status was being fetched.
+            pass
@@ -0,0 +1,327 @@
+import mmap
+import os
+import re
+import struct
+import threading
+from contextlib import contextmanager
+from time import monotonic, sleep, time
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+    import msvcrt
+
+from .deadline import DeadlineExceeded
+
+CREATE = "create"
+STATUS = "status"
+OTHER = "other"
+
+# errors with which the API rejects requests sent too often.
+RATE_LIMIT_ERRORS = frozenset(
+    ["RATE_LIMIT_REACHED", "ASSEMBLY_STATUS_FETCHING_RATE_LIMIT_REACHED"]
+)
+
+_ASSEMBLY_PATH = re.compile(r"/assemblies/[^/]+/?")
+
+# header of a shared file: the boot time of the host when the buckets were written.
+_HEADER = struct.Struct("<d")
+
+# state of a bucket in a shared file: tokens, last refill, rate and whether it is set.
+_SLOT = struct.Struct("<dddQ")
+
+# the monotonic times in a shared file are meaningless after a reboot, which resets the
+# clock. A boot time further than this from the current one means the host rebooted.
+_BOOT_TOLERANCE = 60
+
+# pauses longer than this in a shared file are not trusted either.
+_MAX_PAUSE = 3600
+_KINDS = (CREATE, STATUS, OTHER)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at 'rate' tokens per second, holding up to 'burst' tokens. It is
+    shared by all threads using it.
+
+    Tokens are reserved rather than waited for: a reservation that overdraws the bucket
+    returns how long the caller has to wait for its turn, so concurrent callers are spaced
+    out by 1 / 'rate' seconds instead of all retrying at once.
+
+    When the API reports that the rate limit is reached, the bucket is paused for the
+    'retryIn' period it gives, and its rate is cut by 'decrease'. Every accepted request
+    then raises the rate by 'increase' times the configured rate, until it is reached again.
+
+    :Attributes:
+        - rate (float): The current rate in tokens per second.
+
+    :Constructor Args:
+        - rate (float): The configured rate in tokens per second.
+        - burst (Optional[float]): How many tokens the bucket holds. Defaults to 'rate', and
+            to at least 1.
+        - min_rate (Optional[float]): Lower bound of the rate after rate limit errors.
+            Defaults to a tenth of 'rate'.
+        - decrease (Optional[float]): Factor the rate is multiplied by after a rate limit
+            error. Defaults to 0.5.
+        - increase (Optional[float]): Fraction of the configured rate the rate grows by after
+            each accepted request. Defaults to 0.05.
+    """
+
+    def __init__(self, rate, burst=None, min_rate=None, decrease=0.5, increase=0.05):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(burst if burst is not None else rate, 1)
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.decrease = decrease
+        self.increase = increase
+        self._tokens = self.burst
+        self._updated = monotonic()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            yield
+
+    def _refill(self, now):
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self, tokens=1, max_delay=None):
+        """
+        Take 'tokens' from the bucket and return how many seconds to wait before using them.
+        If that is not less than 'max_delay', nothing is taken and None is returned.
+        """
+        with self._locked():
+            now = monotonic()
+            self._refill(now)
+            delay = max(self._updated - now, 0)
+            if self._tokens < tokens:
+                delay += (tokens - self._tokens) / self.rate
+            if max_delay is not None and delay >= max_delay:
+                return None
+            self._tokens -= tokens
+            return delay
+
+    def acquire(self, tokens=1):
+        """
+        Take 'tokens' from the bucket, sleeping until they are available.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            sleep(delay)
+
+    def throttled(self, retry_in=None):
+        """
+        Slow down after the API reported that the rate limit is reached.
+
+        :Args:
+            - retry_in (Optional[float]): Seconds the API asked to wait before the next request.
+        """
+        with self._locked():
+            now = monotonic()
+            self._refill(now)
+            self.rate = max(self.rate * self.decrease, self.min_rate)
+            self._tokens = min(self._tokens, 0)
+            if retry_in:
+                # no tokens are added until the period is over.
+                self._updated = max(self._updated, now + retry_in)
+
+    def accepted(self):
+        """
+        Speed up again after a request that was not rate limited.
+        """
+        with self._locked():
+            if self.rate < self.max_rate:
+                self._refill(monotonic())
+                self.rate = min(self.rate + self.increase * self.max_rate, self.max_rate)
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter of the requests sent to the API, with separate
+    <transloadit.ratelimit.TokenBucket> for creating assemblies, fetching assembly statuses
+    and all other requests. Pass it to <transloadit.client.Transloadit> to have every API
+    request wait for a token of its bucket before being sent.
+
+    Rates adapt to the responses of the API: a RATE_LIMIT_REACHED or
+    ASSEMBLY_STATUS_FETCHING_RATE_LIMIT_REACHED error pauses the bucket of the request for
+    the 'retryIn' period given and slows it down, and accepted requests speed it up again.
+
+    :Attributes:
+        - buckets (dict): The <transloadit.ratelimit.TokenBucket> of each kind of request,
+            keyed by "create", "status" and "other".
+
+    :Constructor Args:
+        - create_rate (Optional[float]): Assemblies created per second. Defaults to 5.
+        - status_rate (Optional[float]): Assembly statuses fetched per second. Defaults to 20.
+        - other_rate (Optional[float]): Other requests per second. Defaults to 10.
+        - burst (Optional[float]): How many requests of each kind may be sent at once after
+            a quiet period. Defaults to the rate of the bucket.
+    """
+
+    def __init__(self, create_rate=5, status_rate=20, other_rate=10, burst=None):
+        rates = {CREATE: create_rate, STATUS: status_rate, OTHER: other_rate}
+        self.buckets = {kind: self._create_bucket(kind, rates[kind], burst) for kind in _KINDS}
+
+    def _create_bucket(self, kind, rate, burst):
+        return TokenBucket(rate, burst)
+
+    @staticmethod
+    def classify(method, url):
+        """
+        Return the kind of an API request: "create", "status" or "other".
+        """
+        path = urlsplit(url).path
+        if method == "POST" and path.rstrip("/").endswith("/assemblies"):
+            return CREATE
+        if method == "GET" and _ASSEMBLY_PATH.fullmatch(path):
+            return STATUS
+        return OTHER
+
+    def reserve(self, method, url, deadline=None):
+        """
+        Reserve a token for a request and return how many seconds to wait before sending it.
+
+        If the wait would not end before 'deadline', a <transloadit.deadline.Deadline>,
+        nothing is reserved and <transloadit.deadline.DeadlineExceeded> is raised.
+        """
+        max_delay = None if deadline is None else deadline.remaining()
+        delay = self.buckets[self.classify(method, url)].reserve(max_delay=max_delay)
+        if delay is None:
+            raise DeadlineExceeded()
+        return delay
+
+    def acquire(self, method, url, deadline=None):
+        """
+        Wait until a request may be sent, or raise
+        <transloadit.deadline.DeadlineExceeded> right away if it may only be sent after
+        'deadline'.
+        """
+        delay = self.reserve(method, url, deadline)
+        if delay > 0:
+            sleep(delay)
+
+    def observe(self, method, url, data):
+        """
+        Adapt the rate of the bucket of a request to its response.
+
+        :Args:
+            - method (str): The HTTP method of the request.
+            - url (str): The URL of the request.
+            - data (dict): The JSON body of the response.
+        """
+        bucket = self.buckets[self.classify(method, url)]
+        if isinstance(data, dict) and data.get("error") in RATE_LIMIT_ERRORS:
+            info = data.get("info")
+            bucket.throttled(info.get("retryIn") if isinstance(info, dict) else None)
+        else:
+            bucket.accepted()
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    <transloadit.ratelimit.RateLimiter> whose buckets live in a memory-mapped file, so all
+    processes of a host using the same file share their rates and their pauses: once one
+    process is told to retry in a few seconds, the others wait as well. Every update of a
+    bucket holds an exclusive lock on the file. Nothing but the local file system is needed.
+
+    The first process to use the file sets the rates. The file keeps working across a fork,
+    e.g. of preloaded web server workers. It records the boot time of the host, and its
+    buckets are reset after a reboot.
+
+    :Attributes:
+        - path (str): Path of the shared file.
+
+    :Constructor Args:
+        - path (str): Path of the shared file. It is created if it does not exist.
+        - create_rate, status_rate, other_rate, burst: see
+            <transloadit.ratelimit.RateLimiter>. They are the rates of the whole host.
+    """
+
+    def __init__(self, path, create_rate=5, status_rate=20, other_rate=10, burst=None):
+        self.path = path
+        self._pid = None
+        self._fd = None
+        self._map = None
+        self._file_lock = threading.Lock()
+        super().__init__(create_rate, status_rate, other_rate, burst)
+
+    def _create_bucket(self, kind, rate, burst):
+        offset = _HEADER.size + _KINDS.index(kind) * _SLOT.size
+        return _SharedTokenBucket(self, offset, rate, burst)
+
+    def _open(self):
+        # file locks are shared with the parent after a fork, so each process opens its own.
+        if self._pid != os.getpid():
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            size = _HEADER.size + _SLOT.size * len(_KINDS)
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._fd = fd
+            self._map = mmap.mmap(fd, size)
+            self._pid = os.getpid()
+        return self._map
+
+    @contextmanager
+    def _locked_file(self):
+        with self._file_lock:
+            mapping = self._open()
+            _lock_file(self._fd)
+            try:
+                booted = time() - monotonic()
+                (written,) = _HEADER.unpack_from(mapping, 0)
+                if abs(booted - written) > _BOOT_TOLERANCE:
+                    # written before a reboot, or never: every bucket starts over.
+                    mapping[:] = bytes(len(mapping))
+                    _HEADER.pack_into(mapping, 0, booted)
+                yield mapping
+            finally:
+                _unlock_file(self._fd)
+
+    def close(self):
+        """
+        Unmap and close the shared file.
+        """
+        with self._file_lock:
+            if self._pid == os.getpid():
+                self._map.close()
+                os.close(self._fd)
+            self._pid = self._fd = self._map = None
+
+
+class _SharedTokenBucket(TokenBucket):
+    def __init__(self, limiter, offset, rate, burst):
+        super().__init__(rate, burst)
+        self._limiter = limiter
+        self._offset = offset
+
+    @contextmanager
+    def _locked(self):
+        with self._limiter._locked_file() as mapping:
+            tokens, updated, rate, initialized = _SLOT.unpack_from(mapping, self._offset)
+            if initialized and updated < monotonic() + _MAX_PAUSE:
+                self._tokens, self._updated, self.rate = tokens, updated, rate
+            else:
+                self._tokens, self._updated = self.burst, monotonic()
+            yield
+            _SLOT.pack_into(mapping, self._offset, self._tokens, self._updated, self.rate, 1)
+
+
+def _lock_file(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    else:  # pragma: no cover
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:  # pragma: no cover
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
@@ -2,14 +2,21 @@ import hashlib
 import hmac
 import json
 import copy
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta, timezone
+from time import monotonic, sleep
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from .multipart import MultipartEncoder
 from .response import as_response
-from . import __version__
+from . import __version__, retry
+from .deadline import DeadlineExceeded
 
 TIMEOUT = 60
+CONNECT_TIMEOUT = 10
 
 
 class Request:
@@ -20,35 +27,135 @@ class Request:
         - transloadit (<translaodit.client.Transloadit>):
             An instance of the Transloadit class.
 
+        - session (<requests.Session>):
+            The pooled HTTP session shared by all requests made through this object.
+            It is created lazily on first use and may safely be used from several threads.
+
     :Constructor Args:
         - transloadit (<transloadit.client.Transloadit>)
+        - pool_connections (Optional[int]):
+            Number of distinct hosts for which connection pools are cached. Defaults to 10.
+        - pool_maxsize (Optional[int]):
+            Maximum number of connections kept alive per host. Defaults to 10.
+        - pool_block (Optional[bool]):
+            If set to True, requests wait for a free connection once 'pool_maxsize'
+            connections to a host are in use instead of opening throwaway ones.
+            Defaults to False.
+        - keep_alive (Optional[bool]):
+            If set to False, connections are closed after every request. Defaults to True.
+
+    With a <transloadit.hedge.HedgePolicy> set on the client, GET requests that may be
+    hedged are sent from a pool of up to 2 * 'pool_maxsize' threads, so the calling thread
+    can return whichever response comes first. They are never queued for a thread: when all
+    of them are busy, a request is sent from the calling thread and not hedged.
     """
 
     HEADERS = {"Transloadit-Client": "python-sdk:" + __version__}
 
-    def __init__(self, transloadit):
+    def __init__(
+        self,
+        transloadit,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        keep_alive=True,
+    ):
         self.transloadit = transloadit
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._hedge_executor = None
+        self._hedge_slots = threading.BoundedSemaphore(2 * pool_maxsize)
+
+    @property
+    def session(self):
+        """
+        Return the pooled <requests.Session>, creating it on first access.
+        """
+        session = self._session
+        if session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+                session = self._session
+        return session
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self.HEADERS)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self):
+        """
+        Close the pooled session and all of its open connections.
+
+        A new session is created transparently if the object is used again afterwards.
+        """
+        with self._session_lock:
+            session, self._session = self._session, None
+            executor, self._hedge_executor = self._hedge_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if session is not None:
+            session.close()
+
+    def warmup(self, connections=None):
+        """
+        Pre-open connections to the Transloadit API, so that subsequent requests
+        can skip the TCP and TLS handshakes.
+
+        :Args:
+            - connections (Optional[int]): How many connections to open. Defaults to
+                'pool_maxsize' if not specified.
+        """
+        connections = connections or self.pool_maxsize
+        session = self.session
+        url = self.transloadit.service
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            futures = [
+                executor.submit(session.head, url, timeout=TIMEOUT)
+                for _ in range(connections)
+            ]
+        for future in futures:
+            future.result()
 
     @as_response
-    def get(self, path, params=None):
+    def get(self, path, params=None, deadline=None):
         """
         Makes a HTTP GET request.
 
         :Args:
             - path (str): URL path to which the request should be made.
             - params (Optional[dict]): Optional params to send along with the request.
+            - deadline (Optional[<transloadit.deadline.Deadline>]): Time budget of the request,
+                retries included.
+
+        The request is hedged according to the client's <transloadit.hedge.HedgePolicy>, if
+        any.
 
         Return an instance of <transloadit.response.Response>
         """
-        return requests.get(
-            self._get_full_url(path),
-            params=self._to_payload(params),
-            headers=self.HEADERS,
-            timeout=TIMEOUT,
-        )
+        url = self._get_full_url(path)
+        params = self._to_payload(params)
+        hedge_policy = self.transloadit.hedge_policy
+        if hedge_policy is None:
+            return self._send("GET", url, params=params, deadline=deadline)
+        return self._hedged_send(hedge_policy, "GET", url, params=params, deadline=deadline)
 
     @as_response
-    def post(self, path, data=None, extra_data=None, files=None):
+    def post(self, path, data=None, extra_data=None, files=None, deadline=None):
         """
         Makes a HTTP POST request.
 
@@ -58,59 +165,209 @@ class Request:
             - extra_data (Optional[dict]): This is also added to the body of the request but not under the
                 'params' field.
             - files (Optional[dict]): Files to upload with the request. This should be a key, value pair of
-                field name and file stream respectively.
+                field name and file stream respectively. Files are streamed in fixed-size blocks
+                rather than loaded into memory.
+            - deadline (Optional[<transloadit.deadline.Deadline>]): Time budget of the request,
+                retries included. Files are then sent for as long as the budget allows, instead
+                of failing once the server has not answered for 60 seconds.
 
         Return an instance of <transloadit.response.Response>
         """
         data = self._to_payload(data)
         if extra_data:
             data.update(extra_data)
-        return requests.post(
+        headers = self.HEADERS
+        read_timeout = TIMEOUT
+        if files:
+            encoder = MultipartEncoder(data, files)
+            # a new body is generated for each attempt.
+            data = encoder.body
+            headers = dict(headers, **{"Content-Type": encoder.content_type})
+            read_timeout = None
+        return self._send(
+            "POST",
             self._get_full_url(path),
             data=data,
-            files=files,
-            headers=self.HEADERS,
-            timeout=TIMEOUT,
+            headers=headers,
+            deadline=deadline,
+            read_timeout=read_timeout,
         )
 
     @as_response
-    def put(self, path, data=None):
+    def put(self, path, data=None, deadline=None):
         """
         Makes a HTTP PUT request.
 
         :Args:
             - path (str): URL path to which the request should be made.
             - data (Optional[dict]): The body of the request.
+            - deadline (Optional[<transloadit.deadline.Deadline>]): Time budget of the request,
+                retries included.
 
         Return an instance of <transloadit.response.Response>
         """
-        data = self._to_payload(data)
-        return requests.put(
-            self._get_full_url(path),
-            data=data,
-            headers=self.HEADERS,
-            timeout=TIMEOUT,
+        return self._send(
+            "PUT", self._get_full_url(path), data=self._to_payload(data), deadline=deadline
         )
 
     @as_response
-    def delete(self, path, data=None):
+    def delete(self, path, data=None, deadline=None):
         """
         Makes a HTTP DELETE request.
 
         :Args:
             - path (str): URL path to which the request should be made.
             - data (Optional[dict]): The body of the request.
+            - deadline (Optional[<transloadit.deadline.Deadline>]): Time budget of the request,
+                retries included.
 
         Return an instance of <transloadit.response.Response>
         """
-        data = self._to_payload(data)
-        return requests.delete(
-            self._get_full_url(path),
-            data=data,
-            headers=self.HEADERS,
-            timeout=TIMEOUT,
+        return self._send(
+            "DELETE", self._get_full_url(path), data=self._to_payload(data), deadline=deadline
         )
 
+    def _send(
+        self, method, url, headers=None, data=None, deadline=None, read_timeout=TIMEOUT, **kwargs
+    ):
+        """
+        Send a request through the pooled session, after waiting for the client's
+        <transloadit.ratelimit.RateLimiter>, if any, and return the <requests.Response>.
+        Transient failures are retried according to the client's
+        <transloadit.retry.RetryPolicy>, if any.
+
+        Each attempt waits CONNECT_TIMEOUT seconds for a connection and 'read_timeout' seconds
+        for the server to answer, both bounded by what is left of 'deadline', if any. No
+        retry is attempted that would end after the deadline, and
+        <transloadit.deadline.DeadlineExceeded> is raised once it is over, or as soon as the
+        rate limiter would only let the request through after it. A 'read_timeout'
+        of None waits as long as the deadline allows, or TIMEOUT seconds without one.
+        """
+        rate_limiter = self.transloadit.rate_limiter
+        retry_policy = self.transloadit.retry_policy
+        started = monotonic()
+        attempt = 0
+        while True:
+            if rate_limiter is not None:
+                rate_limiter.acquire(method, url, deadline)
+            if deadline is None:
+                timeout = CONNECT_TIMEOUT, read_timeout or TIMEOUT
+            else:
+                timeout = deadline.timeout(CONNECT_TIMEOUT, read_timeout)
+            if retry_policy is not None:
+                timeout = tuple(retry_policy.timeout(started, value) for value in timeout)
+            try:
+                response = self.session.request(
+                    method,
+                    url,
+                    headers=headers or self.HEADERS,
+                    data=data() if callable(data) else data,
+                    timeout=timeout,
+                    **kwargs,
+                )
+            except requests.exceptions.RequestException as error:
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded() from error
+                if retry_policy is None or not retry.is_transient(error):
+                    raise
+                delay = retry_policy.retry_delay(
+                    method, attempt, started, error=error, sent=retry.was_sent(error)
+                )
+                if delay is None or _past_deadline(deadline, delay):
+                    raise
+            else:
+                if rate_limiter is not None:
+                    rate_limiter.observe(method, url, _json_or_none(response))
+                if retry_policy is None:
+                    return response
+                delay = retry_policy.retry_delay(
+                    method, attempt, started, response.status_code, response.headers
+                )
+                if delay is None or _past_deadline(deadline, delay):
+                    return response
+            sleep(delay)
+            attempt += 1
+
+    def _hedged_send(self, hedge_policy, method, url, **kwargs):
+        """
+        Send a request like '_send', and send it again if it has not been answered once the
+        <transloadit.hedge.HedgePolicy> says so. Return the first response; the other
+        request is cancelled if it has not started, and its response is discarded otherwise.
+        Errors are only raised once both requests have failed.
+        """
+
+        def send():
+            started = monotonic()
+            response = self._send(method, url, **kwargs)
+            return response, monotonic() - started
+
+        delay = hedge_policy.start()
+        if delay is None:
+            response, latency = send()
+            hedge_policy.record(latency)
+            return response
+
+        primary = self._submit_hedged(send)
+        if primary is None:
+            response, latency = send()
+            hedge_policy.record(latency)
+            return response
+        pending = {primary}
+        # the primary request is already being sent, so the delay starts now.
+        done, _ = wait(pending, timeout=delay)
+        if not done:
+            hedge = self._submit_hedged(send, allowed=hedge_policy.try_hedge)
+            if hedge is not None:
+                pending.add(hedge)
+
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    # the client was closed before the request was sent.
+                    error = error or requests.exceptions.ConnectionError(
+                        "The client was closed before the request was sent."
+                    )
+                    continue
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                response, latency = future.result()
+                hedge_policy.record(latency, hedge=future is not primary)
+                for other in pending:
+                    other.cancel()
+                    other.add_done_callback(_close_response)
+                return response
+        raise error
+
+    def _submit_hedged(self, fn, allowed=None):
+        """
+        Run 'fn' on a hedging thread and return its <concurrent.futures.Future>, or None if
+        all threads are busy or 'allowed', if given, returns False.
+        """
+        if not self._hedge_slots.acquire(blocking=False):
+            return None
+        if allowed is not None and not allowed():
+            self._hedge_slots.release()
+            return None
+        try:
+            future = self._get_hedge_executor().submit(fn)
+        except RuntimeError:
+            # the executor was shut down by close() in the meantime.
+            self._hedge_slots.release()
+            return None
+        future.add_done_callback(lambda future: self._hedge_slots.release())
+        return future
+
+    def _get_hedge_executor(self):
+        with self._session_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=2 * self.pool_maxsize, thread_name_prefix="transloadit-hedge"
+                )
+            return self._hedge_executor
+
     def _to_payload(self, data):
         data = copy.deepcopy(data or {})
         expiry = datetime.now(timezone.utc) + timedelta(seconds=self.transloadit.duration)
@@ -132,3 +389,20 @@ class Request:
             return url
         else:
             return self.transloadit.service + url
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None:
+        response, latency = future.result()
+        response.close()
+
+
+def _past_deadline(deadline, delay):
+    return deadline is not None and delay >= deadline.remaining()
+
+
+def _json_or_none(response):
+    try:
+        return response.json()
+    except ValueError:
+        return None
@@ -1,3 +1,4 @@
+import json
 from functools import wraps
 
 
@@ -36,6 +37,26 @@ class Response:
         return self._response.headers
 
 
+class BufferedResponse:
+    """
+    Fully read HTTP response, exposing the subset of the <requests.Response> interface
+    that <transloadit.response.Response> relies on.
+
+    :Constructor Args:
+        - status_code (int)
+        - headers (Mapping)
+        - content (bytes)
+    """
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
 def as_response(func):
     """
     Decorator function that converts the output of a function into an instance
@@ -47,3 +68,16 @@ def as_response(func):
         return Response(func(*args, **kwargs))
 
     return _wrapper
+
+
+def as_async_response(func):
+    """
+    Decorator function that awaits the output of a coroutine function and converts it
+    into an instance of the <transloadit.response.Response> class.
+    """
+
+    @wraps(func)
+    async def _wrapper(*args, **kwargs):
+        return Response(await func(*args, **kwargs))
+
+    return _wrapper
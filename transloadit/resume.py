@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from . import sources
+
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+
+
+def fingerprint(file_stream):
+    """
+    Return a fingerprint of the file stream, or None if the stream cannot be fingerprinted
+    because it is not seekable.
+
+    A file on disk is identified by its path, device, inode, modification time and size,
+    along with its first and last blocks, so it is not read whole. Any other stream, e.g.
+    one held in memory, is hashed whole. Text file streams are read through their binary
+    buffer, so their position is left unchanged.
+
+    :Args:
+        - file_stream (file|<transloadit.sources.FileSource>): The file to fingerprint.
+    """
+    if isinstance(file_stream, sources.StreamSource):
+        return None
+    stream = sources.unwrap(file_stream)
+    if sources.binary(stream) is not stream:
+        # offsets within a text stream are opaque, so its blocks are read from its buffer.
+        position = stream.tell()
+        try:
+            return fingerprint(sources.binary(stream))
+        finally:
+            # seeking the text stream also resyncs it with its buffer.
+            stream.seek(position)
+    if not isinstance(file_stream, sources.FileSource):
+        file_stream = sources.FileSource(file_stream)
+    size = file_stream.size
+    digest = hashlib.sha256(str(size).encode("ascii"))
+    identity = _file_identity(file_stream)
+    if identity is None:
+        for position in range(0, size, FINGERPRINT_BLOCK_SIZE):
+            digest.update(sources.to_bytes(file_stream.read(position, FINGERPRINT_BLOCK_SIZE)))
+        return digest.hexdigest()
+
+    digest.update(identity.encode("utf-8", "surrogateescape"))
+    digest.update(sources.to_bytes(file_stream.read(0, FINGERPRINT_BLOCK_SIZE)))
+    if size > FINGERPRINT_BLOCK_SIZE:
+        last_block = max(size - FINGERPRINT_BLOCK_SIZE, FINGERPRINT_BLOCK_SIZE)
+        digest.update(sources.to_bytes(file_stream.read(last_block, FINGERPRINT_BLOCK_SIZE)))
+    return digest.hexdigest()
+
+
+def _file_identity(file_source):
+    try:
+        status = os.fstat(file_source.file_stream.fileno())
+    except (AttributeError, OSError, ValueError):
+        # not backed by a file descriptor.
+        return None
+    path = file_source.name
+    if isinstance(path, (str, bytes, os.PathLike)):
+        path = os.path.realpath(os.fsdecode(path))
+    return f"{path} {status.st_dev} {status.st_ino} {status.st_mtime_ns}"
+
+
+def fingerprint_assembly(options, files):
+    """
+    Return the key an assembly with these options and files is saved under in a
+    <transloadit.resume.ResumeStore>, or None if one of the files cannot be fingerprinted.
+
+    :Args:
+        - options (dict): The options of the assembly.
+        - files (dict): Key, value pair of the field name of each file and its file stream.
+    """
+    fingerprints = {}
+    for field_name, file_stream in files.items():
+        fingerprints[field_name] = fingerprint(file_stream)
+        if fingerprints[field_name] is None:
+            return None
+    payload = json.dumps({"options": options, "files": fingerprints}, sort_keys=True, default=str)
+    return "assembly " + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResumeStore:
+    """
+    Durable storage of the URLs of unfinished uploads, so an upload interrupted by a crash
+    or a restart can be resumed instead of being sent again from the first byte.
+
+    Subclasses implement the methods below. They may be called from several threads at once.
+    """
+
+    def get_item(self, key):
+        """
+        Return the value stored under 'key', or None if there is none.
+        """
+        raise NotImplementedError
+
+    def set_item(self, key, value):
+        """
+        Store the string 'value' under 'key', replacing any previous value.
+        """
+        raise NotImplementedError
+
+    def remove_item(self, key):
+        """
+        Remove the value stored under 'key', if any.
+        """
+        raise NotImplementedError
+
+    def remove_items(self, prefix):
+        """
+        Remove every value stored under a key starting with 'prefix'.
+        """
+        raise NotImplementedError
+
+
+class SQLiteResumeStore(ResumeStore):
+    """
+    <transloadit.resume.ResumeStore> backed by an SQLite database file, which may be shared
+    by several processes.
+
+    :Constructor Args:
+        - path (str): Path of the database file. It is created if it does not exist.
+        - timeout (Optional[float]): Seconds to wait for another process to release a lock
+            on the database. Defaults to 30.
+    """
+
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS resumable_uploads "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+
+    def _execute(self, statement, parameters=()):
+        with self._lock:
+            return self._connection.execute(statement, parameters).fetchall()
+
+    def get_item(self, key):
+        rows = self._execute("SELECT value FROM resumable_uploads WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def set_item(self, key, value):
+        self._execute(
+            "INSERT OR REPLACE INTO resumable_uploads (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def remove_item(self, key):
+        self._execute("DELETE FROM resumable_uploads WHERE key = ?", (key,))
+
+    def remove_items(self, prefix):
+        self._execute(
+            "DELETE FROM resumable_uploads WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+
+    def close(self):
+        """
+        Close the connection to the database.
+        """
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,156 @@
+import random
+import threading
+from collections import Counter
+from time import monotonic
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+# HTTP methods that may be sent again after the server may have received them.
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+# response statuses worth retrying: rate limiting and transient server errors.
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+_TRANSIENT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+def is_transient(error):
+    """
+    Return whether a <requests.exceptions.RequestException> is a network error that may not
+    happen again, such as a reset connection or a timeout.
+    """
+    return isinstance(error, _TRANSIENT_ERRORS)
+
+
+def was_sent(error):
+    """
+    Return whether the request may have reached the server before 'error' was raised. Only
+    connection failures, which happen before anything is sent, return False.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return False
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return not isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return True
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed API request is sent again.
+
+    Connection errors, timeouts and responses with a 429 or 5xx status are retried, up to
+    'retries' times and as long as the 'deadline' of the whole call is not over. Requests
+    with an idempotent method are retried after any of these failures. Other requests,
+    such as the POST creating an assembly, are only retried when the connection failed
+    before anything was sent, so an assembly is never created twice.
+
+    Retries wait a random delay between 0 and 'backoff' * 2 ** attempt seconds, capped at
+    'max_backoff' ("full jitter"), so clients that failed together do not retry together.
+    A 'Retry-After' header asking for a longer wait is honoured.
+
+    The policy may be shared by clients and threads. It counts what it does in 'counters'.
+
+    :Attributes:
+        - counters (<collections.Counter>): How many requests were attempted ('attempts'),
+            retried ('retries'), and given up on after a retryable failure ('exhausted'),
+            and how many retries each reason caused, e.g. 'retry:503' or
+            'retry:ConnectionError'.
+
+    :Constructor Args:
+        - retries (Optional[int]): How many times a request is retried at most. Defaults
+            to 3. 0 disables retries.
+        - backoff (Optional[float]): Base of the exponential backoff in seconds. Defaults
+            to 0.5.
+        - max_backoff (Optional[float]): Upper bound of the backoff in seconds. Defaults
+            to 30.
+        - deadline (Optional[float]): Seconds after the first attempt after which a request
+            is not retried anymore. Defaults to no deadline.
+        - statuses (Optional[iterable]): Response statuses that are retried. Defaults to
+            429, 500, 502, 503 and 504.
+        - idempotent_methods (Optional[iterable]): Methods retried after the request was
+            sent. Defaults to GET, HEAD, OPTIONS, PUT and DELETE.
+    """
+
+    def __init__(
+        self,
+        retries=3,
+        backoff=0.5,
+        max_backoff=30,
+        deadline=None,
+        statuses=RETRY_STATUSES,
+        idempotent_methods=IDEMPOTENT_METHODS,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.statuses = frozenset(statuses)
+        self.idempotent_methods = frozenset(idempotent_methods)
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def backoff_delay(self, attempt):
+        """
+        Return a random delay to wait before retry number 'attempt' + 1.
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def retry_delay(
+        self, method, attempt, started, status=None, headers=None, error=None, sent=True
+    ):
+        """
+        Record an attempt of a request and return how many seconds to wait before sending it
+        again, or None if it should not be retried.
+
+        :Args:
+            - method (str): The HTTP method of the request.
+            - attempt (int): How many times the request was retried so far.
+            - started (float): <time.monotonic> time of the first attempt.
+            - status (Optional[int]): The status of the response, if there is one.
+            - headers (Optional[Mapping]): The headers of the response.
+            - error (Optional[Exception]): The transient network error the attempt failed
+                with, if any.
+            - sent (Optional[bool]): Whether the request may have reached the server.
+        """
+        if error is not None:
+            reason = type(error).__name__
+            retryable = not sent or method in self.idempotent_methods
+        else:
+            reason = str(status)
+            retryable = status in self.statuses and method in self.idempotent_methods
+
+        with self._lock:
+            self.counters["attempts"] += 1
+            if not retryable:
+                return None
+            delay = max(self.backoff_delay(attempt), _retry_after(headers))
+            out_of_time = self.deadline is not None and (
+                monotonic() - started + delay > self.deadline
+            )
+            if attempt >= self.retries or out_of_time:
+                self.counters["exhausted"] += 1
+                return None
+            self.counters["retries"] += 1
+            self.counters[f"retry:{reason}"] += 1
+        return delay
+
+    def timeout(self, started, timeout):
+        """
+        Return the timeout of the next attempt: 'timeout', but no later than the deadline.
+        """
+        if self.deadline is None:
+            return timeout
+        return max(min(timeout, self.deadline - (monotonic() - started)), 0.001)
+
+
+def _retry_after(headers):
+    try:
+        return float((headers or {}).get("Retry-After", 0))
+    except ValueError:
+        # an HTTP date, which is not worth parsing for the short waits retried here.
+        return 0
@@ -0,0 +1,247 @@
+import io
+import mmap
+import os
+import stat
+import tempfile
+import threading
+
+
+class FileSource:
+    """
+    Upload source reading from a seekable file stream.
+
+    Reads are positional and guarded by a lock, so several uploads (e.g. the parts of a
+    file uploaded in parallel) can read from the same source concurrently.
+
+    :Attributes:
+        - file_stream (file): The underlying file stream.
+        - name (str): The name of the file, if known.
+
+    :Constructor Args:
+        - file_stream (file): Seekable file stream object.
+    """
+
+    def __init__(self, file_stream):
+        self.file_stream = file_stream
+        self.name = getattr(file_stream, "name", None)
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        """
+        Return the size of the source in bytes.
+        """
+        with self._lock:
+            return self.file_stream.seek(0, os.SEEK_END)
+
+    def read(self, position, size):
+        """
+        Return up to 'size' bytes found at 'position'.
+        """
+        with self._lock:
+            self.file_stream.seek(position)
+            return self.file_stream.read(size)
+
+    def readinto(self, position, buffer):
+        """
+        Fill 'buffer' with the bytes found at 'position' and return how many were read.
+        """
+        with self._lock:
+            self.file_stream.seek(position)
+            if hasattr(self.file_stream, "readinto"):
+                return self.file_stream.readinto(buffer)
+            data = self.file_stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        """
+        Release resources held by the source. The file stream itself is left open.
+        """
+
+
+class MappedFileSource(FileSource):
+    """
+    Upload source that memory-maps a regular file. Reads return memoryview slices of the
+    mapping, so chunks reach the socket without being copied into new bytes objects.
+
+    :Constructor Args:
+        - file_stream (file): Stream of a regular, non-empty file opened for reading.
+    """
+
+    def __init__(self, file_stream):
+        super().__init__(file_stream)
+        self._map = mmap.mmap(file_stream.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+    @property
+    def size(self):
+        return len(self._view)
+
+    def read(self, position, size):
+        return self._view[position:position + size]
+
+    def readinto(self, position, buffer):
+        data = self._view[position:position + len(buffer)]
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # chunks still referenced elsewhere keep the mapping alive until they are freed.
+            pass
+
+
+class SpooledSource(FileSource):
+    """
+    Upload source holding a copy of a stream in a temporary file, which is deleted when the
+    source is closed.
+
+    :Constructor Args:
+        - stream (<transloadit.sources.StreamSource>): The stream to copy.
+    """
+
+    SPOOL_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, stream):
+        spool = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_SIZE)
+        while True:
+            block = stream.read(stream.BLOCK_SIZE)
+            if not block:
+                break
+            spool.write(block)
+        super().__init__(spool)
+        self.name = stream.name
+
+    def close(self):
+        self.file_stream.close()
+
+
+class StreamSource:
+    """
+    Upload source reading sequentially from a non-seekable stream, such as a pipe or an
+    HTTP response body, or from an iterable of bytes chunks. Its size is only known once
+    the stream is exhausted, so it is uploaded with a deferred length.
+
+    :Attributes:
+        - name (str): The file name reported for the upload.
+        - size (None): Always None, as the size is unknown up front.
+        - digest (hashlib object): If set, e.g. to 'hashlib.sha256()', it is updated with every
+            byte read from the stream, so the stream is hashed while it is uploaded.
+
+    :Constructor Args:
+        - stream (file|iterable): Object with a 'read(size)' method, or an iterable yielding
+            bytes.
+        - name (Optional[str]): The file name reported for the upload.
+    """
+
+    BLOCK_SIZE = 64 * 1024
+    size = None
+
+    def __init__(self, stream, name=None):
+        self.name = name or getattr(stream, "name", None)
+        self._stream = stream if hasattr(stream, "read") else None
+        self._blocks = iter(stream) if self._stream is None else None
+        self._pending = b""
+        self.digest = None
+
+    def read(self, size=-1):
+        """
+        Return up to 'size' bytes from the stream, or the rest of it if 'size' is negative.
+        An empty result means the stream is exhausted.
+        """
+        data = self._read(size)
+        if self.digest is not None:
+            self.digest.update(data)
+        return data
+
+    def _read(self, size):
+        if self._stream is not None:
+            return self._stream.read(size)
+
+        if size is None or size < 0:
+            data = self._pending + b"".join(map(self._to_bytes, self._blocks))
+            self._pending = b""
+            return data
+        while not self._pending:
+            block = next(self._blocks, None)
+            if block is None:
+                return b""
+            self._pending = self._to_bytes(block)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def read_exactly(self, size):
+        """
+        Return 'size' bytes from the stream, or fewer only if the stream ends first.
+        """
+        pieces = []
+        while size > 0:
+            piece = self.read(size)
+            if not piece:
+                break
+            pieces.append(piece)
+            size -= len(piece)
+        return b"".join(pieces)
+
+    def close(self):
+        """
+        Release resources held by the source. The stream itself is left open.
+        """
+
+    @staticmethod
+    def _to_bytes(block):
+        return block.encode("utf-8") if isinstance(block, str) else bytes(block)
+
+
+def unwrap(file_stream):
+    """
+    Return the file stream read by a <transloadit.sources.FileSource>, for code reading it
+    sequentially, or the file stream itself if it is not a source.
+    """
+    if isinstance(file_stream, FileSource):
+        return file_stream.file_stream
+    return file_stream
+
+
+def binary(file_stream):
+    """
+    Return the binary buffer under a text file stream, e.g. one opened with 'open(path)', so
+    its bytes can be read from any offset, or the file stream itself.
+    """
+    if isinstance(file_stream, io.TextIOWrapper):
+        return file_stream.buffer
+    return file_stream
+
+
+def to_bytes(block):
+    """
+    Return the block read from a file stream as bytes, encoding the text read from text
+    streams without a binary buffer, such as <io.StringIO>.
+    """
+    if isinstance(block, str):
+        return block.encode("utf-8")
+    return block
+
+
+def open_source(file_stream):
+    """
+    Return the best upload source for the file stream: a <transloadit.sources.MappedFileSource>
+    for regular files and a <transloadit.sources.FileSource> for any other seekable stream.
+    Sources are returned unchanged.
+    """
+    if isinstance(file_stream, (FileSource, StreamSource)):
+        return file_stream
+    try:
+        status = os.fstat(file_stream.fileno())
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return FileSource(file_stream)
+    if stat.S_ISREG(status.st_mode) and status.st_size > 0:
+        try:
+            return MappedFileSource(file_stream)
+        except (OSError, ValueError):
+            pass
+    return FileSource(file_stream)
@@ -0,0 +1,582 @@
+import logging
+import os
+import queue
+import threading
+from base64 import b64encode
+from time import monotonic, sleep
+from urllib.parse import urljoin
+
+import requests
+from tusclient.exceptions import TusCommunicationError, TusUploadFailed
+
+from . import sources
+from .deadline import request_timeout
+from .request import CONNECT_TIMEOUT, TIMEOUT
+
+TUS_VERSION = "1.0.0"
+CHUNK_SIZE = 5 * 1024 * 1024
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+RETRY_DELAY = 30
+
+logger = logging.getLogger(__name__)
+
+
+class UploadCancelled(Exception):
+    """
+    Raised from an upload that was cancelled before it completed.
+    """
+
+
+def encode_metadata(metadata):
+    """
+    Return the metadata dict encoded as a TUS 'Upload-Metadata' header value.
+    """
+    return ",".join(
+        f"{key} {b64encode(str(value).encode('utf-8')).decode('ascii')}"
+        for key, value in metadata.items()
+    )
+
+
+def get_extensions(session, tus_url, deadline=None):
+    """
+    Return the set of TUS protocol extensions advertised by the server.
+
+    :Args:
+        - session (<requests.Session>): The session to send the request through.
+        - tus_url (str): The TUS creation endpoint.
+        - deadline (Optional[<transloadit.deadline.Deadline>]): Time budget of the request.
+    """
+    timeout = request_timeout(deadline, CONNECT_TIMEOUT, TIMEOUT)
+    try:
+        response = session.options(
+            tus_url, headers={"Tus-Resumable": TUS_VERSION}, timeout=timeout
+        )
+    except requests.exceptions.RequestException:
+        return set()
+    extensions = response.headers.get("Tus-Extension", "")
+    return {extension.strip() for extension in extensions.split(",") if extension.strip()}
+
+
+def concatenate(session, tus_url, upload_urls, metadata=None, deadline=None):
+    """
+    Join finished partial uploads into one upload, using the TUS concatenation extension.
+    Return the URL of the final upload.
+
+    :Args:
+        - session (<requests.Session>): The session to send the request through.
+        - tus_url (str): The TUS creation endpoint.
+        - upload_urls (list): URLs of the partial uploads, in order.
+        - metadata (Optional[dict]): Upload metadata of the final upload.
+        - deadline (Optional[<transloadit.deadline.Deadline>]): Time budget of the request.
+    """
+    headers = {
+        "Tus-Resumable": TUS_VERSION,
+        "Upload-Concat": "final;" + " ".join(upload_urls),
+    }
+    if metadata:
+        headers["Upload-Metadata"] = encode_metadata(metadata)
+    timeout = request_timeout(deadline, CONNECT_TIMEOUT, TIMEOUT)
+    try:
+        response = session.post(tus_url, headers=headers, timeout=timeout)
+    except requests.exceptions.RequestException as error:
+        raise TusCommunicationError(error)
+    location = response.headers.get("Location")
+    if location is None:
+        raise TusCommunicationError(None, response.status_code, response.content)
+    return urljoin(tus_url, location)
+
+
+class AdaptiveChunkSize:
+    """
+    Picks the size of each upload chunk from the throughput measured on the previous ones.
+
+    Sizing starts at 'min_size'. After every chunk the size moves towards what the measured
+    throughput can send in 'target_duration' seconds, but it never more than doubles at once.
+    A failed chunk (error or timeout) halves the size, so retries stay cheap.
+
+    :Attributes:
+        - size (int): The size of the next chunk.
+        - history (list): (size, seconds) of every chunk uploaded successfully.
+
+    :Constructor Args:
+        - min_size (Optional[int]): Lower bound of the chunk size. Defaults to 256 KiB.
+        - max_size (Optional[int]): Upper bound of the chunk size. Defaults to 64 MiB.
+        - target_duration (Optional[float]): How long in seconds a single chunk should take to
+            upload. Defaults to 2.
+    """
+
+    def __init__(self, min_size=MIN_CHUNK_SIZE, max_size=MAX_CHUNK_SIZE, target_duration=2.0):
+        if min_size > max_size:
+            raise ValueError("'min_size' cannot be greater than 'max_size'.")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_duration = target_duration
+        self.size = min_size
+        self.history = []
+
+    def record(self, size, seconds):
+        """
+        Adjust the chunk size after a chunk of 'size' bytes was uploaded in 'seconds'.
+        """
+        self.history.append((size, seconds))
+        if size < self.size:
+            # the final chunk of an upload says little about the link's capacity.
+            return
+        ideal = size * self.target_duration / max(seconds, 1e-3)
+        self._set_size(min(self.size * 2, ideal))
+
+    def record_failure(self):
+        """
+        Shrink the chunk size after a failed chunk.
+        """
+        self._set_size(self.size // 2)
+
+    def _set_size(self, size):
+        self.size = int(min(max(size, self.min_size), self.max_size))
+
+
+class ChunkBody:
+    """
+    Read-only file-like view over a bytes-like chunk. It lets a chunk held in a reusable
+    buffer be sent as a request body without first being copied into a new bytes object.
+
+    :Constructor Args:
+        - data (bytes-like): The chunk to send.
+    """
+
+    def __init__(self, data):
+        self._view = memoryview(data)
+        self._position = 0
+
+    def __len__(self):
+        return len(self._view)
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else self._position + size
+        data = self._view[self._position:end]
+        self._position += len(data)
+        return data
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += len(self._view)
+        self._position = offset
+        return offset
+
+
+class ReadAhead:
+    """
+    Reads the chunks of an upload on a background thread, so that the next chunk is read
+    while the current one is on the wire. Chunks are read into a fixed number of reusable
+    buffers, which bounds memory use to 'buffers' chunks.
+
+    :Constructor Args:
+        - readinto (callable): readinto(position, buffer) fills the buffer with the bytes
+            found at 'position' and returns how many bytes were read.
+        - length (int): Total number of bytes to read.
+        - next_size (callable): Returns the size of the next chunk to read.
+        - buffers (Optional[int]): How many chunk buffers to use. Defaults to 2.
+    """
+
+    def __init__(self, readinto, length, next_size, buffers=2):
+        self.readinto = readinto
+        self.length = length
+        self.next_size = next_size
+        self._free = queue.Queue()
+        for _ in range(max(buffers, 1)):
+            self._free.put(bytearray())
+        self._ready = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._position = None
+
+    def get(self, position):
+        """
+        Return a memoryview of the chunk that starts at 'position'. Once the chunk has been
+        sent, it must be handed back with 'release()' so its buffer can be reused.
+        """
+        if position != self._position:
+            self._restart(position)
+        item = self._ready.get()
+        if isinstance(item, BaseException):
+            self._position = None
+            raise item
+        chunk_position, buffer, length = item
+        self._position = chunk_position + length
+        return memoryview(buffer)[:length]
+
+    def release(self, chunk):
+        """
+        Return the buffer of a chunk obtained from 'get()' for reuse.
+        """
+        self._free.put(chunk.obj)
+
+    def close(self):
+        """
+        Stop the background thread.
+        """
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._free.put(None)
+        self._thread.join()
+        self._thread = None
+
+        buffers = self._drain(self._free) + [
+            item[1] for item in self._drain(self._ready) if isinstance(item, tuple)
+        ]
+        for buffer in buffers:
+            if buffer is not None:
+                self._free.put(buffer)
+
+    def _restart(self, position):
+        self.close()
+        self._stopped = threading.Event()
+        self._position = position
+        self._thread = threading.Thread(
+            target=self._run, args=(position, self._stopped), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, position, stopped):
+        try:
+            while position < self.length:
+                buffer = self._free.get()
+                if stopped.is_set():
+                    self._free.put(buffer)
+                    return
+                size = min(self.next_size(), self.length - position)
+                if len(buffer) < size:
+                    buffer = bytearray(size)
+                length = self.readinto(position, memoryview(buffer)[:size])
+                if not length:
+                    raise EOFError(f"Unexpected end of file at offset {position}.")
+                self._ready.put((position, buffer, length))
+                position += length
+        except Exception as error:
+            self._ready.put(error)
+
+    @staticmethod
+    def _drain(items):
+        drained = []
+        while True:
+            try:
+                drained.append(items.get_nowait())
+            except queue.Empty:
+                return drained
+
+
+class Uploader:
+    """
+    Uploads a file stream, or a byte range of it, to a TUS server through a pooled
+    HTTP session.
+
+    :Attributes:
+        - url (str): The upload URL, once it has been created.
+        - offset (int): How many bytes of the range have been uploaded.
+        - length (int): The total number of bytes to upload. None while uploading a
+            <transloadit.sources.StreamSource> whose end has not been reached yet.
+
+    :Constructor Args:
+        - session (<requests.Session>): The session to send requests through.
+        - tus_url (str): The TUS creation endpoint.
+        - file_stream (file|<transloadit.sources.FileSource>): Seekable file stream, or upload
+            source, to upload from. Several uploaders may share one source. A
+            <transloadit.sources.StreamSource> is uploaded as it is read, using the TUS
+            creation-defer-length extension, and its length is declared once it is exhausted.
+        - metadata (Optional[dict]): Upload metadata sent when the upload is created.
+        - start (Optional[int]): Offset in the file stream at which the upload starts.
+            Defaults to 0.
+        - end (Optional[int]): Offset in the file stream at which the upload ends.
+            Defaults to the end of the stream.
+        - chunk_size (Optional[int]): Size in bytes of each PATCH request.
+        - min_chunk_size (Optional[int]): If this or 'max_chunk_size' is set, chunk sizes are
+            adapted to the measured throughput within these bounds instead of being fixed.
+            See <transloadit.uploader.AdaptiveChunkSize>.
+        - max_chunk_size (Optional[int]): Upper bound of adaptive chunk sizes.
+        - retries (Optional[int]): How many times a failed chunk is retried. Defaults to 0.
+        - retry_delay (Optional[int]): Seconds to wait before retrying a failed chunk.
+        - headers (Optional[dict]): Extra headers sent when the upload is created.
+        - read_ahead (Optional[int]): If set, the next chunks are read on a background thread
+            while the current one is being sent, into this many reusable chunk buffers.
+            See <transloadit.uploader.ReadAhead>. Defaults to 0, which disables read-ahead.
+        - store (Optional[<transloadit.resume.ResumeStore>]): If set along with 'store_key',
+            the URL of the upload is saved in the store when it is created, and an upload
+            already saved under 'store_key' is resumed from the offset known by the server.
+        - store_key (Optional[str]): The key the URL of the upload is saved under.
+        - on_progress (Optional[callable]): Called with the number of bytes the TUS server
+            acknowledged each time a chunk is uploaded, and with the offset of a resumed upload.
+        - deadline (Optional[<transloadit.deadline.Deadline>]): Time budget of the upload.
+            Each request gets what is left of it as its timeout, chunks are not retried past
+            it, and <transloadit.deadline.DeadlineExceeded> is raised once it is over.
+    """
+
+    def __init__(
+        self,
+        session,
+        tus_url,
+        file_stream,
+        metadata=None,
+        start=0,
+        end=None,
+        chunk_size=CHUNK_SIZE,
+        retries=0,
+        retry_delay=RETRY_DELAY,
+        headers=None,
+        min_chunk_size=None,
+        max_chunk_size=None,
+        read_ahead=0,
+        store=None,
+        store_key=None,
+        on_progress=None,
+        deadline=None,
+    ):
+        if not isinstance(file_stream, (sources.FileSource, sources.StreamSource)):
+            file_stream = sources.FileSource(file_stream)
+        if end is None:
+            end = file_stream.size
+
+        self.session = session
+        self.tus_url = tus_url
+        self.source = file_stream
+        self.metadata = metadata or {}
+        self.start = start
+        self.length = None if end is None else end - start
+        self.chunk_size = chunk_size
+        self.chunk_sizer = None
+        if min_chunk_size is not None or max_chunk_size is not None:
+            min_chunk_size = min_chunk_size or MIN_CHUNK_SIZE
+            self.chunk_sizer = AdaptiveChunkSize(
+                min_chunk_size, max_chunk_size or max(min_chunk_size, MAX_CHUNK_SIZE)
+            )
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.headers = headers or {}
+        self.read_ahead = read_ahead
+        self.store = store if store_key is not None else None
+        self.store_key = store_key
+        self.on_progress = on_progress
+        self.deadline = deadline
+        self.url = None
+        self.offset = 0
+        self._reader = None
+        self._pending = None
+
+    def create_url(self):
+        """
+        Create the upload on the TUS server and return its URL.
+        """
+        headers = {"Tus-Resumable": TUS_VERSION}
+        if self.length is None:
+            headers["Upload-Defer-Length"] = "1"
+        else:
+            headers["Upload-Length"] = str(self.length)
+        if self.metadata:
+            headers["Upload-Metadata"] = encode_metadata(self.metadata)
+        headers.update(self.headers)
+        try:
+            response = self.session.post(self.tus_url, headers=headers, timeout=self._timeout())
+        except requests.exceptions.RequestException as error:
+            raise TusCommunicationError(error)
+        location = response.headers.get("Location")
+        if location is None:
+            raise TusCommunicationError(None, response.status_code, response.content)
+        return urljoin(self.tus_url, location)
+
+    def get_offset(self):
+        """
+        Return the offset of the upload as known by the TUS server.
+        """
+        return self._get_state()[0]
+
+    def _get_state(self):
+        # (offset, length) of the upload as known by the TUS server, length None if unknown.
+        try:
+            response = self.session.head(
+                self.url, headers={"Tus-Resumable": TUS_VERSION}, timeout=self._timeout()
+            )
+        except requests.exceptions.RequestException as error:
+            raise TusCommunicationError(error)
+        offset = response.headers.get("Upload-Offset")
+        if offset is None:
+            raise TusCommunicationError(None, response.status_code, response.content)
+        length = response.headers.get("Upload-Length")
+        return int(offset), None if length is None else int(length)
+
+    def resume(self):
+        """
+        Continue the upload saved in the store, if the TUS server still knows it and its
+        length matches the byte range. Return True if it does.
+        """
+        url = self.store.get_item(self.store_key)
+        if url is None:
+            return False
+        self.url = url
+        try:
+            offset, length = self._get_state()
+        except TusCommunicationError:
+            offset, length = None, None
+        # an upload of another length was saved for a different file.
+        mismatched = self.length is not None and (
+            length not in (None, self.length) or (offset or 0) > self.length
+        )
+        if offset is None or mismatched:
+            logger.debug("Upload %s cannot be resumed, starting over", url)
+            self.store.remove_item(self.store_key)
+            self.url = None
+            return False
+        self.offset = offset
+        logger.debug("Resuming upload %s at offset %d", url, self.offset)
+        if self.on_progress is not None and self.offset:
+            self.on_progress(self.offset)
+        return True
+
+    def upload(self, cancelled=None):
+        """
+        Upload the whole byte range, chunk by chunk.
+
+        :Args:
+            - cancelled (Optional[<threading.Event>]): If the event gets set, the upload stops
+                before the next chunk and raises <transloadit.uploader.UploadCancelled>.
+        """
+        if self.url is None and self.store is not None:
+            self.resume()
+        if self.url is None:
+            self.url = self.create_url()
+            self.offset = 0
+            if self.store is not None:
+                self.store.set_item(self.store_key, self.url)
+
+        if self.read_ahead and self.length is not None:
+            self._reader = ReadAhead(
+                self._readinto, self.length, self._next_chunk_size, self.read_ahead
+            )
+        try:
+            while self.length is None or self.offset < self.length:
+                if cancelled is not None and cancelled.is_set():
+                    raise UploadCancelled()
+                if self.deadline is not None:
+                    self.deadline.check()
+                self.upload_chunk()
+        finally:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def upload_chunk(self):
+        """
+        Upload the next chunk, retrying up to 'retries' times on failure.
+        """
+        retried = 0
+        offset = self.offset
+        while True:
+            started = monotonic()
+            try:
+                chunk = self._read()
+                try:
+                    chunk_size = len(chunk)
+                    self.offset = self._patch(chunk, self._get_final_length(chunk))
+                finally:
+                    if self._reader is not None:
+                        self._reader.release(chunk)
+            except TusCommunicationError as error:
+                if self.chunk_sizer:
+                    self.chunk_sizer.record_failure()
+                if self.deadline is not None:
+                    self.deadline.check(self.retry_delay)
+                if retried >= self.retries:
+                    raise error
+                retried += 1
+                sleep(self.retry_delay)
+                try:
+                    self.offset = self.get_offset()
+                except TusCommunicationError:
+                    pass
+            else:
+                if self.length is None:
+                    self.length = self._get_final_length(b"") if self._pending else None
+                elapsed = monotonic() - started
+                if self.chunk_sizer:
+                    self.chunk_sizer.record(chunk_size, elapsed)
+                if self.on_progress is not None:
+                    self.on_progress(self.offset - offset)
+                logger.debug(
+                    "Uploaded %d bytes to %s in %.3fs (retried %d times), next chunk size %d",
+                    chunk_size,
+                    self.url,
+                    elapsed,
+                    retried,
+                    self._next_chunk_size(),
+                )
+                return
+
+    def _timeout(self):
+        return request_timeout(self.deadline, CONNECT_TIMEOUT, TIMEOUT)
+
+    def _next_chunk_size(self):
+        return self.chunk_sizer.size if self.chunk_sizer else self.chunk_size
+
+    def _read(self):
+        if self._reader is not None:
+            return self._reader.get(self.offset)
+        if isinstance(self.source, sources.StreamSource):
+            return self._read_stream()
+        size = min(self._next_chunk_size(), self.length - self.offset)
+        return self.source.read(self.start + self.offset, size)
+
+    def _read_stream(self):
+        # a stream cannot be rewound, so the last chunk read is kept until it is acknowledged.
+        if self._pending is not None:
+            start, data, final = self._pending
+            if self.offset < start:
+                raise ValueError(
+                    f"Cannot resend bytes before offset {start} of a non-seekable stream."
+                )
+            if self.offset < start + len(data) or final:
+                return data[self.offset - start:]
+
+        size = self._next_chunk_size()
+        data = self.source.read_exactly(size)
+        self._pending = (self.offset, data, len(data) < size)
+        return data
+
+    def _get_final_length(self, chunk):
+        """
+        Return the total length of a streamed upload if sending 'chunk' completes it.
+        """
+        if self._pending is None:
+            return None
+        start, data, final = self._pending
+        if final and self.offset + len(chunk) == start + len(data):
+            return start + len(data)
+        return None
+
+    def _readinto(self, position, buffer):
+        return self.source.readinto(self.start + position, buffer)
+
+    def _patch(self, chunk, upload_length=None):
+        headers = {
+            "Tus-Resumable": TUS_VERSION,
+            "Upload-Offset": str(self.offset),
+            "Content-Type": "application/offset+octet-stream",
+        }
+        if upload_length is not None:
+            headers["Upload-Length"] = str(upload_length)
+        try:
+            response = self.session.patch(
+                self.url,
+                data=chunk if isinstance(chunk, bytes) else ChunkBody(chunk),
+                headers=headers,
+                timeout=self._timeout(),
+            )
+        except requests.exceptions.RequestException as error:
+            raise TusUploadFailed(error)
+        if not 200 <= response.status_code < 300:
+            raise TusUploadFailed(None, response.status_code, response.content)
+        return int(response.headers["Upload-Offset"])